@@ -0,0 +1,228 @@
+"""
+Aggregate primary elections for the statewide offices.
+
+Primaries are multi-candidate races inside one party, so instead of the
+DEM-vs-REP margin model every county x contest x party gets:
+- each candidate's votes and vote share
+- the plurality winner, runner-up and plurality margin (votes and share points)
+- the Herfindahl-Hirschman index of vote shares (1 = one candidate took
+  everything) and the effective number of candidates, 1 / HHI
+
+All of it comes from one group-by and rank over the candidate rows, and the
+source files go through the same parsed-file cache as the general-election
+build. Statewide rollups are computed the same way from the county totals.
+
+Usage:
+    python scripts/aggregate_primaries.py
+    python scripts/aggregate_primaries.py --years 2016 2018
+"""
+import argparse
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_cache import CACHE_DIR, cached_read_csv
+from candidate_registry import apply_candidate_ids, cluster_candidates, preferred_spelling
+from county_registry import CountyRegistry
+from reconcile_sources import NON_CANDIDATES, total_rows
+from results_table import load_results, write_results
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index, source_files
+
+PRIMARY_SOURCES = ['primary_county', 'primary_precinct']
+
+
+def read_primary_rows(config, year, registry, cache_dir=CACHE_DIR):
+    """Candidate rows for the statewide offices in one year's primary.
+
+    Uses the county file when there is one, else the precinct files, without
+    their county-total and under/over-vote rows. Every spelling of a
+    candidate is replaced by the one the candidate registry would display,
+    so 'JOE DONNELLY' and 'Joe Donnelly' are totalled together. Returns
+    columns office_type, party, county_id, candidate, votes.
+    """
+    files = []
+    for source in PRIMARY_SOURCES:
+        files = source_files(config, source, year)
+        if files:
+            break
+    if not files:
+        return None
+
+    df = pd.concat([cached_read_csv(f, cache_dir) for f in files], ignore_index=True)
+    df = df[~total_rows(df)]
+    type_index = office_type_index(config)
+    office_type = df['office'].astype(str).str.strip().str.lower().map(type_index)
+    party = df['party'].astype(str).str.strip().str.upper().map(config['party_aliases'])
+    county_id = pd.Series(registry.resolve(df['county'].astype(str).str.strip()), index=df.index)
+    candidate = df['candidate'].astype(str).str.strip()
+
+    keep = (office_type.notna() & party.isin(['DEM', 'REP', 'LIB']) & (county_id >= 0) & df['candidate'].notna()
+            & ~candidate.str.lower().isin(NON_CANDIDATES))
+    rows = pd.DataFrame({
+        'office_type': office_type[keep],
+        'party': party[keep],
+        'county_id': county_id[keep],
+        'candidate': candidate[keep],
+        'votes': pd.to_numeric(df.loc[keep, 'votes'], errors='coerce').fillna(0).astype('int64'),
+    })
+
+    counts = Counter(zip(rows['party'], rows['candidate']))
+    spelling = {}
+    for keys in cluster_candidates(counts).values():
+        name = preferred_spelling(keys, counts)
+        spelling.update({key: name for key in keys})
+    rows['candidate'] = [spelling[key] for key in zip(rows['party'], rows['candidate'])]
+    return rows
+
+
+def primary_metrics(candidate_votes, keys):
+    """Share, plurality and fragmentation metrics per `keys` group.
+
+    `candidate_votes` has one row per group x candidate with a `votes`
+    column. Returns (candidates, summary): the candidate rows with `share`
+    and `rank` added, and one summary row per group.
+    """
+    frame = candidate_votes.sort_values(keys + ['votes'], ascending=[True] * len(keys) + [False], kind='stable')
+    groups = frame.groupby(keys, sort=False)
+    total = groups['votes'].transform('sum')
+    frame = frame.assign(share=np.where(total > 0, frame['votes'] / total, 0.0),
+                         rank=groups.cumcount())
+
+    top = frame[frame['rank'] < 2].set_index(keys + ['rank'])[['candidate', 'votes', 'share']].unstack('rank')
+    summary = pd.DataFrame({
+        'total_votes': frame.groupby(keys, sort=False)['votes'].sum(),
+        'candidates': frame.groupby(keys, sort=False).size(),
+        'hhi': (frame['share'] ** 2).groupby([frame[k] for k in keys], sort=False).sum(),
+    })
+    summary['winner'] = top[('candidate', 0)]
+    summary['winner_votes'] = top[('votes', 0)]
+    summary['winner_share'] = top[('share', 0)]
+    second = ('candidate', 1) in top.columns
+    summary['runner_up'] = top[('candidate', 1)] if second else None
+    runner_votes = top[('votes', 1)].fillna(0) if second else 0
+    runner_share = top[('share', 1)].fillna(0) if second else 0
+    summary['plurality_margin'] = summary['winner_votes'] - runner_votes
+    summary['plurality_margin_pct'] = (summary['winner_share'] - runner_share) * 100
+    summary['effective_candidates'] = np.where(summary['hhi'] > 0, 1 / summary['hhi'], 0.0)
+    return frame, summary.reset_index()
+
+
+def _record(summary_row, candidates):
+    return {
+        'total_votes': int(summary_row.total_votes),
+        'winner': summary_row.winner,
+        'winner_votes': int(summary_row.winner_votes),
+        'winner_share': round(float(summary_row.winner_share) * 100, 2),
+        'runner_up': summary_row.runner_up if isinstance(summary_row.runner_up, str) else None,
+        'plurality_margin': int(summary_row.plurality_margin),
+        'plurality_margin_pct': round(float(summary_row.plurality_margin_pct), 2),
+        'hhi': round(float(summary_row.hhi), 4),
+        'effective_candidates': round(float(summary_row.effective_candidates), 2),
+        'candidates': candidates,
+    }
+
+
+def aggregate_primary_year(config, year, registry, cache_dir=CACHE_DIR):
+    """County and statewide primary results for one year, or {}"""
+    rows = read_primary_rows(config, year, registry, cache_dir)
+    if rows is None or rows.empty:
+        return {}
+
+    county_keys = ['office_type', 'party', 'county_id']
+    by_county = rows.groupby(county_keys + ['candidate'], as_index=False)['votes'].sum()
+    county_candidates, county_summary = primary_metrics(by_county, county_keys)
+
+    state_keys = ['office_type', 'party']
+    statewide = by_county.groupby(state_keys + ['candidate'], as_index=False)['votes'].sum()
+    state_candidates, state_summary = primary_metrics(statewide, state_keys)
+
+    labels = {office_type: names[0] for office_type, names in config['office_types'].items()}
+
+    def candidate_lists(frame, keys):
+        shares = (frame['share'] * 100).round(2)
+        lists = {}
+        for key, name, votes, share in zip(frame[keys].itertuples(index=False, name=None),
+                                           frame['candidate'], frame['votes'], shares):
+            lists.setdefault(key, []).append({'candidate': name, 'votes': int(votes), 'share': float(share)})
+        return lists
+
+    county_lists = candidate_lists(county_candidates, county_keys)
+    state_lists = candidate_lists(state_candidates, state_keys)
+
+    results = {}
+    for row in state_summary.itertuples(index=False):
+        contest_key = f"{labels[row.office_type]} ({year})"
+        results.setdefault(contest_key, {})[row.party] = {
+            'office_type': row.office_type,
+            'statewide': _record(row, state_lists[(row.office_type, row.party)]),
+            'counties': {},
+        }
+    for row in county_summary.itertuples(index=False):
+        contest_key = f"{labels[row.office_type]} ({year})"
+        name = registry.names[row.county_id]
+        record = _record(row, county_lists[(row.office_type, row.party, row.county_id)])
+        record.update({'county': name, 'county_id': int(row.county_id), 'geoid': registry.geoids[row.county_id]})
+        results[contest_key][row.party]['counties'][name] = record
+    return results
+
+
+def build_primaries(config, years=None, cache_dir=CACHE_DIR):
+    """Aggregate every configured primary into the primaries artifact structure"""
+    registry = CountyRegistry.from_config(config)
+    results_by_year = {}
+    for year in years or config['years']:
+        year_results = aggregate_primary_year(config, str(year), registry, cache_dir)
+        if year_results:
+            results_by_year[str(year)] = year_results
+            races = sum(len(parties) for parties in year_results.values())
+            print(f"  {year}: {len(year_results)} offices, {races} party primaries")
+
+    output = {
+        'meta': {
+            'state': config['state'],
+            'election': 'primary',
+            'years_covered': sorted(results_by_year),
+            'processed_date': datetime.now().strftime("%Y-%m-%d"),
+            'counties': registry.to_records(),
+        },
+        'results_by_year': results_by_year,
+    }
+    return output
+
+
+def write_primaries(primaries, output_file):
+    """Write the primaries artifact"""
+    write_results(output_file, primaries, indent=2)
+    print(f"✓ Primary results saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate statewide primary elections')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--years', nargs='*', help='Years to aggregate (default: every configured year)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read every source file instead of using .cache/')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    print(f"Aggregating {config['state']} primaries...")
+    output_file = config['artifacts'].get('primaries')
+    if not output_file:
+        print(f"❌ Error: {args.config} has no artifacts.primaries path")
+        return 1
+    primaries = build_primaries(config, args.years, cache_dir=None if args.no_cache else CACHE_DIR)
+
+    # Keep candidate ids from the existing registry; new names get theirs on the next full build
+    results_file = Path(config['output'])
+    if results_file.exists():
+        registry = load_results(results_file).get('candidates')
+        if registry:
+            apply_candidate_ids(registry, primaries=primaries)
+    write_primaries(primaries, output_file)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
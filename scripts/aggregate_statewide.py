@@ -1,121 +1,159 @@
+import argparse
+import os
+import time
+import numpy as np
 import pandas as pd
-import json
 from pathlib import Path
 
-def normalize_county_name(county_name):
-    """Normalize county name variations to match GeoJSON format"""
-    if not county_name or not isinstance(county_name, str):
-        return county_name
-    
-    # Normalize to title case and strip whitespace
-    county = county_name.strip()
-    
-    # Handle specific known variations
-    if county.lower() in ['saint joseph', 'st joseph', 'st. joseph']:
-        return 'St. Joseph'
-    if county.lower() in ['laport', 'la porte', 'laporte']:
-        return 'Laporte'
-    if county.lower() in ['dekalb', 'de kalb']:
-        return 'Dekalb'
-    
-    # Default: capitalize first letter of each word
-    return county.title()
+from aggregate_primaries import build_primaries
+from binary_results import write_binary_results
+from build_cache import CACHE_DIR, cached_read_csv, cached_reduce
+from candidate_registry import apply_candidate_ids, build_candidate_registry, registry_candidate_ids
+from competitiveness import competitiveness_info
+from contest_registry import build_contest_registry, contest_office_type, contest_slug, registry_ids
+from county_trends import write_county_trends
+from crosswalk import write_district_results
+from map_styles import build_map_styles
+from reconcile_sources import total_rows
+from results_table import load_results, write_results
+from rollups import build_rollups
+from sqlite_export import write_sqlite
+from county_registry import CountyRegistry
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index, source_files
+from validate_results import print_report, validate_results
 
-def get_competitiveness_info(margin_pct, winner):
-    """Get detailed competitiveness information"""
-    colors = {
-        'R_ANNIHILATION': '#67000d',
-        'R_DOMINANT': '#a50f15',
-        'R_STRONGHOLD': '#cb181d',
-        'R_SAFE': '#ef3b2c',
-        'R_LIKELY': '#fb6a4a',
-        'R_LEAN': '#fcae91',
-        'R_TILT': '#fee8c8',
-        'TOSSUP': '#f7f7f7',
-        'D_TILT': '#e1f5fe',
-        'D_LEAN': '#c6dbef',
-        'D_LIKELY': '#9ecae1',
-        'D_SAFE': '#6baed6',
-        'D_STRONGHOLD': '#3182bd',
-        'D_DOMINANT': '#08519c',
-        'D_ANNIHILATION': '#08306b'
-    }
-    
-    abs_margin = abs(margin_pct)
-    
-    if abs_margin < 0.5:
-        return {'category': 'Tossup', 'party': 'Even', 'code': 'TOSSUP', 'color': colors['TOSSUP']}
-    
-    party = 'Republican' if winner == 'REP' else 'Democratic'
-    
-    if abs_margin >= 40:
-        cat = 'Annihilation'
-        code = 'R_ANNIHILATION' if winner == 'REP' else 'D_ANNIHILATION'
-    elif abs_margin >= 30:
-        cat = 'Dominant'
-        code = 'R_DOMINANT' if winner == 'REP' else 'D_DOMINANT'
-    elif abs_margin >= 20:
-        cat = 'Stronghold'
-        code = 'R_STRONGHOLD' if winner == 'REP' else 'D_STRONGHOLD'
-    elif abs_margin >= 10:
-        cat = 'Safe'
-        code = 'R_SAFE' if winner == 'REP' else 'D_SAFE'
-    elif abs_margin >= 5.5:
-        cat = 'Likely'
-        code = 'R_LIKELY' if winner == 'REP' else 'D_LIKELY'
-    elif abs_margin >= 1:
-        cat = 'Lean'
-        code = 'R_LEAN' if winner == 'REP' else 'D_LEAN'
-    else:
-        cat = 'Tilt'
-        code = 'R_TILT' if winner == 'REP' else 'D_TILT'
-    
-    return {
-        'category': cat,
-        'party': party,
-        'code': code,
-        'color': colors[code]
-    }
+# Vote-method columns carried by the 2020+ precinct files and the 2018 PDF parser
+VOTE_METHODS = ['early_voting', 'election_day', 'absentee', 'mail', 'provisional', 'post_election']
+# A file's votes not split into any of them, so a record's methods add up to its votes
+OTHER_METHOD = 'other'
+# Header spellings of those columns in individual county files
+VOTE_METHOD_ALIASES = {'early_votin': 'early_voting', 'election day': 'election_day', 'provisiona': 'provisional'}
+
+# Layout of each record's compact `vote_methods` arrays
+VOTE_METHOD_COLUMNS = ['dem_votes', 'rep_votes', 'total_votes', 'margin_pct']
 
-def get_margin_category(margin_pct):
-    """Calculate political category based on margin percentage"""
-    if abs(margin_pct) < 0.5:
-        return "Tossup"
-    elif 0.5 <= margin_pct < 1:
-        return "Tilt Republican"
-    elif 1 <= margin_pct < 5.5:
-        return "Lean Republican"
-    elif 5.5 <= margin_pct < 10:
-        return "Likely Republican"
-    elif 10 <= margin_pct < 20:
-        return "Safe Republican"
-    elif 20 <= margin_pct < 30:
-        return "Stronghold Republican"
-    elif 30 <= margin_pct < 40:
-        return "Dominant Republican"
-    elif margin_pct >= 40:
-        return "Annihilation Republican"
-    elif -1 < margin_pct <= -0.5:
-        return "Tilt Democratic"
-    elif -5.5 < margin_pct <= -1:
-        return "Lean Democratic"
-    elif -10 < margin_pct <= -5.5:
-        return "Likely Democratic"
-    elif -20 < margin_pct <= -10:
-        return "Safe Democratic"
-    elif -30 < margin_pct <= -20:
-        return "Stronghold Democratic"
-    elif -40 < margin_pct <= -30:
-        return "Dominant Democratic"
-    elif margin_pct <= -40:
-        return "Annihilation Democratic"
-    return "Tossup"
+# Office or candidate spellings of the per-precinct turnout rows
+REGISTERED_LABELS = {'registered voters', 'registered', 'registration'}
+BALLOTS_CAST_LABELS = {'ballots cast'}
+
+def party_keys(parties, aliases):
+    """Collapse party spellings to DEM/REP/LIB, leaving other parties as-is"""
+    return parties.astype(str).str.strip().str.upper().map(aliases).fillna(parties)
+
+def resolve_counties(rows, county_col, registry):
+    """Attach registry county ids to a frame, dropping rows for unknown counties"""
+    rows = rows.assign(county_id=registry.resolve(rows[county_col]))
+    unknown = rows['county_id'] < 0
+    if unknown.any():
+        names = sorted(str(n) for n in rows.loc[unknown, county_col].unique())
+        print(f"  Warning: skipping {int(unknown.sum())} rows with unknown counties: {', '.join(names[:5])}")
+        rows = rows[~unknown]
+    return rows
+
+def build_contest_results(aggregated, county_col, office_col, candidate_col, party_col, votes_col, year, registry, party_aliases,
+                          method_cols=()):
+    """Turn county x office x candidate x party vote totals into contest results.
+    
+    `method_cols` names vote-method columns (early_voting, election_day, ...)
+    to total alongside the votes; records then carry a compact `vote_methods`
+    entry of [dem, rep, total, margin_pct] per method.
+    """
+    method_cols = list(method_cols)
+    resolved = resolve_counties(aggregated, county_col, registry)
+    rows = pd.DataFrame({
+        'office': resolved[office_col].to_numpy(),
+        'county_id': resolved['county_id'].to_numpy(),
+        'candidate': resolved[candidate_col].to_numpy(),
+        'party': party_keys(resolved[party_col], party_aliases).to_numpy(),
+        'votes': resolved[votes_col].to_numpy(),
+        **{col: resolved[col].to_numpy() for col in method_cols},
+    })
+    
+    # One reduction for every contest, county and vote method at once
+    keys = ['office', 'county_id']
+    all_totals = rows.groupby(keys + ['party'], sort=False, dropna=False)[['votes'] + method_cols].sum()
+    party_totals = all_totals['votes']
+    wide = party_totals.unstack('party', fill_value=0)
+    dem_votes = wide['DEM'] if 'DEM' in wide else pd.Series(0, index=wide.index)
+    rep_votes = wide['REP'] if 'REP' in wide else pd.Series(0, index=wide.index)
+    total_votes = wide.sum(axis=1)
+    
+    totals = pd.DataFrame({
+        'dem_votes': dem_votes,
+        'rep_votes': rep_votes,
+        'other_votes': total_votes - dem_votes - rep_votes,
+        'total_votes': total_votes,
+    })
+    # Keep contests and counties in the order they first appear in the source
+    totals = totals.reindex(rows[keys].drop_duplicates().set_index(keys).index)
+    totals['two_party_total'] = totals['dem_votes'] + totals['rep_votes']
+    totals['margin'] = totals['rep_votes'] - totals['dem_votes']
+    totals['winner'] = np.where(totals['two_party_total'] > 0,
+                                np.where(totals['rep_votes'] > totals['dem_votes'], 'REP', 'DEM'),
+                                'TIE')
+    
+    # First listed candidate per major party, as the sources order them
+    first_candidates = rows.groupby(keys + ['party'], sort=False, dropna=False)['candidate'].first().fillna('N/A')
+    dem_candidates = first_candidates.xs('DEM', level='party') if 'DEM' in wide else pd.Series(dtype=object)
+    rep_candidates = first_candidates.xs('REP', level='party') if 'REP' in wide else pd.Series(dtype=object)
+    
+    all_parties = {}
+    for (office, county_id, party), votes in party_totals.items():
+        all_parties.setdefault((office, county_id), {})[party] = int(votes)
+    
+    vote_methods = {}
+    if method_cols:
+        by_method = all_totals[method_cols].unstack('party', fill_value=0)
+        for method in method_cols:
+            method_wide = by_method[method]
+            dem = method_wide['DEM'] if 'DEM' in method_wide else pd.Series(0, index=method_wide.index)
+            rep = method_wide['REP'] if 'REP' in method_wide else pd.Series(0, index=method_wide.index)
+            total = method_wide.sum(axis=1)
+            two_party = (dem + rep).to_numpy()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct = np.where(two_party > 0, np.round((rep - dem).to_numpy() / two_party * 100, 2), 0.0)
+            for key, d, r, t, m in zip(method_wide.index, dem, rep, total, pct):
+                # A negative `other` is a file whose method columns add up to more than its votes
+                if t != 0:
+                    vote_methods.setdefault(key, {})[method] = [int(d), int(r), int(t), float(m)]
+    
+    result = {}
+    for (office, county_id), row in zip(totals.index, totals.itertuples(index=False)):
+        contest_key = f"{office} ({year})"
+        county_name = registry.names[county_id]
+        if row.two_party_total > 0:
+            margin_pct = round((row.margin / row.two_party_total) * 100, 2)
+        else:
+            margin_pct = 0
+        result.setdefault(contest_key, {})[county_name] = {
+            'county': county_name,
+            'county_id': int(county_id),
+            'geoid': registry.geoids[county_id],
+            'contest': contest_key,
+            'year': str(year),
+            'dem_candidate': dem_candidates.get((office, county_id)) or 'N/A',
+            'rep_candidate': rep_candidates.get((office, county_id)) or 'N/A',
+            'dem_votes': int(row.dem_votes),
+            'rep_votes': int(row.rep_votes),
+            'other_votes': int(row.other_votes),
+            'total_votes': int(row.total_votes),
+            'two_party_total': int(row.two_party_total),
+            'margin': int(row.margin),
+            'margin_pct': margin_pct,
+            'winner': row.winner,
+            'competitiveness': competitiveness_info(margin_pct, row.winner),
+            'all_parties': all_parties[(office, county_id)]
+        }
+        if (office, county_id) in vote_methods:
+            result[contest_key][county_name]['vote_methods'] = vote_methods[(office, county_id)]
+    
+    return result
 
-def aggregate_alloffice_format(csv_file, year):
+def aggregate_alloffice_format(csv_file, year, config, registry, cache_dir=CACHE_DIR):
     """Aggregate AllOfficeResults format data (2018, 2020, 2022, 2024)"""
     print(f"Processing {csv_file}...")
     
-    df = pd.read_csv(csv_file, skipinitialspace=True)
+    df = cached_read_csv(csv_file, cache_dir, skipinitialspace=True)
     df.columns = [col.strip().strip('"') for col in df.columns]
     
     # Check for both "OfficeCategory" and "Office Category" column names
@@ -132,12 +170,7 @@ def aggregate_alloffice_format(csv_file, year):
         if df[col].dtype == 'object':
             df[col] = df[col].str.strip().str.strip('"')
     
-    statewide_offices = ['US Senator', 'Presidential Electors For US President & Vp', 
-                        'Governor & Lieutenant Governor', 'Governor & Lt. Governor',
-                        'Secretary Of State', 'Treasurer Of State', 'Auditor Of State', 
-                        'Attorney General']
-    
-    df = df[df[office_cat_col].isin(statewide_offices)]
+    df = df[df[office_cat_col].isin(config['statewide_offices']['alloffice'])]
     
     if len(df) == 0:
         print(f"  No statewide races found")
@@ -153,93 +186,26 @@ def aggregate_alloffice_format(csv_file, year):
     df[votes_col] = pd.to_numeric(df[votes_col], errors='coerce').fillna(0).astype(int)
     aggregated = df.groupby([county_col, office_col, ballot_col, party_col])[votes_col].sum().reset_index()
     
-    result = {}
-    for office in aggregated[office_col].unique():
-        office_data = aggregated[aggregated[office_col] == office]
-        contest_key = f"{office} ({year})"
-        counties = {}
-        
-        for county in office_data[county_col].unique():
-            # Normalize county name to match GeoJSON
-            normalized_county = normalize_county_name(county)
-            county_data = office_data[office_data[county_col] == county]
-            
-            # Build all_parties dict and get top candidates
-            all_parties = {}
-            dem_votes = 0
-            rep_votes = 0
-            dem_candidate = None
-            rep_candidate = None
-            other_votes = 0
-            
-            for _, row in county_data.iterrows():
-                votes = int(row[votes_col])
-                party = row[party_col]
-                
-                if party in ['Democratic', 'Democrat', 'DEM']:
-                    dem_votes += votes
-                    if dem_candidate is None:
-                        dem_candidate = row[ballot_col]
-                    all_parties['DEM'] = dem_votes
-                elif party in ['Republican', 'REP']:
-                    rep_votes += votes
-                    if rep_candidate is None:
-                        rep_candidate = row[ballot_col]
-                    all_parties['REP'] = rep_votes
-                elif party in ['Libertarian', 'LIB']:
-                    other_votes += votes
-                    all_parties['LIB'] = all_parties.get('LIB', 0) + votes
-                else:
-                    other_votes += votes
-                    if party not in all_parties:
-                        all_parties[party] = 0
-                    all_parties[party] += votes
-            
-            total_votes = dem_votes + rep_votes + other_votes
-            two_party_total = dem_votes + rep_votes
-            
-            if two_party_total > 0:
-                margin = rep_votes - dem_votes
-                margin_pct = round((margin / two_party_total) * 100, 2)
-                winner = 'REP' if rep_votes > dem_votes else 'DEM'
-            else:
-                margin = 0
-                margin_pct = 0
-                winner = 'TIE'
-            
-            counties[normalized_county] = {
-                'county': normalized_county,
-                'contest': contest_key,
-                'year': str(year),
-                'dem_candidate': dem_candidate or 'N/A',
-                'rep_candidate': rep_candidate or 'N/A',
-                'dem_votes': dem_votes,
-                'rep_votes': rep_votes,
-                'other_votes': other_votes,
-                'total_votes': total_votes,
-                'two_party_total': two_party_total,
-                'margin': margin,
-                'margin_pct': margin_pct,
-                'winner': winner,
-                'competitiveness': get_competitiveness_info(margin_pct, winner),
-                'all_parties': all_parties
-            }
-        
-        result[contest_key] = counties
+    result = build_contest_results(aggregated, county_col, office_col, ballot_col, party_col, votes_col,
+                                   year, registry, config['party_aliases'])
     
     print(f"  Found {len(result)} statewide races")
     return result
 
-def aggregate_openelections_data(csv_file, year):
+def apply_office_aliases(df, config, source, office_col='office'):
+    """Rename office spelling variants to the name used for the contest key"""
+    aliases = config['office_aliases'].get(source)
+    if aliases:
+        df[office_col] = df[office_col].replace(aliases)
+    return df
+
+def aggregate_openelections_data(csv_file, year, config, registry, cache_dir=CACHE_DIR):
     """Aggregate OpenElections format data"""
     print(f"Processing {csv_file}...")
     
-    df = pd.read_csv(csv_file)
-    statewide_offices = ['President', 'U.S. Senate', 'U.S. Senator', 'Governor', 'Secretary Of State',
-                        'Secretary of State', 'Treasurer Of State', 'Treasurer of State',
-                        'Auditor Of State', 'Auditor of State', 'Attorney General']
-    
-    df = df[df['office'].isin(statewide_offices)]
+    df = cached_read_csv(csv_file, cache_dir)
+    df = apply_office_aliases(df, config, 'openelections')
+    df = df[df['office'].isin(config['statewide_offices']['openelections'])]
     
     if len(df) == 0:
         print(f"  No statewide races found")
@@ -247,265 +213,230 @@ def aggregate_openelections_data(csv_file, year):
     
     df['votes'] = pd.to_numeric(df['votes'], errors='coerce').fillna(0).astype(int)
     
-    result = {}
-    for office in df['office'].unique():
-        office_data = df[df['office'] == office]
-        contest_key = f"{office} ({year})"
-        counties = {}
-        
-        for county in office_data['county'].unique():
-            # Normalize county name to match GeoJSON
-            normalized_county = normalize_county_name(county)
-            county_data = office_data[office_data['county'] == county]
-            
-            all_parties = {}
-            dem_votes = 0
-            rep_votes = 0
-            dem_candidate = None
-            rep_candidate = None
-            other_votes = 0
-            
-            for _, row in county_data.iterrows():
-                votes = int(row['votes'])
-                party = row['party']
-                candidate = row['candidate']
-                
-                if party in ['Democratic', 'Democrat', 'DEM']:
-                    dem_votes += votes
-                    if dem_candidate is None:
-                        dem_candidate = candidate
-                    all_parties['DEM'] = dem_votes
-                elif party in ['Republican', 'REP']:
-                    rep_votes += votes
-                    if rep_candidate is None:
-                        rep_candidate = candidate
-                    all_parties['REP'] = rep_votes
-                elif party in ['Libertarian', 'LIB']:
-                    other_votes += votes
-                    all_parties['LIB'] = all_parties.get('LIB', 0) + votes
-                else:
-                    other_votes += votes
-                    if party not in all_parties:
-                        all_parties[party] = 0
-                    all_parties[party] += votes
-            
-            total_votes = dem_votes + rep_votes + other_votes
-            two_party_total = dem_votes + rep_votes
-            
-            if two_party_total > 0:
-                margin = rep_votes - dem_votes
-                margin_pct = round((margin / two_party_total) * 100, 2)
-                winner = 'REP' if rep_votes > dem_votes else 'DEM'
-            else:
-                margin = 0
-                margin_pct = 0
-                winner = 'TIE'
-            
-            counties[normalized_county] = {
-                'county': normalized_county,
-                'contest': contest_key,
-                'year': str(year),
-                'dem_candidate': dem_candidate or 'N/A',
-                'rep_candidate': rep_candidate or 'N/A',
-                'dem_votes': dem_votes,
-                'rep_votes': rep_votes,
-                'other_votes': other_votes,
-                'total_votes': total_votes,
-                'two_party_total': two_party_total,
-                'margin': margin,
-                'margin_pct': margin_pct,
-                'winner': winner,
-                'competitiveness': get_competitiveness_info(margin_pct, winner),
-                'all_parties': all_parties
-            }
-        
-        result[contest_key] = counties
+    result = build_contest_results(df, 'county', 'office', 'candidate', 'party', 'votes',
+                                   year, registry, config['party_aliases'])
     
     print(f"  Found {len(result)} statewide races")
     return result
 
-def aggregate_multiple_precinct_files(precinct_files, year):
+def turnout_rows(df):
+    """Label each row 'registered', 'ballots_cast' or None (a vote row).
+    
+    Counties file these as their own office ('Registered Voters', 'Ballots
+    Cast'), as the candidate of a 'Voters' office (2016), or as a candidate
+    under each contest (some 2018 counties). Party-split and blank-ballot
+    rows are not turnout totals.
+    """
+    labels = [df[col].astype(str).str.strip().str.lower() for col in ('office', 'candidate') if col in df.columns]
+    no_party = df['party'].isna().to_numpy() if 'party' in df.columns else np.ones(len(df), dtype=bool)
+    registered = np.zeros(len(df), dtype=bool)
+    ballots = np.zeros(len(df), dtype=bool)
+    for label in labels:
+        registered |= label.isin(REGISTERED_LABELS).to_numpy()
+        ballots |= label.isin(BALLOTS_CAST_LABELS).to_numpy()
+    return np.select([registered & no_party, ballots & no_party], ['registered', 'ballots_cast'], default=None)
+
+def county_turnout(df, measures, registry):
+    """Registered voters and ballots cast per county id from the turnout rows.
+    
+    Counties that repeat the rows under every contest would be counted
+    several times by a plain sum, so each precinct contributes its largest
+    value per measure.
+    """
+    rows = df.assign(measure=measures)[measures != None]  # noqa: E711
+    if len(rows) == 0:
+        return pd.DataFrame(columns=['registered', 'ballots_cast'])
+    votes = pd.to_numeric(rows['votes'], errors='coerce').fillna(0)
+    per_precinct = (rows.assign(votes=votes)
+                        .groupby(['county', 'precinct', 'measure'], dropna=False)['votes'].max()
+                        .groupby(['county', 'measure']).sum()
+                        .unstack('measure', fill_value=0)
+                        .reset_index())
+    per_precinct = resolve_counties(per_precinct, 'county', registry)
+    totals = per_precinct.groupby('county_id')[[c for c in ('registered', 'ballots_cast') if c in per_precinct]].sum()
+    return totals.reindex(columns=['registered', 'ballots_cast'])
+
+def add_turnout(result, turnout):
+    """Attach registration, turnout and roll-off to contest records in place"""
+    if turnout.empty:
+        return
+    registered = turnout['registered'].fillna(0).astype('int64').to_dict()
+    ballots = turnout['ballots_cast'].fillna(0).astype('int64').to_dict()
+    for contest_data in result.values():
+        for record in contest_data.values():
+            county_id = record['county_id']
+            reg, cast = registered.get(county_id, 0), ballots.get(county_id, 0)
+            if reg > 0:
+                record['registered_voters'] = int(reg)
+            if cast > 0:
+                record['ballots_cast'] = int(cast)
+                # Roll-off: ballots cast that recorded no vote in this contest
+                record['roll_off'] = int(cast - record['total_votes'])
+                record['roll_off_pct'] = round((cast - record['total_votes']) / cast * 100, 2)
+            if reg > 0 and cast > 0:
+                record['turnout_pct'] = round(cast / reg * 100, 2)
+
+def reduce_precinct_file(df, config):
+    """Shrink one precinct file to what the year aggregation needs.
+    
+    Returns (votes, turnout): statewide-office vote rows totalled per
+    county x office x candidate x party, and the turnout rows reduced to
+    each precinct's largest value per measure. Both sums and maxima
+    compose across files, so the year totals are the same as from the
+    concatenated raw rows. County-total rows are dropped first: they repeat
+    the precincts and would double both.
+    """
+    df = df[~total_rows(df)]
+    measures = turnout_rows(df)
+    turnout = df.assign(measure=measures)[measures != None]  # noqa: E711
+    turnout = (turnout.assign(votes=pd.to_numeric(turnout['votes'], errors='coerce').fillna(0))
+                      .groupby(['county', 'precinct', 'measure'], dropna=False)['votes'].max()
+                      .reset_index())
+    
+    df = df[measures == None]  # noqa: E711
+    df = apply_office_aliases(df.copy(), config, 'precinct')
+    df = df[df['office'].isin(config['statewide_offices']['precinct'])]
+    df = df.rename(columns=VOTE_METHOD_ALIASES)
+    method_cols = [col for col in VOTE_METHODS if col in df.columns]
+    for col in ['votes'] + method_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+    if method_cols:
+        df[OTHER_METHOD] = df['votes'] - df[method_cols].sum(axis=1)
+        method_cols.append(OTHER_METHOD)
+    votes = df.groupby(['county', 'office', 'candidate', 'party'])[['votes'] + method_cols].sum().reset_index()
+    return votes, turnout
+
+def aggregate_multiple_precinct_files(precinct_files, year, config, registry, cache_dir=CACHE_DIR):
     """Aggregate multiple precinct-level files"""
     print(f"Aggregating {len(precinct_files)} precinct files for {year}...")
     
-    all_dfs = []
+    # Each file is reduced on its own (and kept reduced by long-running watchers)
+    reduced = []
+    params = {'aliases': config['office_aliases'].get('precinct'), 'offices': config['statewide_offices']['precinct']}
     for pf in precinct_files:
         try:
-            df = pd.read_csv(pf)
-            all_dfs.append(df)
+            reduced.append(cached_reduce(pf, lambda df: reduce_precinct_file(df, config), 'precinct', cache_dir,
+                                          params=params))
         except Exception as e:
             print(f"  Error reading {pf.name}: {e}")
     
-    if not all_dfs:
+    if not reduced:
         return {}
     
-    combined_df = pd.concat(all_dfs, ignore_index=True)
-    statewide_offices = ['President', 'U.S. Senate', 'Governor', 'Secretary Of State',
-                        'Secretary of State', 'Treasurer Of State', 'Treasurer of State',
-                        'Auditor Of State', 'Auditor of State', 'Attorney General']
-    
-    combined_df = combined_df[combined_df['office'].isin(statewide_offices)]
+    # Registered Voters / Ballots Cast rows come out of the same read
+    turnout_df = pd.concat([t for _, t in reduced], ignore_index=True)
+    turnout = county_turnout(turnout_df, turnout_df['measure'].to_numpy(), registry)
     
+    combined_df = pd.concat([v for v, _ in reduced], ignore_index=True)
     if len(combined_df) == 0:
         print(f"  No statewide races found")
         return {}
     
-    combined_df['votes'] = pd.to_numeric(combined_df['votes'], errors='coerce').fillna(0).astype(int)
-    aggregated = combined_df.groupby(['county', 'office', 'candidate', 'party'])['votes'].sum().reset_index()
+    # Vote-method columns are totalled in the same group-by as the votes
+    method_cols = [col for col in VOTE_METHODS + [OTHER_METHOD] if col in combined_df.columns]
+    combined_df[method_cols] = combined_df[method_cols].fillna(0).astype(int)
+    aggregated = combined_df.groupby(['county', 'office', 'candidate', 'party'])[['votes'] + method_cols].sum().reset_index()
     
-    result = {}
-    for office in aggregated['office'].unique():
-        office_data = aggregated[aggregated['office'] == office]
-        contest_key = f"{office} ({year})"
-        counties = {}
-        
-        for county in office_data['county'].unique():
-            # Normalize county name to match GeoJSON
-            normalized_county = normalize_county_name(county)
-            county_data = office_data[office_data['county'] == county]
-            
-            all_parties = {}
-            dem_votes = 0
-            rep_votes = 0
-            dem_candidate = None
-            rep_candidate = None
-            other_votes = 0
-            
-            for _, row in county_data.iterrows():
-                votes = int(row['votes'])
-                party = row['party']
-                candidate = row['candidate']
-                
-                if party in ['Democratic', 'Democrat', 'DEM']:
-                    dem_votes += votes
-                    if dem_candidate is None:
-                        dem_candidate = candidate
-                    all_parties['DEM'] = dem_votes
-                elif party in ['Republican', 'REP']:
-                    rep_votes += votes
-                    if rep_candidate is None:
-                        rep_candidate = candidate
-                    all_parties['REP'] = rep_votes
-                elif party in ['Libertarian', 'LIB']:
-                    other_votes += votes
-                    all_parties['LIB'] = all_parties.get('LIB', 0) + votes
-                else:
-                    other_votes += votes
-                    if party not in all_parties:
-                        all_parties[party] = 0
-                    all_parties[party] += votes
-            
-            total_votes = dem_votes + rep_votes + other_votes
-            two_party_total = dem_votes + rep_votes
-            
-            if two_party_total > 0:
-                margin = rep_votes - dem_votes
-                margin_pct = round((margin / two_party_total) * 100, 2)
-                winner = 'REP' if rep_votes > dem_votes else 'DEM'
-            else:
-                margin = 0
-                margin_pct = 0
-                winner = 'TIE'
-            
-            counties[normalized_county] = {
-                'county': normalized_county,
-                'contest': contest_key,
-                'year': str(year),
-                'dem_candidate': dem_candidate or 'N/A',
-                'rep_candidate': rep_candidate or 'N/A',
-                'dem_votes': dem_votes,
-                'rep_votes': rep_votes,
-                'other_votes': other_votes,
-                'total_votes': total_votes,
-                'two_party_total': two_party_total,
-                'margin': margin,
-                'margin_pct': margin_pct,
-                'winner': winner,
-                'competitiveness': get_competitiveness_info(margin_pct, winner),
-                'all_parties': all_parties
-            }
-        
-        result[contest_key] = counties
+    result = build_contest_results(aggregated, 'county', 'office', 'candidate', 'party', 'votes',
+                                   year, registry, config['party_aliases'], method_cols)
+    add_turnout(result, turnout)
     
     print(f"  Found {len(result)} statewide races")
+    if not turnout.empty:
+        print(f"  Turnout rows for {len(turnout)} counties")
     return result
 
-def main():
-    data_dir = Path('data')
-    year_folders = ['2002', '2004', '2006', '2008', '2010', '2012', '2014', '2016', '2018', '2020', '2022', '2024']
-    all_results = {}
+def aggregate_county_files(csv_files, year, config, registry, cache_dir=CACHE_DIR):
+    """Aggregate every OpenElections county-level file for a year"""
+    year_results = {}
+    for csv_file in csv_files:
+        year_results.update(aggregate_openelections_data(csv_file, int(csv_file.name[:4]), config, registry, cache_dir))
+    return year_results
+
+def aggregate_alloffice_files(csv_files, year, config, registry, cache_dir=CACHE_DIR):
+    """Aggregate the AllOfficeResults file for a year (first match wins)"""
+    return aggregate_alloffice_format(csv_files[0], year, config, registry, cache_dir)
+
+# Source type (as named in the state config) -> aggregator
+SOURCE_AGGREGATORS = {
+    'alloffice': aggregate_alloffice_files,
+    'county': aggregate_county_files,
+    'precinct': aggregate_multiple_precinct_files,
+    'parser_output': aggregate_multiple_precinct_files,
+}
+
+def aggregate_year(config, year_str, registry, cache_dir=CACHE_DIR):
+    """Aggregate every statewide contest for one election year.
+
+    Contests come from the first source in the reconciliation
+    `source_priority` list that has files for the year. The `authoritative`
+    table can name a different source for individual office types, e.g.
+    {"2018": {"us_senate": "county"}}.
+    """
+    settings = config['reconciliation']
+    overrides = settings['authoritative'].get(year_str, {})
+    available = {source: source_files(config, source, year_str)
+                 for source in settings['source_priority'] if source in SOURCE_AGGREGATORS}
+    available = {source: files for source, files in available.items() if files}
+    if not available:
+        return {}
     
-    for year_str in year_folders:
-        year_path = data_dir / year_str
-        
-        # Check for AllOfficeResults format (2020, 2022, 2024)
-        alloffice_file = data_dir / f'AllOfficeResults-{year_str}.csv'
-        if not alloffice_file.exists():
-            alloffice_file = data_dir / f'AllOfficeResults{year_str}.csv'
-        
-        if alloffice_file.exists():
-            year = int(year_str)
-            year_data = aggregate_alloffice_format(alloffice_file, year)
-            if year_data:  # Only update if we got valid data
-                if year not in all_results:
-                    all_results[year] = {}
-                all_results[year].update(year_data)
-            continue
-        
-        if not year_path.exists():
+    primary = next(iter(available))
+    needed = [primary] + [source for source in set(overrides.values()) if source != primary]
+    
+    per_source = {}
+    for source in needed:
+        if source not in available:
+            print(f"  Warning: authoritative source '{source}' has no files for {year_str}")
             continue
-        
-        # Find county-level files
-        general_files = list(year_path.glob('*__general__county.csv'))
-        
-        # If no county files, look for precinct files
-        if not general_files:
-            counties_path = year_path / 'counties'
-            if counties_path.exists():
-                precinct_files = list(counties_path.glob('*__general__*__precinct.csv'))
-            else:
-                precinct_files = list(year_path.glob('*__general__*__precinct.csv'))
-            
-            if precinct_files:
-                year = int(year_str)
-                year_data = aggregate_multiple_precinct_files(precinct_files, year)
-                if year not in all_results:
-                    all_results[year] = {}
-                all_results[year].update(year_data)
+        per_source[source] = SOURCE_AGGREGATORS[source](available[source], int(year_str), config, registry, cache_dir) or {}
+    
+    year_results = dict(per_source[primary])
+    if overrides:
+        type_index = office_type_index(config)
+        for office_type, source in overrides.items():
+            if source == primary or source not in per_source:
                 continue
+            year_results = {key: value for key, value in year_results.items()
+                            if contest_office_type(key, year_str, type_index) != office_type}
+            year_results.update({key: value for key, value in per_source[source].items()
+                                 if contest_office_type(key, year_str, type_index) == office_type})
+    return year_results
+
+def drop_uncontested(year_results):
+    """Remove contests where one major party has < 1% of the two-party vote"""
+    for contest_name in list(year_results.keys()):
+        contest_data = year_results[contest_name]
+        total_dem = sum(county['dem_votes'] for county in contest_data.values())
+        total_rep = sum(county['rep_votes'] for county in contest_data.values())
+        two_party_total = total_dem + total_rep
         
-        for csv_file in general_files:
-            year = int(csv_file.name[:4])
-            year_data = aggregate_openelections_data(csv_file, year)
-            if year not in all_results:
-                all_results[year] = {}
-            all_results[year].update(year_data)
+        if two_party_total > 0:
+            dem_pct = (total_dem / two_party_total) * 100
+            rep_pct = (total_rep / two_party_total) * 100
+            if dem_pct < 1.0 or rep_pct < 1.0:
+                print(f"  Excluding uncontested race: {contest_name} (Dem: {dem_pct:.1f}%, Rep: {rep_pct:.1f}%)")
+                del year_results[contest_name]
+    return year_results
+
+def assemble_output(config, all_results, registry, primaries=None, contest_ids=None, candidate_ids=None):
+    """Results JSON for {year: {contest: counties}} plus every derived section.
     
-    # Filter out uncontested races (where one major party has < 1% of two-party vote)
-    for year in list(all_results.keys()):
-        for contest_name in list(all_results[year].keys()):
-            contest_data = all_results[year][contest_name]
-            total_dem = sum(county['dem_votes'] for county in contest_data.values())
-            total_rep = sum(county['rep_votes'] for county in contest_data.values())
-            two_party_total = total_dem + total_rep
-            
-            # Remove contest if either party has < 1% of two-party vote
-            if two_party_total > 0:
-                dem_pct = (total_dem / two_party_total) * 100
-                rep_pct = (total_rep / two_party_total) * 100
-                if dem_pct < 1.0 or rep_pct < 1.0:
-                    print(f"  Excluding uncontested race: {contest_name} (Dem: {dem_pct:.1f}%, Rep: {rep_pct:.1f}%)")
-                    del all_results[year][contest_name]
-    
-    # Build final structure with metadata
+    `contest_ids` and `candidate_ids` are the previous output's slug -> id and
+    spelling -> id maps, so contests and candidates keep their ids from build
+    to build.
+    """
     from datetime import datetime
     
     final_output = {
         "meta": {
+            "state": config['state'],
             "years_covered": [str(y) for y in sorted(all_results.keys())],
             "exclusions": ["Congressional districts (gerrymandered)", "State legislature districts"],
-            "focus": "Statewide Indiana elections - clean geographic political patterns",
-            "processed_date": datetime.now().strftime("%Y-%m-%d")
+            "focus": f"Statewide {config['state']} elections - clean geographic political patterns",
+            "processed_date": datetime.now().strftime("%Y-%m-%d"),
+            "counties": registry.to_records(),
+            "vote_method_columns": VOTE_METHOD_COLUMNS
         },
         "results_by_year": {}
     }
@@ -515,11 +446,88 @@ def main():
         year_str = str(year)
         final_output["results_by_year"][year_str] = all_results[year]
     
-    output_file = data_dir / 'indiana_election_results.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(final_output, f, indent=2)
+    # Stable contest ids, office types and dates, indexed by office type
+    final_output["contests"] = build_contest_registry(
+        final_output["results_by_year"], config, office_type_index(config), contest_ids)
+    
+    # Canonical candidate ids across years, sources and primaries
+    final_output["candidates"] = build_candidate_registry(final_output, primaries, candidate_ids)
+    apply_candidate_ids(final_output["candidates"], final_output, primaries)
     
-    print(f"\n✓ Aggregated data saved to {output_file}")
+    # GEOID -> competitiveness table per contest, for the map's match expression
+    final_output["map_styles"] = build_map_styles(
+        final_output["results_by_year"], config['geometry'].get('geoid_field', 'GEOID20'))
+    
+    # Statewide and regional totals, so the map never re-sums counties
+    final_output["rollups"] = build_rollups(final_output, config['regions'], config['state'])
+    return final_output
+
+def write_outputs(config, final_output, primaries=None, cache_dir=CACHE_DIR):
+    """Write the results JSON and every derived artifact as one set.
+    
+    Each is first written next to its target as `<name>.new`; only once all
+    of them are written are they swapped in, so a failure part-way leaves
+    the previous outputs in place and no staged files behind.
+    """
+    output_file = Path(config['output'])
+    artifacts = config['artifacts']
+    writers = [(output_file, 'Aggregated data', lambda path: write_results(path, final_output, indent=2))]
+    if artifacts.get('trends'):
+        writers.append((artifacts['trends'], 'County trend series',
+                        lambda path: write_county_trends(final_output, config, path)))
+    if artifacts.get('binary'):
+        writers.append((artifacts['binary'], 'Binary results', lambda path: write_binary_results(final_output, path)))
+    if artifacts.get('sqlite'):
+        writers.append((artifacts['sqlite'], 'SQLite database', lambda path: write_sqlite(final_output, path)))
+    if primaries is not None and artifacts.get('primaries'):
+        writers.append((artifacts['primaries'], 'Primary results', lambda path: write_results(path, primaries, indent=2)))
+    for name, entry in config['crosswalks'].items():
+        writers.append((entry['output'], f'{name} district results',
+                        lambda path, name=name, entry=entry: write_district_results(
+                            config, final_output, entry['weights'], path, name, cache_dir)))
+    
+    staged = []
+    try:
+        for target, _, write in writers:
+            staged.append(Path(f"{target}.new"))
+            write(staged[-1])
+    except Exception:
+        for path in staged:
+            path.unlink(missing_ok=True)
+        raise
+    
+    print()
+    for (target, label, _), path in zip(writers, staged):
+        os.replace(path, target)
+        print(f"✓ {label} saved to {target}")
+    return output_file
+
+def build_state(config, cache_dir=CACHE_DIR):
+    """Run the full aggregation for one state config and write its output JSON"""
+    registry = CountyRegistry.from_config(config)
+    all_results = {}
+    
+    for year_str in config['years']:
+        year_data = aggregate_year(config, year_str, registry, cache_dir)
+        if year_data:
+            all_results.setdefault(int(year_str), {}).update(year_data)
+    
+    # Filter out uncontested races (where one major party has < 1% of two-party vote)
+    for year in list(all_results.keys()):
+        drop_uncontested(all_results[year])
+    
+    # Primaries are aggregated before the write so candidates are matched across both
+    primaries = None
+    if config['artifacts'].get('primaries'):
+        print(f"\nAggregating primaries...")
+        primaries = build_primaries(config, cache_dir=cache_dir)
+    
+    # Contest and candidate ids carry over from the previous output
+    output_file = Path(config['output'])
+    previous = load_results(output_file) if output_file.exists() else {}
+    final_output = assemble_output(config, all_results, registry, primaries, registry_ids(previous.get('contests')),
+                                   registry_candidate_ids(previous.get('candidates')))
+    output_file = write_outputs(config, final_output, primaries, cache_dir)
     print(f"✓ Years included: {sorted(all_results.keys())}")
     
     for year in sorted(all_results.keys()):
@@ -528,6 +536,151 @@ def main():
         for contest_name in sorted(data.keys()):
             num_counties = len(data[contest_name])
             print(f"  • {contest_name}: {num_counties} counties")
+    
+    # Only contests whose content changed since the last build are re-checked
+    print()
+    issues, checked, total = validate_results(final_output, output_file, cache_dir)
+    print_report(issues, checked, total)
+    
+    return final_output
+
+def select_contests(selectors, config, *results):
+    """(year, slug) of the contests in any of `results` (results_by_year dicts) matching any selector:
+    registry slug, 'year|contest', contest name or office type"""
+    registries = [build_contest_registry(results_by_year, config, office_type_index(config))
+                  for results_by_year in results]
+    selected, unmatched = set(), []
+    for selector in selectors:
+        wanted = selector.strip().lower()
+        matches = {(e['year'], e['slug']) for registry in registries for e in registry['contests']
+                   if wanted in (e['slug'], f"{e['year']}|{e['contest']}".lower(), e['contest'].lower(),
+                                 e['office_type'])}
+        if not matches:
+            unmatched.append(selector)
+        selected |= matches
+    if unmatched:
+        raise ValueError(f"No contest matches {', '.join(unmatched)} "
+                         f"(use a registry slug, 'year|contest', a contest name or an office type)")
+    return selected
+
+def _comparable(record):
+    return {k: v for k, v in record.items() if k not in ('contest', 'dem_candidate_id', 'rep_candidate_id')}
+
+def patch_state(config, years=None, contests=None, counties=None, cache_dir=CACHE_DIR):
+    """Re-aggregate a selection and merge it into the existing results JSON.
+    
+    Only the selected years' sources are read (with only contest selectors,
+    the years those contests belong to). Within them, the selected contests
+    and counties are replaced and everything else is kept from the existing
+    output; the derived sections and artifacts are then rebuilt from the
+    merged results. Contests are matched by registry slug, so a source that
+    renamed an office ('Governor & Lt. Governor (2024)' -> 'Governor (2024)')
+    replaces the old contest instead of adding a second one; a county-only
+    patch keeps the existing contest key. Returns {(year, contest): (status,
+    [changed counties])}.
+    """
+    output_file = Path(config['output'])
+    existing = load_results(output_file)
+    registry = CountyRegistry.from_config(config)
+    current = existing['results_by_year']
+    type_index = office_type_index(config)
+    
+    county_ids = None
+    if counties:
+        ids = registry.resolve(counties)
+        unknown = [name for name, i in zip(counties, ids) if i < 0]
+        if unknown:
+            raise ValueError(f"Unknown counties: {', '.join(unknown)}")
+        county_ids = set(ids.tolist())
+    
+    if not years:
+        years = sorted({year for year, _ in select_contests(contests, config, current)}) if contests else config['years']
+    unknown = [year for year in years if year not in config['years']]
+    if unknown:
+        raise ValueError(f"Years not in {config['state']}'s config: {', '.join(unknown)}")
+    
+    fresh = {year: drop_uncontested(aggregate_year(config, year, registry, cache_dir)) for year in years}
+    
+    # Contest key by slug, in the old output and in the new aggregation
+    old_keys = {year: {contest_slug(c, year, type_index): c for c in current.get(year, {})} for year in years}
+    new_keys = {year: {contest_slug(c, year, type_index): c for c in fresh[year]} for year in years}
+    keys = (select_contests(contests, config, {y: current.get(y, {}) for y in years}, fresh) if contests
+            else {(year, slug) for year in years for slug in old_keys[year].keys() | new_keys[year].keys()})
+    
+    changes = {}
+    for year, slug in sorted(keys):
+        old_key, new_key = old_keys[year].get(slug), new_keys[year].get(slug)
+        old = current.get(year, {}).get(old_key, {})
+        new = fresh[year].get(new_key, {})
+        key = new_key or old_key
+        if county_ids is not None:
+            key = old_key or new_key
+            kept = {name: r for name, r in old.items() if r['county_id'] not in county_ids}
+            kept.update({name: {**r, 'contest': key} for name, r in new.items() if r['county_id'] in county_ids})
+            new = dict(sorted(kept.items(), key=lambda item: item[1]['county_id']))
+        
+        changed = sorted(name for name in set(old) | set(new)
+                         if name not in old or name not in new or _comparable(old[name]) != _comparable(new[name]))
+        status = ('removed' if not new else 'added' if not old else 'renamed' if key != old_key
+                  else 'updated' if changed else 'unchanged')
+        changes[(year, key)] = (status, changed)
+        
+        # Replace the old contest in place, so the year keeps its contest order
+        year_data = current.setdefault(year, {})
+        if old_key is not None and new:
+            current[year] = {(key if k == old_key else k): (new if k == old_key else v) for k, v in year_data.items()}
+        elif old_key is not None:
+            year_data.pop(old_key)
+        elif new:
+            year_data[key] = new
+    
+    all_results = {int(year): data for year, data in current.items() if data}
+    
+    # Primaries are only read to keep candidate ids stable, and rewritten only if they moved
+    primaries_file = config['artifacts'].get('primaries')
+    primaries = load_results(primaries_file) if primaries_file and Path(primaries_file).exists() else None
+    final_output = assemble_output(config, all_results, registry, primaries, registry_ids(existing.get('contests')),
+                                   registry_candidate_ids(existing.get('candidates')))
+    ids_moved = final_output['candidates']['by_name'] != existing.get('candidates', {}).get('by_name')
+    write_outputs(config, final_output, primaries if ids_moved else None, cache_dir)
+    
+    print()
+    issues, checked, total = validate_results(final_output, output_file, cache_dir)
+    print_report(issues, checked, total)
+    return changes
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregate statewide election results for one state')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read every source file instead of using .cache/')
+    parser.add_argument('--year', nargs='*', help='Only re-aggregate these years, patching the existing output')
+    parser.add_argument('--contest', nargs='*',
+                        help="Only replace these contests (registry slug, 'year|contest', contest name or office type)")
+    parser.add_argument('--county', nargs='*', help='Only replace these counties (names or GEOIDs)')
+    args = parser.parse_args()
+    
+    config = load_state_config(args.config)
+    cache_dir = None if args.no_cache else CACHE_DIR
+    if not (args.year or args.contest or args.county):
+        build_state(config, cache_dir=cache_dir)
+        return 0
+    
+    if not Path(config['output']).exists():
+        print(f"❌ Error: {config['output']} does not exist yet; run a full build first")
+        return 1
+    
+    start = time.perf_counter()
+    try:
+        changes = patch_state(config, args.year, args.contest, args.county, cache_dir)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    
+    print(f"\n📊 Patched {len(changes)} contests in {time.perf_counter() - start:.2f}s:")
+    for (year, contest), (status, counties) in changes.items():
+        detail = f" ({len(counties)} counties: {', '.join(counties[:5])}{', ...' if len(counties) > 5 else ''})" if counties else ''
+        print(f"  {year} {contest}: {status}{detail}")
+    return 0
 
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
@@ -0,0 +1,208 @@
+"""
+Memory-mappable binary export of the county results.
+
+Layout (all little-endian):
+    b'INRB', uint32 version, uint32 header length
+    JSON header, space-padded so the first array starts on a 16-byte boundary
+    one contest x county array per column, each 16-byte aligned
+
+The header lists the counties (row order of the county axis = county id),
+the contests (contest axis = contest registry id), the competitiveness
+palette and, for each array, its dtype, shape and byte offset. Votes are
+int32, margin_pct is float32 (NaN where a contest has no result for a
+county) and code is the int32 competitiveness palette index (-1 for none).
+
+Python opens it with np.memmap and the map views it as typed arrays, so
+nothing is parsed and only the pages a query touches are read.
+
+Written next to the results JSON by aggregate_statewide.py when the config
+has an `artifacts.binary` path; to rebuild it from the results JSON or load
+it and report a contest:
+    python scripts/binary_results.py
+    python scripts/binary_results.py --contest president_2024
+"""
+import argparse
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from competitiveness import CODE_INDEX, CODES, COLORS
+from results_table import load_results, results_to_frame
+from state_config import DEFAULT_CONFIG, load_state_config
+
+MAGIC = b'INRB'
+VERSION = 1
+ALIGN = 16
+# Column -> dtype of each contest x county array
+COLUMNS = {
+    'dem_votes': '<i4',
+    'rep_votes': '<i4',
+    'other_votes': '<i4',
+    'total_votes': '<i4',
+    'margin_pct': '<f4',
+    'code': '<i4',
+}
+_PREAMBLE = struct.Struct('<4sII')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def build_arrays(results):
+    """Contest x county arrays for every contest in the registry, in id order"""
+    counties = results['meta'].get('counties') or []
+    contests = results['contests']['contests']
+    # Rows are contest ids; ids of contests no longer in the results stay empty
+    shape = (max((c['id'] for c in contests), default=-1) + 1, len(counties))
+    arrays = {name: np.zeros(shape, dtype=dtype) for name, dtype in COLUMNS.items()}
+    arrays['margin_pct'][:] = np.nan
+    arrays['code'][:] = -1
+
+    frame = results_to_frame(results['results_by_year'])
+    frame = frame[frame['county_id'] >= 0]
+    contest_ids = (frame['year'] + '|' + frame['contest']).map(results['contests']['by_key'])
+    frame = frame[contest_ids.notna()]
+    rows = contest_ids[contest_ids.notna()].astype(int).to_numpy()
+    cols = frame['county_id'].to_numpy()
+
+    for name in ['dem_votes', 'rep_votes', 'other_votes', 'total_votes', 'margin_pct']:
+        arrays[name][rows, cols] = frame[name].to_numpy()
+    arrays['code'][rows, cols] = frame['code'].map(CODE_INDEX).fillna(-1).astype(int).to_numpy()
+    return arrays
+
+
+def write_binary(path, header, arrays, magic=MAGIC):
+    """Write a JSON header and little-endian, 16-byte-aligned arrays; swapped in atomically.
+
+    Fills header['arrays'] with each array's dtype, shape and byte offset.
+    """
+    arrays = {name: np.ascontiguousarray(a, dtype=a.dtype.newbyteorder('<')) for name, a in arrays.items()}
+
+    # Offsets depend on the header length, which depends on the offsets: lay out until stable
+    data_start = 0
+    while True:
+        offset, layout = data_start, {}
+        for name, array in arrays.items():
+            offset = _aligned(offset)
+            layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes
+        header['arrays'] = layout
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        needed = _aligned(_PREAMBLE.size + len(encoded))
+        if needed <= data_start:
+            break
+        data_start = needed
+    encoded = encoded.ljust(data_start - _PREAMBLE.size, b' ')
+
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(_PREAMBLE.pack(magic, VERSION, len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.write(b'\0' * (layout[name]['offset'] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_file, path)
+    return header
+
+
+def map_binary(path, magic=MAGIC):
+    """(header, {name: read-only np.memmap}) of a file written by write_binary"""
+    with open(path, 'rb') as f:
+        found, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if found != magic:
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+        if version != VERSION:
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}")
+        header = json.loads(f.read(header_length))
+    arrays = {
+        name: np.memmap(path, dtype=spec['dtype'], mode='r', offset=spec['offset'], shape=tuple(spec['shape']))
+        for name, spec in header['arrays'].items()
+    }
+    return header, arrays
+
+
+def write_binary_results(results, path):
+    """Write the binary export of a results dict; returns the header"""
+    header = {
+        'state': results['meta'].get('state'),
+        'version': VERSION,
+        'counties': [{'id': c['id'], 'geoid': c['geoid'], 'name': c['name']}
+                     for c in results['meta'].get('counties') or []],
+        'contests': [{'id': c['id'], 'key': f"{c['year']}|{c['contest']}", 'slug': c['slug'],
+                      'office_type': c['office_type']}
+                     for c in results['contests']['contests']],
+        'codes': CODES,
+        'colors': [COLORS[code] for code in CODES],
+    }
+    return write_binary(path, header, build_arrays(results))
+
+
+class BinaryResults:
+    """Read-only, memory-mapped view of a binary results file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.header, self.arrays = map_binary(path)
+        self._contest_ids = {c['key']: c['id'] for c in self.header['contests']}
+        self._contest_ids.update({c['slug']: c['id'] for c in self.header['contests']})
+
+    def __getitem__(self, column):
+        return self.arrays[column]
+
+    def contest_id(self, contest):
+        """Registry id for a slug or 'year|contest' key"""
+        if contest not in self._contest_ids:
+            raise ValueError(f"Unknown contest '{contest}' (use a registry slug or 'year|contest')")
+        return self._contest_ids[contest]
+
+    def contest(self, contest):
+        """{column: county vector} for one contest"""
+        i = self.contest_id(contest)
+        return {name: array[i] for name, array in self.arrays.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write or read the memory-mapped binary results')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--contest', help="Load the file and report one contest (registry slug or 'year|contest')")
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    output_file = config['artifacts'].get('binary')
+    if not output_file:
+        print(f"❌ Error: {args.config} has no artifacts.binary path")
+        return 1
+
+    if args.contest:
+        start = time.perf_counter()
+        binary = BinaryResults(output_file)
+        try:
+            votes = binary.contest(args.contest)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        dem, rep = int(votes['dem_votes'].sum()), int(votes['rep_votes'].sum())
+        elapsed = time.perf_counter() - start
+        names = [c['name'] for c in binary.header['counties']]
+        counties_rep = int((votes['margin_pct'] > 0).sum())
+        counties_dem = int((votes['margin_pct'] < 0).sum())
+        print(f"📊 {args.contest}: DEM {dem:,} / REP {rep:,}, counties R {counties_rep} / D {counties_dem} "
+              f"(loaded in {elapsed * 1000:.1f} ms)")
+        closest = np.argsort(np.abs(np.nan_to_num(votes['margin_pct'], nan=np.inf)))[:5]
+        for county_id in closest:
+            print(f"  {names[county_id]:<12} {votes['margin_pct'][county_id]:+.2f} "
+                  f"({binary.header['codes'][votes['code'][county_id]]})")
+        return 0
+
+    header = write_binary_results(load_results(config['output']), output_file)
+    shape = header['arrays']['code']['shape']
+    print(f"✓ {shape[0]} contests x {shape[1]} counties saved to {output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+"""
+Content-addressed cache for parsed source files.
+
+Raw CSV reads are the slowest part of a build, and the same files are read
+again by every rebuild and by every worker process of a multi-state build.
+Parsed frames (and per-file reductions of them) are pickled under .cache/
+keyed by a hash of the file bytes plus the read options, so any process
+reading identical input reuses them.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path('.cache')
+CACHE_VERSION = 3
+
+# path -> ((mtime_ns, size, read options), frame); None unless a long-running process enables it
+_memory = None
+
+
+def keep_in_memory(enabled=True):
+    """Also keep parsed frames in this process, keyed by path and mtime/size.
+
+    For long-running watchers: unchanged files are then neither re-hashed
+    nor unpickled on every rebuild.
+    """
+    global _memory
+    _memory = {} if enabled else None
+
+
+def file_digest(path):
+    """SHA-1 of a file's contents"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(obj, cache_file):
+    """Pickle a frame (or tuple of frames) next to its final name, then rename it into place"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    pd.to_pickle(obj, tmp_file)
+    os.replace(tmp_file, cache_file)
+
+
+def cached_read_csv(path, cache_dir=CACHE_DIR, **read_kwargs):
+    """pd.read_csv with a shared on-disk cache; cache_dir=None disables it"""
+    if _memory is not None:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size, sorted(read_kwargs.items()))
+        entry = _memory.get(str(path))
+        if entry is not None and entry[0] == signature:
+            # Callers may modify the frame they get back
+            return entry[1].copy()
+        df = _read_csv(path, cache_dir, **read_kwargs)
+        _memory[str(path)] = (signature, df)
+        return df.copy()
+    return _read_csv(path, cache_dir, **read_kwargs)
+
+
+def _read_csv(path, cache_dir, **read_kwargs):
+    if cache_dir is None:
+        return pd.read_csv(path, **read_kwargs)
+
+    key_source = f"{CACHE_VERSION}|{file_digest(path)}|{sorted(read_kwargs.items())!r}"
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+    cache_file = Path(cache_dir) / 'csv' / f'{key}.pkl'
+
+    if cache_file.exists():
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception:
+            # A truncated or stale pickle is just a cache miss
+            pass
+
+    df = pd.read_csv(path, **read_kwargs)
+    _write_atomic(df, cache_file)
+    return df
+
+
+def cached_reduce(path, reducer, name, cache_dir=CACHE_DIR, params=None, **read_kwargs):
+    """reducer(frame) for a source file, cached like the parsed frame.
+
+    The result is pickled under .cache/reduced/ keyed by the file bytes,
+    `name` and `params` (the config the reducer depends on), so a rebuild only
+    re-reduces files that changed. Bump CACHE_VERSION when a reducer's code
+    changes. With keep_in_memory() on, the result is also kept per path and
+    reused while the file is unchanged.
+    """
+    params = json.dumps(params, sort_keys=True, default=str)
+    if _memory is None:
+        return _reduce(path, reducer, name, params, cache_dir, read_kwargs)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size, params, sorted(read_kwargs.items()))
+    key = f"{name}:{path}"
+    entry = _memory.get(key)
+    if entry is None or entry[0] != signature:
+        entry = (signature, _reduce(path, reducer, name, params, cache_dir, read_kwargs))
+        _memory[key] = entry
+    return entry[1]
+
+
+def _reduce(path, reducer, name, params, cache_dir, read_kwargs):
+    if cache_dir is None:
+        return reducer(pd.read_csv(path, **read_kwargs))
+
+    key_source = f"{CACHE_VERSION}|{name}|{params}|{file_digest(path)}|{sorted(read_kwargs.items())!r}"
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+    cache_file = Path(cache_dir) / 'reduced' / f'{key}.pkl'
+
+    if cache_file.exists():
+        try:
+            return pd.read_pickle(cache_file)
+        except Exception:
+            pass
+
+    result = reducer(_read_csv(path, cache_dir, **read_kwargs))
+    _write_atomic(result, cache_file)
+    return result
@@ -0,0 +1,66 @@
+"""
+Build election results for several states in parallel.
+
+Every state config under config/states/ (or the ones given on the command
+line) is aggregated in its own worker process. Workers share the parsed-file
+cache in .cache/, so re-running a build only re-reads files that changed.
+
+Usage:
+    python scripts/build_states.py                      # every config
+    python scripts/build_states.py config/states/indiana.json --workers 2
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from build_cache import CACHE_DIR
+from state_config import find_state_configs, load_state_config
+
+
+def build_one(config_path, cache_dir):
+    """Worker entry point: build one state and report a short summary"""
+    # Imported here so the parent process never pays for pandas
+    from aggregate_statewide import build_state
+
+    start = time.perf_counter()
+    config = load_state_config(config_path)
+    output = build_state(config, cache_dir=cache_dir)
+    contests = sum(len(year_data) for year_data in output['results_by_year'].values())
+    return config['state'], config['output'], contests, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build election results for multiple states in parallel')
+    parser.add_argument('configs', nargs='*', help='State config files (default: every file in config/states/)')
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Worker processes (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the shared parsed-file cache')
+    args = parser.parse_args()
+
+    config_paths = [Path(p) for p in args.configs] or find_state_configs()
+    if not config_paths:
+        print("❌ No state configs found")
+        return 1
+
+    cache_dir = None if args.no_cache else CACHE_DIR
+    failures = 0
+    print(f"Building {len(config_paths)} state(s) with {args.workers} worker(s)...")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(build_one, str(path), cache_dir): path for path in config_paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                state, output, contests, elapsed = future.result()
+                print(f"✓ {state}: {contests} contests → {output} ({elapsed:.1f}s)")
+            except Exception as e:
+                failures += 1
+                print(f"❌ {path}: {e}")
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,300 @@
+"""
+Canonical candidate identities across years and sources.
+
+The same person is spelled differently from source to source and year to
+year: 'Joe Donnelly' / 'Joseph Donnelly' / 'JOE DDNNELLY' (PDF OCR),
+'Mitch Daniels' / 'Mitchell E Daniels, Jr.', 'Donald J. Trump & Michael R.
+Pence' (a ticket), 'Christopher Fischer (W/I)'. Every name in the general
+and primary results is reduced to the head of its ticket without write-in
+marks or nicknames, normalized (case, punctuation, initials, suffixes), and
+matched within its party through a trigram index: only names sharing enough
+trigrams are ever compared, so the whole history is canonicalized in one
+pass without comparing every pair.
+
+Two names are the same candidate when their trigram similarity is high,
+when their surnames are near-identical and their first names agree on the
+first two letters ('joe'/'joseph', 'mitch'/'mitchell', 'mike'/'michael'),
+or when one is the other followed by a running mate with no separator. A
+bare surname ('Holcomb / Crouch') joins the party's only full name with that
+surname.
+
+Written into the results JSON under `candidates` by aggregate_statewide.py,
+which also stamps `dem_candidate_id` / `rep_candidate_id` on every county
+record and `candidate_id` on every primary candidate. To rebuild from the
+existing results files:
+    python scripts/candidate_registry.py
+"""
+import argparse
+import re
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from reconcile_sources import NON_CANDIDATES
+from results_table import load_results, write_results
+from state_config import DEFAULT_CONFIG, load_state_config
+
+# Trigram (Dice) similarity above which two full names always match
+NAME_SIMILARITY = 0.8
+# Surname similarity needed for the surname + first-name rule
+SURNAME_SIMILARITY = 0.55
+# Names sharing fewer trigrams than this are never compared
+MIN_SHARED_TRIGRAMS = 3
+
+_TICKET_SEPARATOR = re.compile(r'\s+(?:&|and)\s+|[/\\]', re.IGNORECASE)
+_PARENTHETICAL = re.compile(r'\([^)]*\)')
+_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+
+def display_name(raw):
+    """Head of the ticket without write-in marks or nicknames.
+
+    'Donald J Trump & Jd  Vance' -> 'Donald J Trump',
+    'Woodrow (Woody) Myers & Linda C Lawson' -> 'Woodrow Myers'
+    """
+    name = _TICKET_SEPARATOR.split(str(raw))[0]
+    name = _PARENTHETICAL.sub(' ', name)
+    return ' '.join(name.split()).strip(' ,')
+
+
+def normalize_name(name):
+    """Lowercase name without punctuation, initials or suffixes: 'Mitchell E Daniels, Jr.' -> 'mitchell daniels'"""
+    tokens = re.sub(r"[.,'\"]", ' ', name.lower()).split()
+    kept = [t for t in tokens if t not in _SUFFIXES and len(t) > 1]
+    return ' '.join(kept or tokens)
+
+
+def trigrams(text):
+    """Set of character trigrams of a padded string"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def dice(a, b):
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(a & b) / (len(a) + len(b)) if a or b else 0.0
+
+
+def same_candidate(a, b, shared, grams):
+    """Whether normalized names a and b (sharing `shared` trigrams) are one person"""
+    if 2 * shared / (len(grams[a]) + len(grams[b])) >= NAME_SIMILARITY:
+        return True
+    # A ticket written without a separator: 'jennifer mccormick terry goodin'
+    shorter, longer = sorted((a, b), key=len)
+    if ' ' in shorter and longer.startswith(shorter + ' '):
+        return True
+    first_a, *_, last_a = a.split() if ' ' in a else (a, a)
+    first_b, *_, last_b = b.split() if ' ' in b else (b, b)
+    return first_a[:2] == first_b[:2] and dice(trigrams(last_a), trigrams(last_b)) >= SURNAME_SIMILARITY
+
+
+def match_names(names):
+    """Cluster label for each normalized name, via a blocked trigram index.
+
+    Each name is compared only with the later names that share at least
+    MIN_SHARED_TRIGRAMS trigrams with it. Those are counted from the name's
+    trigram posting lists alone (np.unique over the ids in them), so the
+    work per name follows the names it shares trigrams with, not the total
+    number of names. Matches are merged with union-find.
+    """
+    grams = {name: trigrams(name) for name in names}
+    postings = {}
+    for i, name in enumerate(names):
+        for gram in grams[name]:
+            postings.setdefault(gram, []).append(i)
+    postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+
+    parent = list(range(len(names)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, name in enumerate(names):
+        # Posting lists are in index order, so the later names are each list's tail
+        hits = np.concatenate([ids[np.searchsorted(ids, i, side='right'):] for ids in map(postings.get, grams[name])])
+        others, shared = np.unique(hits, return_counts=True)
+        blocked = shared >= MIN_SHARED_TRIGRAMS
+        for j, count in zip(others[blocked], shared[blocked]):
+            if same_candidate(name, names[j], count, grams):
+                parent[find(j)] = find(i)
+
+    # Surname-only spellings ('Holcomb / Crouch') join the one full name with that surname, if unambiguous
+    surnames = {}
+    for i, name in enumerate(names):
+        if ' ' in name:
+            surnames.setdefault(name.split()[-1], set()).add(find(i))
+    for i, name in enumerate(names):
+        if ' ' not in name and len(surnames.get(name, ())) == 1:
+            parent[find(i)] = next(iter(surnames[name]))
+
+    return [find(i) for i in range(len(names))]
+
+
+def collect_mentions(results_by_year, primaries_by_year=None):
+    """Count every (party, raw name) and the contests it appears in.
+
+    Returns (counts, contests): counts[(party, raw)] is the number of county
+    records naming it; contests[(party, raw)] is the set of ('general' |
+    'primary', year, contest) it appears in.
+    """
+    counts, contests = Counter(), {}
+
+    def add(party, raw, ref):
+        if not raw or raw == 'N/A' or str(raw).strip().lower() in NON_CANDIDATES:
+            return
+        counts[(party, raw)] += 1
+        contests.setdefault((party, raw), set()).add(ref)
+
+    for year, year_data in results_by_year.items():
+        for contest, contest_data in year_data.items():
+            for record in contest_data.values():
+                add('DEM', record.get('dem_candidate'), ('general', year, contest))
+                add('REP', record.get('rep_candidate'), ('general', year, contest))
+
+    for year, year_data in (primaries_by_year or {}).items():
+        for contest, parties in year_data.items():
+            for party, race in parties.items():
+                for record in [race['statewide'], *race['counties'].values()]:
+                    for entry in record['candidates']:
+                        add(party, entry['candidate'], ('primary', year, contest))
+
+    return counts, contests
+
+
+def _capitalized_words(name):
+    """Number of capitalized words ('WELLS', 'McCRAY', not initials) in a name"""
+    return sum(1 for word in name.split() if sum(ch.isupper() for ch in word) > 2)
+
+
+def cluster_candidates(counts):
+    """Group the (party, raw name) keys of `counts` that name the same person.
+
+    Returns {(party, normalized name): [keys]}, one entry per candidate.
+    """
+    normalized = {key: normalize_name(display_name(key[1])) for key in counts}
+    cluster_of = {}
+    for party in sorted({party for party, _ in counts}):
+        names = sorted({norm for (p, _), norm in normalized.items() if p == party})
+        labels = match_names(names)
+        cluster_of.update({(party, name): (party, names[label]) for name, label in zip(names, labels)})
+
+    clusters = {}
+    for key in counts:
+        clusters.setdefault(cluster_of[(key[0], normalized[key])], []).append(key)
+    return clusters
+
+
+def preferred_spelling(keys, counts):
+    """Most common full-name spelling of a cluster, preferring mixed case over capitalized surnames and OCR'd capitals"""
+    spellings = Counter()
+    for key in keys:
+        spellings[display_name(key[1])] += counts[key]
+    return min(spellings, key=lambda s: (' ' not in s, _capitalized_words(s), -spellings[s], len(s)))
+
+
+def registry_candidate_ids(registry):
+    """"PARTY|raw name" -> id map of an existing registry (older ones have no `ids` and take it from by_name)"""
+    if not registry:
+        return {}
+    return dict(registry.get('ids') or registry.get('by_name') or {})
+
+
+def build_candidate_registry(results, primaries=None, known_ids=None):
+    """Registry of every candidate in the general (and primary) results.
+
+    Returns {'candidates': [...], 'by_name': {"PARTY|raw name": id}, 'ids'}.
+    Each candidate has its display name (the most common spelling), party,
+    every raw spelling seen, the contest registry ids of its general-election
+    contests and the "year|contest" keys of its primaries. A candidate keeps
+    the id `known_ids` (see registry_candidate_ids) gives any of its
+    spellings; new candidates get ids after the largest known id. `ids` is
+    `known_ids` plus every spelling seen, so ids are never reused.
+    """
+    contest_ids = results.get('contests', {}).get('by_key', {})
+    counts, mentions = collect_mentions(results['results_by_year'],
+                                        (primaries or {}).get('results_by_year'))
+    clusters = cluster_candidates(counts)
+
+    ids = dict(known_ids or {})
+    next_id = max(ids.values(), default=-1) + 1
+    cluster_ids, taken = {}, set()
+    for cluster in sorted(clusters):
+        known = sorted({ids[f"{party}|{raw}"] for party, raw in clusters[cluster]
+                        if f"{party}|{raw}" in ids} - taken)
+        if known:
+            cluster_ids[cluster] = known[0]
+        else:
+            cluster_ids[cluster] = next_id
+            next_id += 1
+        taken.add(cluster_ids[cluster])
+
+    candidates, by_name = [], {}
+    for cluster in sorted(clusters, key=cluster_ids.get):
+        candidate_id, keys = cluster_ids[cluster], clusters[cluster]
+        refs = set().union(*(mentions[key] for key in keys))
+        general = sorted(contest_ids[f"{year}|{contest}"] for kind, year, contest in refs
+                         if kind == 'general' and f"{year}|{contest}" in contest_ids)
+        candidates.append({
+            'id': candidate_id,
+            'name': preferred_spelling(keys, counts),
+            'party': cluster[0],
+            'aliases': sorted(raw for _, raw in keys),
+            'contests': general,
+            'primaries': sorted(f"{year}|{contest}" for kind, year, contest in refs if kind == 'primary'),
+        })
+        by_name.update({f"{party}|{raw}": candidate_id for party, raw in keys})
+    ids.update(by_name)
+
+    return {'candidates': candidates, 'by_name': by_name, 'ids': ids}
+
+
+def apply_candidate_ids(registry, results=None, primaries=None):
+    """Stamp candidate ids from the registry onto county and primary records"""
+    by_name = registry['by_name']
+    for year_data in (results or {}).get('results_by_year', {}).values():
+        for contest_data in year_data.values():
+            for record in contest_data.values():
+                record['dem_candidate_id'] = by_name.get(f"DEM|{record.get('dem_candidate')}")
+                record['rep_candidate_id'] = by_name.get(f"REP|{record.get('rep_candidate')}")
+
+    for year_data in (primaries or {}).get('results_by_year', {}).values():
+        for parties in year_data.values():
+            for party, race in parties.items():
+                for record in [race['statewide'], *race['counties'].values()]:
+                    for entry in record['candidates']:
+                        entry['candidate_id'] = by_name.get(f"{party}|{entry['candidate']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the candidate registry and stamp candidate ids on the results')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    results_file = Path(config['output'])
+    results = load_results(results_file)
+    primaries_file = config['artifacts'].get('primaries')
+    primaries = load_results(primaries_file) if primaries_file and Path(primaries_file).exists() else None
+
+    registry = build_candidate_registry(results, primaries, registry_candidate_ids(results.get('candidates')))
+    apply_candidate_ids(registry, results, primaries)
+    results['candidates'] = registry
+
+    write_results(results_file, results, indent=2)
+    if primaries is not None:
+        write_results(primaries_file, primaries, indent=2)
+
+    merged = [c for c in registry['candidates'] if len(c['aliases']) > 1]
+    print(f"✓ {len(registry['candidates'])} candidates from {len(registry['by_name'])} spellings")
+    for candidate in merged:
+        print(f"  🔍 {candidate['name']} ({candidate['party']}): {', '.join(candidate['aliases'])}")
+    print(f"✓ Candidate ids written to {results_file}" + (f" and {primaries_file}" if primaries else ''))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""
+Competitiveness scale shared by the pipeline and the validators.
+
+Margins are two-party percentages (R minus D). The absolute margin is binned
+into eight levels and the winner picks the red or blue side of the scale.
+"""
+import numpy as np
+
+COLORS = {
+    'R_ANNIHILATION': '#67000d',
+    'R_DOMINANT': '#a50f15',
+    'R_STRONGHOLD': '#cb181d',
+    'R_SAFE': '#ef3b2c',
+    'R_LIKELY': '#fb6a4a',
+    'R_LEAN': '#fcae91',
+    'R_TILT': '#fee8c8',
+    'TOSSUP': '#f7f7f7',
+    'D_TILT': '#e1f5fe',
+    'D_LEAN': '#c6dbef',
+    'D_LIKELY': '#9ecae1',
+    'D_SAFE': '#6baed6',
+    'D_STRONGHOLD': '#3182bd',
+    'D_DOMINANT': '#08519c',
+    'D_ANNIHILATION': '#08306b'
+}
+
+# Lower bound of each level above Tossup, in margin points
+THRESHOLDS = [0.5, 1, 5.5, 10, 20, 30, 40]
+LEVELS = ['Tossup', 'Tilt', 'Lean', 'Likely', 'Safe', 'Stronghold', 'Dominant', 'Annihilation']
+
+CATEGORIES = {'TOSSUP': 'Tossup'}
+PARTIES = {'TOSSUP': 'Even'}
+for _level in LEVELS[1:]:
+    for _prefix, _party in (('R_', 'Republican'), ('D_', 'Democratic')):
+        CATEGORIES[_prefix + _level.upper()] = _level
+        PARTIES[_prefix + _level.upper()] = _party
+
+# Integer code for every entry in COLORS, for array-based consumers
+CODES = list(COLORS)
+CODE_INDEX = {code: i for i, code in enumerate(CODES)}
+
+# The `competitiveness` entry of a result record, for every code
+INFO = {code: {'category': CATEGORIES[code], 'party': PARTIES[code], 'code': code, 'color': COLORS[code]}
+        for code in CODES}
+
+
+def classify_margins(margin_pct, winner):
+    """Vectorized competitiveness codes for arrays of margins and winners.
+
+    `winner` holds 'REP'/'DEM'/'TIE' strings, as in the results JSON.
+    Returns an object array of codes such as 'R_SAFE' or 'TOSSUP'.
+    """
+    abs_margin = np.abs(np.asarray(margin_pct, dtype=float))
+    level = np.digitize(abs_margin, THRESHOLDS)
+    level_names = np.array([name.upper() for name in LEVELS], dtype=object)
+    prefix = np.where(np.asarray(winner) == 'REP', 'R_', 'D_').astype(object)
+    codes = prefix + level_names[level]
+    codes[level == 0] = 'TOSSUP'
+    return codes
+
+
+# CODE_INDEX of each level for a Republican and a Democratic lead (level 0 is Tossup)
+_R_LEVEL_CODES = np.array([CODE_INDEX['TOSSUP']] + [CODE_INDEX['R_' + name.upper()] for name in LEVELS[1:]])
+_D_LEVEL_CODES = np.array([CODE_INDEX['TOSSUP']] + [CODE_INDEX['D_' + name.upper()] for name in LEVELS[1:]])
+
+
+def margin_code_indices(margin_pct):
+    """Integer competitiveness codes (CODE_INDEX) for an array of R-minus-D margins.
+
+    Same scale as classify_margins, with the winner taken from the margin's
+    sign; works on arrays of any shape without building strings.
+    """
+    margin_pct = np.asarray(margin_pct, dtype=float)
+    level = np.digitize(np.abs(margin_pct), THRESHOLDS)
+    return np.where(margin_pct > 0, _R_LEVEL_CODES[level], _D_LEVEL_CODES[level])
+
+
+def competitiveness_info(margin_pct, winner):
+    """Category, party, code and color of one margin, as stored on each result record"""
+    return dict(INFO[classify_margins([margin_pct], [winner])[0]])
@@ -0,0 +1,134 @@
+"""
+Canonical contest identities across years.
+
+Raw contest keys are source office strings plus the year ('Governor & Lt.
+Governor (2024)', 'President (2016)', 'United States Senator From Indiana,
+Class 1 (2024)'). The registry gives every contest an office type from the
+config's office_types table, a Senate class where relevant, the election
+date, a stable slug ('us_senate_c1_2024') and an integer id, plus an index
+by office type in date order. Cross-year lookups ("the previous Governor
+race") are then integer lookups instead of string matching.
+
+Ids are an append-only slug -> id map (`ids`) carried from one build to the
+next: a contest keeps its id when others are added or dropped, and a new
+contest gets the next unused one. The binary, SQLite and dot-density files
+and the map all index contests by these ids.
+
+Written into the results JSON under `contests` by aggregate_statewide.py.
+"""
+import re
+from datetime import date, timedelta
+
+# Senate seats up in each year of the six-year cycle (class 1 was elected in 2018)
+SENATE_CLASS_BY_CYCLE = {2018 % 6: 1, 2020 % 6: 2, 2022 % 6: 3}
+
+_CLASS_IN_NAME = re.compile(r'class\s+(\d)', re.IGNORECASE)
+
+
+def general_election_date(year):
+    """Date of the November general election: the Tuesday after the first Monday"""
+    first = date(int(year), 11, 1)
+    first_monday = first + timedelta(days=(7 - first.weekday()) % 7)
+    return first_monday + timedelta(days=1)
+
+
+def contest_office(contest_key, year):
+    """Office part of a contest key: 'Governor (2024)' -> 'Governor'"""
+    suffix = f" ({year})"
+    return contest_key[:-len(suffix)] if contest_key.endswith(suffix) else contest_key
+
+
+def contest_office_type(contest_key, year, type_index):
+    """Office type ('governor', 'us_senate', ...) of a contest key, or None"""
+    return type_index.get(contest_office(contest_key, year).strip().lower())
+
+
+def contest_office_types(frame, type_index):
+    """Office type of every row's contest key, falling back to the lowercased office"""
+    lookup = {}
+    for year, contest in frame[['year', 'contest']].drop_duplicates().itertuples(index=False):
+        office = contest_office(contest, year).strip().lower()
+        lookup[(year, contest)] = type_index.get(office, office)
+    return [lookup[key] for key in zip(frame['year'], frame['contest'])]
+
+
+def senate_class(contest_key, year):
+    """Senate class named in the contest key, else the class up that year"""
+    found = _CLASS_IN_NAME.search(contest_key)
+    if found:
+        return int(found.group(1))
+    return SENATE_CLASS_BY_CYCLE.get(int(year) % 6)
+
+
+def contest_slug(contest_key, year, type_index):
+    """Registry slug of a contest key: 'us_senate_c1_2024', 'governor_2024'"""
+    office_type = contest_office_type(contest_key, year, type_index)
+    seat_class = senate_class(contest_key, year) if office_type == 'us_senate' else None
+    slug_type = office_type or re.sub(r'[^a-z0-9]+', '_', contest_office(contest_key, year).lower()).strip('_')
+    return f"{slug_type}_c{seat_class}_{year}" if seat_class else f"{slug_type}_{year}"
+
+
+def registry_ids(registry):
+    """Slug -> id map of an existing registry (older ones have no `ids` and take it from their contests)"""
+    if not registry:
+        return {}
+    return dict(registry.get('ids') or {c['slug']: c['id'] for c in registry.get('contests', [])})
+
+
+def build_contest_registry(results_by_year, config, type_index, known_ids=None):
+    """Registry of every contest in results_by_year.
+
+    Returns {'office_types', 'contests', 'by_key', 'by_office_type', 'ids'}:
+    `contests` is ordered by election date then office type; `by_office_type`
+    lists ids in date order and each contest carries the id of the previous
+    contest of its office type. Ids come from `known_ids` (slug -> id, see
+    registry_ids) where the slug has one, else are assigned in date order
+    after the largest known id. Two contests with one slug raise ValueError.
+    """
+    office_order = list(config['office_types'])
+    labels = {office_type: names[0] for office_type, names in config['office_types'].items()}
+
+    entries, by_slug = [], {}
+    for year, year_data in results_by_year.items():
+        election_date = general_election_date(year).isoformat()
+        for contest in year_data:
+            office_type = contest_office_type(contest, year, type_index)
+            seat_class = senate_class(contest, year) if office_type == 'us_senate' else None
+            slug = contest_slug(contest, year, type_index)
+            if slug in by_slug:
+                raise ValueError(f"Contests '{by_slug[slug]}' and '{contest}' are both {slug}; "
+                                 f"alias one office to the other in the state config")
+            by_slug[slug] = contest
+            entries.append({
+                'slug': slug,
+                'contest': contest,
+                'year': str(year),
+                'date': election_date,
+                'election': 'general',
+                'office_type': office_type,
+                'office': labels.get(office_type, contest_office(contest, year)),
+                'senate_class': seat_class,
+            })
+
+    rank = {office_type: i for i, office_type in enumerate(office_order)}
+    entries.sort(key=lambda e: (e['date'], rank.get(e['office_type'], len(rank)), e['contest']))
+
+    ids = dict(known_ids or {})
+    next_id = max(ids.values(), default=-1) + 1
+    by_office_type = {}
+    for entry in entries:
+        if entry['slug'] not in ids:
+            ids[entry['slug']] = next_id
+            next_id += 1
+        entry['id'] = ids[entry['slug']]
+        office_ids = by_office_type.setdefault(entry['office_type'] or 'other', [])
+        entry['previous'] = office_ids[-1] if office_ids else None
+        office_ids.append(entry['id'])
+
+    return {
+        'office_types': {office_type: labels[office_type] for office_type in office_order},
+        'contests': entries,
+        'by_key': {f"{e['year']}|{e['contest']}": e['id'] for e in entries},
+        'by_office_type': by_office_type,
+        'ids': ids,
+    }
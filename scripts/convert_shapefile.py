@@ -1,40 +1,87 @@
 """
-Convert Indiana counties shapefile to GeoJSON format
+Convert the county shapefile to GeoJSON for the map.
+
+Reads the config's `geometry.shapefile` with the NumPy reader in
+shapefile_reader.py (no GDAL or geopandas needed), reprojects to WGS84 and
+writes `geometry.geojson`. `--backend geopandas` reads and writes through
+geopandas instead, when it is installed.
+
+Usage:
+    python scripts/convert_shapefile.py
+    python scripts/convert_shapefile.py --backend geopandas
 """
-import geopandas as gpd
-import json
+import argparse
+import time
 from pathlib import Path
 
-# Paths
-input_shp = Path('data/tl_2020_18_county20/tl_2020_18_county20.shp')
-output_geojson = Path('data/tl_2020_18_county20.geojson')
-
-print(f"Reading shapefile: {input_shp}")
-# Read the shapefile
-gdf = gpd.read_file(input_shp)
-
-# Display info about the data
-print(f"\nShapefile Info:")
-print(f"  - Number of counties: {len(gdf)}")
-print(f"  - CRS: {gdf.crs}")
-print(f"  - Columns: {list(gdf.columns)}")
-
-# Reproject to WGS84 (EPSG:4326) for web mapping
-if gdf.crs != "EPSG:4326":
-    print(f"\nReprojecting from {gdf.crs} to EPSG:4326 (WGS84)...")
-    gdf = gdf.to_crs("EPSG:4326")
-
-# Show sample of county names
-print(f"\nSample county names:")
-name_col = 'NAME' if 'NAME' in gdf.columns else 'NAMELSAD' if 'NAMELSAD' in gdf.columns else gdf.columns[0]
-print(gdf[name_col].head(10).tolist())
-
-# Export to GeoJSON
-print(f"\nExporting to GeoJSON: {output_geojson}")
-gdf.to_file(output_geojson, driver='GeoJSON')
-
-# Verify the output
-print(f"\n✓ GeoJSON created successfully!")
-print(f"  - Feature count: {len(gdf)}")
-print(f"  - File size: {output_geojson.stat().st_size / 1024:.2f} KB")
-print(f"  - Output: {output_geojson.absolute()}")
+from shapefile_reader import crs_name, read_prj, read_shapefile, write_geojson
+from state_config import DEFAULT_CONFIG, load_state_config
+
+BACKENDS = ['numpy', 'geopandas']
+
+
+def convert_numpy(input_shp, output_geojson):
+    """Convert with shapefile_reader; returns (feature count, properties columns, sample names)"""
+    print(f"  - CRS: {crs_name(read_prj(input_shp.with_suffix('.prj')))}")
+    collection = read_shapefile(input_shp)
+    write_geojson(collection, output_geojson)
+    properties = [f['properties'] for f in collection['features']]
+    return len(properties), list(properties[0]) if properties else [], properties
+
+
+def convert_geopandas(input_shp, output_geojson):
+    """Convert with geopandas; returns (feature count, properties columns, sample names)"""
+    import geopandas as gpd
+
+    gdf = gpd.read_file(input_shp)
+    print(f"  - CRS: {gdf.crs}")
+    # Reproject to WGS84 (EPSG:4326) for web mapping
+    if gdf.crs != "EPSG:4326":
+        print(f"  - Reprojecting from {gdf.crs} to EPSG:4326 (WGS84)...")
+        gdf = gdf.to_crs("EPSG:4326")
+    gdf.to_file(output_geojson, driver='GeoJSON')
+    columns = [c for c in gdf.columns if c != 'geometry']
+    return len(gdf), columns, gdf[columns].to_dict('records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert the county shapefile to GeoJSON')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--backend', choices=BACKENDS, default='numpy', help='Shapefile reader (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    input_shp = Path(config['geometry']['shapefile'])
+    output_geojson = Path(config['geometry']['geojson'])
+    if not input_shp.exists():
+        print(f"❌ Error: {input_shp} not found")
+        return 1
+
+    print(f"Reading shapefile: {input_shp} ({args.backend})")
+    start = time.perf_counter()
+    try:
+        if args.backend == 'geopandas':
+            count, columns, records = convert_geopandas(input_shp, output_geojson)
+        else:
+            count, columns, records = convert_numpy(input_shp, output_geojson)
+    except ImportError:
+        print("❌ Error: the geopandas backend needs geopandas (pip install geopandas), or use --backend numpy")
+        return 1
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    print(f"  - Number of counties: {count}")
+    print(f"  - Columns: {columns}")
+    name_col = config['geometry'].get('name_field', 'NAME20')
+    print(f"  - Sample county names: {[r.get(name_col) for r in records[:10]]}")
+
+    print(f"\n✓ GeoJSON created in {time.perf_counter() - start:.2f}s")
+    print(f"  - Feature count: {count}")
+    print(f"  - File size: {output_geojson.stat().st_size / 1024:.2f} KB")
+    print(f"  - Output: {output_geojson.absolute()}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+"""
+Canonical county registry keyed by Census GEOID.
+
+The registry is built once from the state's county GeoJSON (GEOID20 and
+NAME20 by default) plus the `county_aliases` table in the state config.
+Every county gets a small integer id (its position in GEOID order), so the
+pipeline can resolve a whole column of raw county names to ids in one step
+and the map can join on GEOID20 or the exact NAME20 string.
+"""
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def county_key(name):
+    """Spelling-insensitive lookup key: 'La Porte County' -> 'laporte'"""
+    key = _NON_ALNUM.sub('', str(name).lower())
+    if key.endswith('county') and len(key) > len('county'):
+        key = key[:-len('county')]
+    return key
+
+
+class CountyRegistry:
+    """GEOID-ordered list of counties with an alias-aware name index"""
+
+    def __init__(self, geoids, names, aliases=None):
+        order = np.argsort(np.asarray(geoids, dtype=str), kind='stable')
+        self.geoids = np.asarray(geoids, dtype=str)[order]
+        self.names = np.asarray(names, dtype=object)[order]
+        self.ids = np.arange(len(self.geoids), dtype=np.int32)
+
+        self._index = {}
+        for county_id, (geoid, name) in enumerate(zip(self.geoids, self.names)):
+            self._index[county_key(name)] = county_id
+            self._index[geoid] = county_id
+        for alias, canonical in (aliases or {}).items():
+            target = self._index.get(county_key(canonical))
+            if target is None:
+                raise ValueError(f"County alias '{alias}' points at unknown county '{canonical}'")
+            self._index[county_key(alias)] = target
+
+    def __len__(self):
+        return len(self.geoids)
+
+    @classmethod
+    def from_geojson(cls, geojson_path, geoid_field='GEOID20', name_field='NAME20', aliases=None):
+        """Build the registry from a county GeoJSON file"""
+        with open(geojson_path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        geoids = [feat['properties'][geoid_field] for feat in features]
+        names = [feat['properties'][name_field] for feat in features]
+        return cls(geoids, names, aliases)
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the registry described by a state config's geometry section"""
+        geometry = config['geometry']
+        return cls.from_geojson(
+            Path(geometry['geojson']),
+            geometry.get('geoid_field', 'GEOID20'),
+            geometry.get('name_field', 'NAME20'),
+            config.get('county_aliases'),
+        )
+
+    def lookup(self, name):
+        """Resolve a single raw county name or GEOID; -1 if unknown"""
+        if name is None or (isinstance(name, float) and np.isnan(name)):
+            return -1
+        return self._index.get(county_key(name), -1)
+
+    def resolve(self, values):
+        """Resolve a column of raw county names to ids (-1 for unknown).
+
+        The column is factorized first, so the string normalization runs once
+        per distinct spelling rather than once per row.
+        """
+        codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+        unique_ids = np.fromiter((self.lookup(u) for u in uniques), dtype=np.int32, count=len(uniques))
+        # Append -1 so the NA sentinel (code -1) indexes it
+        return np.append(unique_ids, np.int32(-1))[codes]
+
+    def to_records(self):
+        """Registry rows for the output metadata"""
+        return [
+            {'id': int(i), 'geoid': str(g), 'name': str(n)}
+            for i, g, n in zip(self.ids, self.geoids, self.names)
+        ]
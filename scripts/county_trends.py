@@ -0,0 +1,97 @@
+"""
+Per-county historical trend series.
+
+For every county id, lists every statewide contest in date order with its
+margin, two-party share, turnout (total votes) and the swing since the prior
+contest for the same office type in that county. The map's sidebar and hover
+tooltips read a county's series with one keyed lookup instead of scanning
+the full results.
+
+Written by aggregate_statewide.py next to the results JSON; can also be
+rebuilt from an existing results file:
+    python scripts/county_trends.py
+"""
+import argparse
+
+import numpy as np
+
+from contest_registry import contest_office_types, general_election_date
+from results_table import load_results, results_to_frame, write_results
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index
+
+TREND_FIELDS = ['contest_id', 'year', 'date', 'contest', 'office_type', 'dem_votes', 'rep_votes', 'total_votes',
+                'margin', 'margin_pct', 'dem_share', 'rep_share', 'winner', 'prior_year', 'swing',
+                'turnout_change_pct']
+
+
+def build_county_trends(results, type_index):
+    """Build the trends artifact from a results dict (meta + results_by_year)"""
+    frame = results_to_frame(results['results_by_year'])
+    counties = results.get('meta', {}).get('counties') or []
+
+    frame['office_type'] = contest_office_types(frame, type_index)
+    dates = {y: general_election_date(y).isoformat() for y in frame['year'].unique()}
+    frame['date'] = frame['year'].map(dates)
+    # Integer ids from the contest registry, when the results carry one
+    contest_ids = results.get('contests', {}).get('by_key', {})
+    frame['contest_id'] = (frame['year'] + '|' + frame['contest']).map(contest_ids)
+
+    two_party = frame['two_party_total'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['dem_share'] = np.where(two_party > 0, np.round(frame['dem_votes'] / two_party * 100, 2), np.nan)
+        frame['rep_share'] = np.where(two_party > 0, np.round(frame['rep_votes'] / two_party * 100, 2), np.nan)
+
+    # Swing and turnout change against the previous contest for the same office in the county
+    frame = frame.sort_values(['county_id', 'office_type', 'date'], kind='stable')
+    prior = frame.groupby(['county_id', 'office_type'], sort=False)
+    frame['prior_year'] = prior['year'].shift()
+    frame['swing'] = (frame['margin_pct'] - prior['margin_pct'].shift()).round(2)
+    prior_total = prior['total_votes'].shift()
+    frame['turnout_change_pct'] = ((frame['total_votes'] - prior_total) / prior_total * 100).round(2)
+
+    frame = frame.sort_values(['county_id', 'date', 'office_type'], kind='stable')
+    rows = frame[TREND_FIELDS].astype(object).where(frame[TREND_FIELDS].notna(), None)
+
+    series = {}
+    for county_id, records in zip(frame['county_id'], rows.to_dict('records')):
+        series.setdefault(int(county_id), []).append(records)
+
+    return {
+        'meta': {
+            'state': results.get('meta', {}).get('state'),
+            'fields': TREND_FIELDS,
+            'margin_convention': 'margin and margin_pct are Republican minus Democratic; swing > 0 is toward Republicans',
+        },
+        'counties': {
+            str(c['id']): {'geoid': c['geoid'], 'name': c['name'], 'series': series.get(c['id'], [])}
+            for c in counties
+        },
+    }
+
+
+def write_county_trends(results, config, output_file):
+    """Build the trends artifact for a state and write it"""
+    trends = build_county_trends(results, office_type_index(config))
+    write_results(output_file, trends, separators=(',', ':'))
+    return trends
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build per-county historical trend series')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    output_file = config['artifacts'].get('trends')
+    if not output_file:
+        print(f"❌ Error: {args.config} has no artifacts.trends path")
+        return 1
+
+    trends = write_county_trends(load_results(config['output']), config, output_file)
+    rows = sum(len(c['series']) for c in trends['counties'].values())
+    print(f"✓ Trend series for {len(trends['counties'])} counties ({rows} rows) saved to {output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+"""
+Re-aggregate statewide contests onto other geographies.
+
+A crosswalk is a weight table assigning each county (or precinct) to one or
+more districts:
+
+    county,district,weight                  county,precinct,district,weight
+    Lake,1,1.0                              Marion,Center 01,7,1.0
+    Hamilton,5,0.62                         Marion,Center 02,7,0.4
+    Hamilton,4,0.38                         Marion,Center 02,8,0.6
+
+`county` may be a name or GEOID. Weights are the share of a unit's votes
+that land in the district. The table is held in sparse (COO) form and every
+contest's contest x unit x vote-column array is projected onto districts in
+one batched scatter-add, so re-aggregating all contests onto a new map is a
+single operation. County tables project the results JSON; precinct tables
+project the precinct source files.
+
+Output uses the results JSON schema with districts in place of counties.
+
+Usage:
+    python scripts/crosswalk.py --weights cd_2022_county.csv --output data/indiana_cd_2022_results.json
+    python scripts/crosswalk.py --crosswalk congressional_2022   # entry in the config's crosswalks section
+"""
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_cache import CACHE_DIR, cached_read_csv
+from competitiveness import CATEGORIES, COLORS, PARTIES, classify_margins
+from contest_registry import contest_office_types
+from county_registry import CountyRegistry
+from reconcile_sources import NON_CANDIDATES, total_rows
+from results_table import contest_vote_arrays, load_results, results_to_frame, write_results
+from rollups import top_candidates
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index, source_files
+
+PROJECTED_VOTES = ['dem_votes', 'rep_votes', 'other_votes']
+
+
+def precinct_key(values):
+    """Spacing/case-insensitive precinct name"""
+    return pd.Series(values).astype(str).str.strip().str.upper().str.replace(r'\s+', ' ', regex=True)
+
+
+class Crosswalk:
+    """Sparse unit -> district weight table"""
+
+    def __init__(self, units, districts, rows, cols, weights):
+        self.units = units          # unit keys, column order of the vote arrays
+        self.districts = districts  # district labels, row order of the output
+        self.rows = rows            # district index of each nonzero
+        self.cols = cols            # unit index of each nonzero
+        self.weights = weights
+
+    @property
+    def level(self):
+        return 'precinct' if isinstance(self.units, pd.MultiIndex) else 'county'
+
+    @classmethod
+    def from_csv(cls, path, registry):
+        """Load a county- or precinct-level weight table"""
+        table = pd.read_csv(path, dtype={'county': str, 'precinct': str, 'district': str})
+        missing = {'county', 'district', 'weight'} - set(table.columns)
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+
+        county_ids = registry.resolve(table['county'].str.strip())
+        unknown = sorted(set(table.loc[county_ids < 0, 'county']))
+        if unknown:
+            print(f"  Warning: {len(unknown)} unknown counties in {Path(path).name} (e.g. {', '.join(unknown[:5])})")
+        table = table[county_ids >= 0].assign(county_id=county_ids[county_ids >= 0])
+
+        district_codes, districts = pd.factorize(table['district'].str.strip(), sort=True)
+        if 'precinct' in table.columns:
+            units = pd.MultiIndex.from_arrays([table['county_id'], precinct_key(table['precinct']).to_numpy()],
+                                              names=['county_id', 'precinct']).unique()
+            cols = units.get_indexer(pd.MultiIndex.from_arrays(
+                [table['county_id'], precinct_key(table['precinct']).to_numpy()]))
+        else:
+            units = np.arange(len(registry))
+            cols = table['county_id'].to_numpy()
+
+        weights = table['weight'].astype(float).to_numpy()
+        totals = np.bincount(cols, weights=weights, minlength=len(units))
+        over = np.count_nonzero(totals > 1 + 1e-6)
+        if over:
+            print(f"  Warning: {over} units in {Path(path).name} have weights summing above 1")
+        return cls(units, list(districts), district_codes.astype(np.int64), cols.astype(np.int64), weights)
+
+    def project(self, votes):
+        """Project a contest x unit x column array onto contest x district x column"""
+        out = np.zeros((votes.shape[0], len(self.districts), votes.shape[2]), dtype=float)
+        np.add.at(out, (slice(None), self.rows), votes[:, self.cols, :] * self.weights[None, :, None])
+        return largest_remainder(out)
+
+
+def largest_remainder(values):
+    """Round along the last axis so each row sums to its own rounded total.
+
+    Every value is floored, then the units lost to flooring go to the values
+    with the largest fractional parts.
+    """
+    floors = np.floor(values)
+    fractions = values - floors
+    short = (np.rint(values.sum(axis=-1)) - floors.sum(axis=-1)).astype(np.int64)
+    rank = np.argsort(np.argsort(-fractions, axis=-1, kind='stable'), axis=-1)
+    return floors.astype(np.int64) + (rank < short[..., None])
+
+
+def precinct_vote_arrays(config, results_by_year, crosswalk, cache_dir=CACHE_DIR):
+    """contest x precinct x column votes, read from the precinct source files.
+
+    Precinct offices are matched to the results' contest keys by office type,
+    and rows for precincts not in the crosswalk are dropped.
+    """
+    type_index = office_type_index(config)
+    registry = CountyRegistry.from_config(config)
+    frame = results_to_frame(results_by_year)[['year', 'contest']].drop_duplicates()
+    frame['office_type'] = contest_office_types(frame, type_index)
+    contest_by_type = {(y, t): f'{y}|{c}' for y, c, t in frame.itertuples(index=False)}
+    contests = list(contest_by_type.values())
+    votes = np.zeros((len(contests), len(crosswalk.units), len(PROJECTED_VOTES)), dtype=np.int64)
+
+    for year in sorted(set(frame['year'])):
+        files = source_files(config, 'precinct', year)
+        if not files:
+            continue
+        df = pd.concat([cached_read_csv(f, cache_dir) for f in files], ignore_index=True)
+        # Hendricks 2024 files its county totals under a real precinct's name
+        df = df[~total_rows(df)]
+        contest_for_type = {t: key for (y, t), key in contest_by_type.items() if y == year}
+        keys = df['office'].astype(str).str.strip().str.lower().map(type_index).map(contest_for_type)
+        party = df['party'].astype(str).str.strip().str.upper().map(config['party_aliases'])
+        unit = crosswalk.units.get_indexer(pd.MultiIndex.from_arrays(
+            [registry.resolve(df['county'].astype(str).str.strip()), precinct_key(df['precinct']).to_numpy()]))
+        keep = (keys.notna() & (unit >= 0)
+                & ~df['candidate'].astype(str).str.strip().str.lower().isin(NON_CANDIDATES)).to_numpy()
+
+        n = pd.to_numeric(df['votes'], errors='coerce').fillna(0).astype('int64').to_numpy()
+        column = np.select([party == 'DEM', party == 'REP'], [0, 1], default=2)
+        contest_idx = pd.Index(contests).get_indexer(keys[keep])
+        np.add.at(votes, (contest_idx, unit[keep], column[keep]), n[keep])
+
+    return contests, votes
+
+
+def build_district_results(config, results, crosswalk, geography, cache_dir=CACHE_DIR):
+    """Project every contest onto the crosswalk's districts, in the results JSON schema"""
+    results_by_year = results['results_by_year']
+    if crosswalk.level == 'county':
+        contests, votes = contest_vote_arrays(results_to_frame(results_by_year), len(crosswalk.units), PROJECTED_VOTES)
+    else:
+        contests, votes = precinct_vote_arrays(config, results_by_year, crosswalk, cache_dir)
+
+    projected = crosswalk.project(votes)
+    dem, rep, other = (projected[..., i] for i in range(len(PROJECTED_VOTES)))
+    total = dem + rep + other
+    two_party = dem + rep
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin_pct = np.where(two_party > 0, np.round((rep - dem) / two_party * 100, 2), 0.0)
+    winner = np.where(two_party > 0, np.where(rep > dem, 'REP', 'DEM'), 'TIE')
+    codes = classify_margins(margin_pct.ravel(), winner.ravel()).reshape(margin_pct.shape)
+
+    candidates = top_candidates(results_by_year)
+    output = {}
+    for c, key in enumerate(contests):
+        year, contest = key.split('|', 1)
+        dem_candidate, rep_candidate = candidates.get((year, contest), (None, None))
+        contest_results = {}
+        for d, district in enumerate(crosswalk.districts):
+            if total[c, d] == 0:
+                continue
+            code = codes[c, d]
+            contest_results[district] = {
+                'district': district, 'contest': contest, 'year': year,
+                'dem_candidate': dem_candidate or 'N/A', 'rep_candidate': rep_candidate or 'N/A',
+                'dem_votes': int(dem[c, d]), 'rep_votes': int(rep[c, d]),
+                'other_votes': int(other[c, d]), 'total_votes': int(total[c, d]),
+                'two_party_total': int(two_party[c, d]), 'margin': int(rep[c, d] - dem[c, d]),
+                'margin_pct': float(margin_pct[c, d]), 'winner': str(winner[c, d]),
+                'competitiveness': {'category': CATEGORIES[code], 'party': PARTIES[code],
+                                    'code': code, 'color': COLORS[code]},
+            }
+        if contest_results:
+            output.setdefault(year, {})[contest] = contest_results
+
+    return {
+        'meta': {
+            'state': config['state'],
+            'geography': geography,
+            'level': crosswalk.level,
+            'districts': crosswalk.districts,
+            'years_covered': sorted(output),
+            'processed_date': datetime.now().strftime("%Y-%m-%d"),
+        },
+        'results_by_year': output,
+    }
+
+
+def write_district_results(config, results, weights_file, output_file, geography, cache_dir=CACHE_DIR):
+    """Load a weight table, project every contest and write the district results"""
+    crosswalk = Crosswalk.from_csv(weights_file, CountyRegistry.from_config(config))
+    district_results = build_district_results(config, results, crosswalk, geography, cache_dir)
+    write_results(output_file, district_results, indent=2)
+    return district_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Project statewide contests onto districts through a weight table')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--crosswalk', help='Name of an entry in the config crosswalks section')
+    parser.add_argument('--weights', help='Weight table CSV (county[,precinct],district,weight)')
+    parser.add_argument('--output', help='Output JSON')
+    parser.add_argument('--no-cache', action='store_true', help='Re-read precinct files instead of using .cache/')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    if args.crosswalk:
+        entry = config['crosswalks'].get(args.crosswalk)
+        if entry is None:
+            print(f"❌ Error: no crosswalk named '{args.crosswalk}' in {args.config}")
+            return 1
+        weights_file, output_file, geography = entry['weights'], entry['output'], args.crosswalk
+    elif args.weights and args.output:
+        weights_file, output_file, geography = args.weights, args.output, Path(args.weights).stem
+    else:
+        parser.error('give --crosswalk, or both --weights and --output')
+
+    district_results = write_district_results(
+        config, load_results(config['output']), weights_file, output_file, geography,
+        cache_dir=None if args.no_cache else CACHE_DIR)
+    contests = sum(len(v) for v in district_results['results_by_year'].values())
+    print(f"✓ Projected {contests} contests onto {len(district_results['meta']['districts'])} districts")
+    print(f"✓ District results saved to {output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
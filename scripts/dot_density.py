@@ -0,0 +1,242 @@
+"""
+Dot-density layer: one dot per N votes per party, placed inside each county.
+
+Each county gets one pool of uniformly random points, drawn by vectorized
+rejection sampling: a batch of candidates in every county's bounding box
+(oversampled by the county's share of its box) is resolved with one
+PolygonIndex lookup, and the hits for the right county are kept until each
+pool is full. A contest takes the first round(votes / N) points of each
+county's pool for Democrats, the next ones for Republicans, then others, so
+every contest is a few array gathers and dots stay in place from one
+contest to the next.
+
+Layout: the binary_results.py container with magic b'INDD'. The header has
+the bounding box, votes per dot, party names and colors, and each contest's
+[start, start + count) slice of the dot arrays:
+    x, y    uint16 positions quantized to the bounding box (~6 m)
+    party   uint8 index into the header parties
+Dots within a contest are shuffled so no party is always drawn on top.
+
+Usage:
+    python scripts/dot_density.py
+    python scripts/dot_density.py --votes-per-dot 25 --contest president_2024 governor_2024
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from binary_results import BinaryResults, build_arrays, map_binary, write_binary
+from competitiveness import COLORS
+from results_table import load_results
+from spatial_index import PolygonIndex
+from state_config import DEFAULT_CONFIG, load_state_config
+
+MAGIC = b'INDD'
+DEFAULT_VOTES_PER_DOT = 100
+PARTIES = ['dem', 'rep', 'other']
+PARTY_COLORS = [COLORS['D_DOMINANT'], COLORS['R_DOMINANT'], '#737373']
+# Quantization steps across the bounding box
+GRID = 65535
+# Extra candidates drawn per rejection round, on top of the expected need
+OVERSAMPLE = 1.2
+
+
+def feature_geometry(index):
+    """Bounding box (features x 4) and area of every indexed feature"""
+    count = len(index.ids)
+    boxes = np.tile([np.inf, np.inf, -np.inf, -np.inf], (count, 1))
+    np.minimum.at(boxes[:, 0], index.part_feature, index.boxes[:, 0])
+    np.minimum.at(boxes[:, 1], index.part_feature, index.boxes[:, 1])
+    np.maximum.at(boxes[:, 2], index.part_feature, index.boxes[:, 2])
+    np.maximum.at(boxes[:, 3], index.part_feature, index.boxes[:, 3])
+
+    # Shoelace over every ring edge; holes run the other way and subtract
+    x0, y0, x1, y1 = index.edges.T
+    signed = np.bincount(index.part_feature[index.edge_part], weights=x0 * y1 - x1 * y0, minlength=count) / 2
+    return boxes, np.abs(signed)
+
+
+def sample_pools(index, sizes, rng):
+    """Uniform random points inside each feature, `sizes[feature]` of them.
+
+    Returns (x, y, start): feature f's points are x/y[start[f]:start[f] + sizes[f]].
+    """
+    boxes, areas = feature_geometry(index)
+    box_areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    fill = np.clip(np.divide(areas, box_areas, out=np.zeros_like(areas), where=box_areas > 0), 0.05, 1)
+
+    features, xs, ys = [], [], []
+    have = np.zeros(len(sizes), dtype=np.int64)
+    while (remaining := sizes - have).any():
+        draws = np.where(remaining > 0, np.ceil(remaining / fill * OVERSAMPLE).astype(np.int64) + 16, 0)
+        feature = np.repeat(np.arange(len(sizes)), draws)
+        x = rng.uniform(boxes[feature, 0], boxes[feature, 2])
+        y = rng.uniform(boxes[feature, 1], boxes[feature, 3])
+        hit = np.flatnonzero(index.lookup(x, y) == feature)
+
+        # Keep each feature's hits up to what it still needs
+        hit_feature = feature[hit]
+        first = np.searchsorted(hit_feature, np.arange(len(sizes)))
+        rank = np.arange(len(hit)) - first[hit_feature]
+        keep = hit[rank < remaining[hit_feature]]
+        features.append(feature[keep])
+        xs.append(x[keep])
+        ys.append(y[keep])
+        have += np.bincount(feature[keep], minlength=len(sizes))
+
+    order = np.argsort(np.concatenate(features), kind='stable')
+    start = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    return np.concatenate(xs)[order], np.concatenate(ys)[order], start
+
+
+def dot_counts(votes, votes_per_dot):
+    """Dots per contest x county x party from {column: contest x county votes}"""
+    stacked = np.stack([np.asarray(votes[f'{party}_votes'], dtype=float) for party in PARTIES], axis=-1)
+    return np.rint(np.maximum(stacked, 0) / votes_per_dot).astype(np.int64)
+
+
+def build_dots(index, feature_of_county, counts, rng):
+    """Dot arrays for every contest.
+
+    counts is contest x county x party; feature_of_county maps each county
+    (column) to its index feature, -1 for counties without geometry. Returns
+    (lon, lat, party, contest start, contest count).
+    """
+    counts = np.where((feature_of_county >= 0)[None, :, None], counts, 0)
+    per_county = counts.sum(axis=2)
+    sizes = np.zeros(len(index.ids), dtype=np.int64)
+    np.maximum.at(sizes, feature_of_county[feature_of_county >= 0], per_county.max(axis=0)[feature_of_county >= 0])
+    pool_x, pool_y, pool_start = sample_pools(index, sizes, rng)
+
+    # One group per (contest, county, party), in that order; each takes the next points of its county's pool
+    flat = counts.reshape(-1)
+    group = np.repeat(np.arange(len(flat)), flat)
+    within = np.arange(len(group)) - np.repeat(np.cumsum(flat) - flat, flat)
+    party_offset = (np.cumsum(counts, axis=2) - counts).reshape(-1)
+    county = (group // len(PARTIES)) % counts.shape[1]
+    point = pool_start[feature_of_county[county]] + party_offset[group] + within
+    party = (group % len(PARTIES)).astype(np.uint8)
+
+    # Shuffle within each contest: contest index plus a random fraction sorts contests apart
+    contest_count = per_county.sum(axis=1)
+    contest = group // (counts.shape[1] * len(PARTIES))
+    order = np.argsort(contest + rng.random(len(group)))
+    contest_start = np.concatenate([[0], np.cumsum(contest_count)[:-1]])
+    return pool_x[point[order]], pool_y[point[order]], party[order], contest_start, contest_count
+
+
+def quantize(lon, lat, bbox):
+    x = np.rint((lon - bbox[0]) / (bbox[2] - bbox[0]) * GRID).astype(np.uint16)
+    y = np.rint((lat - bbox[1]) / (bbox[3] - bbox[1]) * GRID).astype(np.uint16)
+    return x, y
+
+
+def county_votes(config):
+    """(counties, contests, {column: contest x county votes}) from the binary results, else the JSON"""
+    binary, output = config['artifacts'].get('binary'), Path(config['output'])
+    if binary and Path(binary).exists() and Path(binary).stat().st_mtime >= output.stat().st_mtime:
+        results = BinaryResults(binary)
+        return results.header['counties'], results.header['contests'], results.arrays
+    results = load_results(output)
+    counties = results['meta'].get('counties') or []
+    contests = [{'id': c['id'], 'key': f"{c['year']}|{c['contest']}", 'slug': c['slug']}
+                for c in results['contests']['contests']]
+    return counties, contests, build_arrays(results)
+
+
+def write_dot_density(config, path, votes_per_dot=DEFAULT_VOTES_PER_DOT, contests=None, seed=0):
+    """Build and write the dot layer for all (or the named) contests; returns the header"""
+    geometry = config['geometry']
+    index = PolygonIndex.from_geojson(geometry['geojson'], geometry.get('geoid_field', 'GEOID20'))
+    counties, registry, votes = county_votes(config)
+
+    feature_by_geoid = {geoid: i for i, geoid in enumerate(index.ids)}
+    feature_of_county = np.array([feature_by_geoid.get(c['geoid'], -1) for c in counties], dtype=np.int64)
+    missing = [c['name'] for c, f in zip(counties, feature_of_county) if f < 0]
+    if missing:
+        print(f"⚠️  No geometry for {', '.join(missing)}; their votes get no dots")
+
+    if contests:
+        by_name = {c['slug']: c for c in registry} | {c['key']: c for c in registry}
+        unknown = [name for name in contests if name not in by_name]
+        if unknown:
+            raise ValueError(f"Unknown contest {', '.join(unknown)} (use a registry slug or 'year|contest')")
+        registry = [by_name[name] for name in contests]
+    rows = [c['id'] for c in registry]
+
+    counts = dot_counts({f'{party}_votes': np.asarray(votes[f'{party}_votes'])[rows] for party in PARTIES},
+                        votes_per_dot)
+    lon, lat, party, start, count = build_dots(index, feature_of_county, counts, np.random.default_rng(seed))
+
+    bbox = [float(v) for v in index.tree.levels[0][0]]
+    x, y = quantize(lon, lat, bbox)
+    header = {
+        'state': config['state'],
+        'votes_per_dot': votes_per_dot,
+        'seed': seed,
+        'bbox': bbox,
+        'parties': PARTIES,
+        'colors': PARTY_COLORS,
+        'contests': [{'id': c['id'], 'key': c['key'], 'slug': c['slug'], 'start': int(s), 'count': int(n)}
+                     for c, s, n in zip(registry, start, count)],
+    }
+    return write_binary(path, header, {'x': x, 'y': y, 'party': party}, magic=MAGIC)
+
+
+class DotLayer:
+    """Read-only view of a dot-density file"""
+
+    def __init__(self, path):
+        self.header, self.arrays = map_binary(path, magic=MAGIC)
+        self._contests = {c['slug']: c for c in self.header['contests']}
+        self._contests.update({c['key']: c for c in self.header['contests']})
+
+    def contest(self, contest):
+        """(lon, lat, party index) arrays of one contest's dots"""
+        if contest not in self._contests:
+            raise ValueError(f"No dots for contest '{contest}'")
+        entry = self._contests[contest]
+        dots = slice(entry['start'], entry['start'] + entry['count'])
+        minx, miny, maxx, maxy = self.header['bbox']
+        lon = minx + self.arrays['x'][dots] / GRID * (maxx - minx)
+        lat = miny + self.arrays['y'][dots] / GRID * (maxy - miny)
+        return lon, lat, np.asarray(self.arrays['party'][dots])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the dot-density layer (one dot per N votes per party)')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--votes-per-dot', type=int, default=DEFAULT_VOTES_PER_DOT,
+                        help='Votes each dot stands for (default: %(default)s)')
+    parser.add_argument('--contest', nargs='*', help='Only these contests (registry slug or year|contest)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: %(default)s)')
+    parser.add_argument('--output', help='Output file (default: the config artifacts.dots)')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    output = args.output or config['artifacts'].get('dots')
+    if not output:
+        print("❌ Error: no --output and no artifacts.dots in the state config")
+        return 1
+    if args.votes_per_dot < 1:
+        print("❌ Error: --votes-per-dot must be at least 1")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        header = write_dot_density(config, output, args.votes_per_dot, args.contest, args.seed)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    total = sum(c['count'] for c in header['contests'])
+    print(f"✓ {total:,} dots for {len(header['contests'])} contests (1 per {args.votes_per_dot} votes) "
+          f"in {elapsed:.2f}s, saved to {output} ({Path(output).stat().st_size / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
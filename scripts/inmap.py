@@ -0,0 +1,223 @@
+"""
+One entry point for the build, analysis and serving scripts.
+
+Each subcommand runs the matching script with the remaining arguments, so
+`inmap aggregate --year 2024` is `python scripts/aggregate_statewide.py
+--year 2024`. Scripts (and pandas, NumPy, geopandas) are only imported when
+their subcommand runs, so lightweight commands start in tens of
+milliseconds:
+    contests   list the contest registry (reads the binary header or the JSON; no pandas)
+    bench      time loading the results JSON, binary and SQLite exports
+
+`inmap shell` keeps one process open and reads subcommands from stdin:
+imported modules and parsed source files (kept in memory) stay warm, so a
+second `aggregate --year 2024` or `validate` skips the imports and file
+reads of the first.
+
+Usage:
+    python scripts/inmap.py --help
+    python scripts/inmap.py contests --office-type governor
+    python scripts/inmap.py aggregate --year 2024 --county Adams
+    python scripts/inmap.py shell
+"""
+import argparse
+import json
+import runpy
+import shlex
+import struct
+import sys
+import time
+from pathlib import Path
+
+from state_config import DEFAULT_CONFIG, load_state_config
+
+# Subcommand -> (script module, help)
+SCRIPTS = {
+    'aggregate': ('aggregate_statewide', 'Build the results JSON and artifacts (or patch a selection)'),
+    'primaries': ('aggregate_primaries', 'Aggregate the statewide-office primaries'),
+    'states': ('build_states', 'Build several state configs in parallel'),
+    'watch': ('watch_build', 'Rebuild whenever source files change'),
+    'geometry': ('convert_shapefile', 'Convert the county shapefile to GeoJSON'),
+    'download': ('pull_openelections_data', 'Download the OpenElections source CSVs'),
+    'validate': ('validate_results', 'Validate the results JSON'),
+    'colors': ('verify_colors', 'Check competitiveness colors'),
+    'reconcile': ('reconcile_sources', 'Cross-check sources that cover the same contests'),
+    'candidates': ('candidate_registry', 'Rebuild the candidate registry'),
+    'trends': ('county_trends', 'Rebuild the county trend series'),
+    'rollups': ('rollups', 'Rebuild statewide and regional rollups'),
+    'crosswalk': ('crosswalk', 'Re-aggregate contests onto districts'),
+    'scenarios': ('scenarios', 'Swing and turnout what-if scenarios'),
+    'binary': ('binary_results', 'Write or read the binary results'),
+    'sqlite': ('sqlite_export', 'Write or query the SQLite export'),
+    'dots': ('dot_density', 'Write the dot-density layer'),
+    'publish': ('publish_site', 'Publish the hashed, precompressed site'),
+    'serve': ('serve_results', 'Serve the JSON query API'),
+    'live': ('live_results', 'Election-night live mode'),
+}
+
+
+def run_script(command, module, args):
+    """Run a script as __main__ with args; returns its exit code"""
+    saved_argv = sys.argv
+    sys.argv = [f"inmap {command}", *args]
+    try:
+        runpy.run_module(module, run_name='__main__')
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def binary_header(path):
+    """JSON header of a binary results file, without reading the arrays"""
+    with open(path, 'rb') as f:
+        magic, _, header_length = struct.unpack('<4sII', f.read(12))
+        if magic != b'INRB':
+            raise ValueError(f"{path} is not a binary results file")
+        return json.loads(f.read(header_length))
+
+
+def list_contests(args):
+    config = load_state_config(args.config)
+    binary, output = config['artifacts'].get('binary'), Path(config['output'])
+    # The binary header is a few KB and lists every contest; fall back to the JSON if it is missing or stale
+    if binary and Path(binary).exists() and Path(binary).stat().st_mtime >= output.stat().st_mtime:
+        contests = binary_header(binary)['contests']
+    else:
+        with open(output, 'r', encoding='utf-8') as f:
+            contests = [{'id': c['id'], 'key': f"{c['year']}|{c['contest']}", 'slug': c['slug'],
+                         'office_type': c['office_type']} for c in json.load(f)['contests']['contests']]
+    for contest in contests:
+        if args.office_type and contest.get('office_type') != args.office_type:
+            continue
+        if args.year and contest['key'].split('|', 1)[0] not in args.year:
+            continue
+        print(f"{contest['id']:>4}  {contest['slug']:<28} {contest['key']}")
+    return 0
+
+
+def bench(args):
+    """Time loading each results format"""
+    config = load_state_config(args.config)
+    timings = []
+
+    start = time.perf_counter()
+    with open(config['output'], 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    timings.append(('results JSON (json.load)', time.perf_counter() - start))
+    slug = args.contest or results['contests']['contests'][-1]['slug']
+
+    start = time.perf_counter()
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    timings.append(('import numpy + pandas', time.perf_counter() - start))
+
+    if config['artifacts'].get('binary') and Path(config['artifacts']['binary']).exists():
+        from binary_results import BinaryResults
+        start = time.perf_counter()
+        votes = BinaryResults(config['artifacts']['binary']).contest(slug)
+        int(votes['dem_votes'].sum())
+        timings.append((f"binary: open + sum {slug}", time.perf_counter() - start))
+
+    if config['artifacts'].get('sqlite') and Path(config['artifacts']['sqlite']).exists():
+        import sqlite3
+        start = time.perf_counter()
+        db = sqlite3.connect(f"file:{config['artifacts']['sqlite']}?mode=ro", uri=True)
+        db.execute("SELECT county_id, MAX(swing) FROM swings WHERE office_type = 'president' "
+                   "GROUP BY county_id").fetchall()
+        db.close()
+        timings.append(('sqlite: presidential swings by county', time.perf_counter() - start))
+
+    for label, seconds in timings:
+        print(f"  {label:<40} {seconds * 1000:8.1f} ms")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='inmap', description='Indiana realignment map build and analysis tools')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    for name, (module, help_text) in SCRIPTS.items():
+        commands.add_parser(name, help=help_text, add_help=False)
+
+    contests = commands.add_parser('contests', help='List the contest registry')
+    contests.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    contests.add_argument('--office-type', help='Only this office type (e.g. governor)')
+    contests.add_argument('--year', nargs='*', help='Only these years')
+    contests.set_defaults(handler=list_contests)
+
+    bench_parser = commands.add_parser('bench', help='Time loading the results formats')
+    bench_parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    bench_parser.add_argument('--contest', help='Contest slug for the binary load (default: the latest)')
+    bench_parser.set_defaults(handler=bench)
+
+    commands.add_parser('shell', help='Read commands from stdin in one warm process')
+    return parser
+
+
+def dispatch(parser, argv):
+    """Run one command line; returns its exit code"""
+    if argv and argv[0] in SCRIPTS:
+        return run_script(argv[0], SCRIPTS[argv[0]][0], argv[1:])
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    if args.command is None:
+        parser.print_help()
+        return 0
+    if args.command == 'shell':
+        return shell(parser)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+
+def shell(parser):
+    """Run commands from stdin until EOF or 'exit', keeping modules and parsed files warm"""
+    from build_cache import keep_in_memory
+    keep_in_memory()
+    interactive = sys.stdin.isatty()
+    print("inmap shell: enter subcommands (e.g. 'aggregate --year 2024'), 'help' or 'exit'")
+    while True:
+        try:
+            line = input('inmap> ' if interactive else '')
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return 0
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            continue
+        if not argv:
+            continue
+        if argv[0] in ('exit', 'quit'):
+            return 0
+        if argv[0] == 'help':
+            parser.print_help()
+            continue
+        if argv[0] == 'shell':
+            continue
+        start = time.perf_counter()
+        # One failing command (an IntegrityError, a bug, Ctrl-C) must not end the session
+        try:
+            code = dispatch(parser, argv)
+        except KeyboardInterrupt:
+            print("\nInterrupted")
+            code = 130
+        except Exception as e:
+            print(f"❌ Error: {type(e).__name__}: {e}")
+            code = 1
+        print(f"{'✓' if code == 0 else '❌'} {argv[0]} finished in {time.perf_counter() - start:.2f}s"
+              + ('' if code == 0 else f" (exit {code})"))
+
+
+def main():
+    return dispatch(build_parser(), sys.argv[1:])
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
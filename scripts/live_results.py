@@ -0,0 +1,425 @@
+"""
+Election-night live results.
+
+Tracks partial precinct reporting as county precinct files are updated,
+and pushes the counties that changed to connected maps.
+
+- Sources: a drop directory of county precinct CSVs (the same layout as
+  `{year}/counties/*__precinct.csv`), or a list of URLs serving them,
+  polled with conditional GETs. Each file or URL is a snapshot of its
+  counties' current precinct results. Drop files by writing them elsewhere
+  and renaming them into the directory, so a half-written file is never
+  read.
+- Accumulators: running county x office type arrays of DEM / REP / other
+  votes and precincts reporting / total. When a snapshot changes, only its
+  delta against the previous snapshot from the same source is applied, so
+  a county update touches only that county's cells. A precinct counts as
+  reporting once it has any votes for the contest.
+- Push: Server-Sent Events on /events. A client gets a `snapshot` event on
+  connect and a `counties` event with just the changed county records after
+  every update; /api/live returns the current snapshot. Sources are checked
+  every --interval seconds (default 0.25), so updates reach the map in well
+  under a second.
+
+Open the map with `?live=http://localhost:8002` to follow it.
+
+Usage:
+    python scripts/live_results.py --watch drop/ --year 2026
+    python scripts/live_results.py --poll http://localhost:9000/adams.csv http://localhost:9000/allen.csv
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from competitiveness import CATEGORIES, CODE_INDEX, COLORS, PARTIES, classify_margins
+from contest_registry import contest_slug, senate_class
+from county_registry import CountyRegistry
+from reconcile_sources import NON_CANDIDATES, total_rows
+from results_table import load_results
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index
+
+# Columns of the running accumulators
+LIVE_COLUMNS = ['dem_votes', 'rep_votes', 'other_votes', 'precincts_reporting', 'precincts_total']
+
+# SSE comment sent to idle clients so proxies keep the stream open
+HEARTBEAT_SECONDS = 15
+
+
+def _no_contribution():
+    return pd.DataFrame(np.zeros((0, len(LIVE_COLUMNS)), dtype=np.int64), columns=LIVE_COLUMNS,
+                        index=pd.MultiIndex.from_arrays([[], []], names=['office_type', 'county_id']))
+
+
+class LiveAccumulator:
+    """Running county x office type totals, updated by per-source deltas.
+
+    Contests are keyed and slugged as the build would key them, from the
+    office spelling in the precinct files, and `contests` (the results
+    JSON's contest registry) maps office types the build already has for
+    this year to its contest keys, so replaying a built year updates its
+    contests instead of adding new ones.
+    """
+
+    def __init__(self, config, year, registry, contests=None):
+        self.year = str(year)
+        self.registry = registry
+        self.office_types = list(config['office_types'])
+        self.labels = {t: names[0] for t, names in config['office_types'].items()}
+        self.type_index = office_type_index(config)
+        self.raw_aliases = config['office_aliases'].get('precinct', {})
+        self.office_aliases = {k.strip().lower(): v.strip().lower() for k, v in self.raw_aliases.items()}
+        self.offices = {}  # type code -> office spelling first seen in the snapshots
+        self.known_keys = self._known_keys(contests)
+        self.party_aliases = config['party_aliases']
+        self.totals = np.zeros((len(self.office_types), len(registry), len(LIVE_COLUMNS)), dtype=np.int64)
+        self.sources = {}  # source -> DataFrame of its contribution, indexed by (office type, county id)
+        self.updated = None
+
+    def _known_keys(self, contests):
+        """{office type: [contest keys]} of this year's contests in the build's registry"""
+        if not contests:
+            return {}
+        by_id = {c['id']: c for c in contests.get('contests', [])}
+        known = {}
+        for office_type, ids in contests.get('by_office_type', {}).items():
+            keys = [by_id[i]['contest'] for i in ids if i in by_id and by_id[i]['year'] == self.year]
+            if keys:
+                known[office_type] = keys
+        return known
+
+    def contribution(self, df):
+        """(office type, county id) x LIVE_COLUMNS totals of one precinct snapshot"""
+        # County-total rows would double the votes and count as a reporting precinct
+        df = df[~total_rows(df)]
+        office = df['office'].astype(str).str.strip().str.lower()
+        office_type = office.replace(self.office_aliases).map(self.type_index)
+        type_code = pd.Series(pd.Categorical(office_type, categories=self.office_types).codes, index=df.index)
+        spelling = df['office'].astype(str).str.strip().replace(self.raw_aliases)
+        for t, name in zip(type_code[type_code >= 0], spelling[type_code >= 0]):
+            self.offices.setdefault(int(t), name)
+        county_id = pd.Series(self.registry.resolve(df['county'].astype(str).str.strip()), index=df.index)
+        keep = ((type_code >= 0) & (county_id >= 0)
+                & ~df['candidate'].astype(str).str.strip().str.lower().isin(NON_CANDIDATES))
+        if not keep.any():
+            return _no_contribution()
+
+        party = df.loc[keep, 'party'].astype(str).str.strip().str.upper().map(self.party_aliases)
+        rows = pd.DataFrame({
+            'office_type': type_code[keep],
+            'county_id': county_id[keep],
+            'precinct': df.loc[keep, 'precinct'].astype(str).str.strip(),
+            'column': np.select([party == 'DEM', party == 'REP'], ['dem_votes', 'rep_votes'], 'other_votes'),
+            'votes': pd.to_numeric(df.loc[keep, 'votes'], errors='coerce').fillna(0).astype(np.int64),
+        })
+        keys = ['office_type', 'county_id']
+        votes = rows.pivot_table(index=keys, columns='column', values='votes', aggfunc='sum', fill_value=0)
+        precinct_votes = rows.groupby(keys + ['precinct'])['votes'].sum()
+        precincts = pd.DataFrame({
+            'precincts_reporting': (precinct_votes > 0).groupby(level=keys).sum(),
+            'precincts_total': precinct_votes.groupby(level=keys).size(),
+        })
+        return votes.join(precincts).reindex(columns=LIVE_COLUMNS, fill_value=0).astype(np.int64)
+
+    def ingest(self, source, df):
+        """Apply a source's new snapshot (None if it went away); returns changed (type, county) cells"""
+        new = self.contribution(df) if df is not None else _no_contribution()
+        old = self.sources.get(source)
+        delta = new if old is None else new.sub(old, fill_value=0)
+        delta = delta[(delta != 0).any(axis=1)].astype(np.int64)
+        if df is None:
+            self.sources.pop(source, None)
+        else:
+            self.sources[source] = new
+        if delta.empty:
+            return []
+
+        types = delta.index.get_level_values(0).to_numpy()
+        counties = delta.index.get_level_values(1).to_numpy()
+        self.totals[types, counties] += delta.to_numpy()
+        self.updated = datetime.now().isoformat(timespec='seconds')
+        return list(zip(types.tolist(), counties.tolist()))
+
+    def contest_key(self, type_code):
+        """Contest key the build gives this office type: its existing key, else '<office> (<year>)'"""
+        office_type = self.office_types[type_code]
+        key = f"{self.offices.get(type_code, self.labels[office_type])} ({self.year})"
+        known = self.known_keys.get(office_type, [])
+        if known and key not in known:
+            slug = contest_slug(key, self.year, self.type_index)
+            same_seat = [k for k in known if contest_slug(k, self.year, self.type_index) == slug]
+            key = (same_seat or known)[0]
+        return key
+
+    def records(self, cells):
+        """County records, in the results JSON schema plus reporting counts, for (type, county) cells"""
+        if not cells:
+            return []
+        types, counties = (np.array(c) for c in zip(*cells))
+        values = self.totals[types, counties]
+        dem, rep, other, reporting, precincts = values.T
+        two_party = dem + rep
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin_pct = np.where(two_party > 0, np.round((rep - dem) / two_party * 100, 2), 0.0)
+        winner = np.where(two_party > 0, np.where(rep > dem, 'REP', np.where(dem > rep, 'DEM', 'TIE')), 'TIE')
+        codes = classify_margins(margin_pct, winner)
+
+        out = []
+        for i, (t, c) in enumerate(zip(types, counties)):
+            code = codes[i]
+            out.append((int(t), {
+                'county': self.registry.names[c], 'county_id': int(c), 'geoid': str(self.registry.geoids[c]),
+                'contest': self.contest_key(t), 'year': self.year,
+                'dem_votes': int(dem[i]), 'rep_votes': int(rep[i]), 'other_votes': int(other[i]),
+                'total_votes': int(dem[i] + rep[i] + other[i]), 'two_party_total': int(two_party[i]),
+                'margin': int(rep[i] - dem[i]), 'margin_pct': float(margin_pct[i]), 'winner': str(winner[i]),
+                'competitiveness': {'category': CATEGORIES[code], 'party': PARTIES[code],
+                                    'code': code, 'color': COLORS[code]},
+                'code_index': CODE_INDEX[code],
+                'precincts_reporting': int(reporting[i]), 'precincts_total': int(precincts[i]),
+                'pct_reporting': round(float(reporting[i] / precincts[i] * 100), 1) if precincts[i] else 0.0,
+            }))
+        return out
+
+    def payload(self, cells):
+        """Event payload: changed county records and statewide totals, grouped by contest"""
+        contests = {}
+        for t, record in self.records(cells):
+            contests.setdefault(t, {})[record['county']] = record
+
+        result = {}
+        for t, counties in contests.items():
+            dem, rep, other, reporting, precincts = self.totals[t].sum(axis=0)
+            office_type = self.office_types[t]
+            key = self.contest_key(t)
+            result[key] = {
+                'office_type': office_type,
+                'office': self.labels[office_type],
+                'slug': contest_slug(key, self.year, self.type_index),
+                'senate_class': senate_class(key, self.year) if office_type == 'us_senate' else None,
+                'statewide': {
+                    'dem_votes': int(dem), 'rep_votes': int(rep), 'other_votes': int(other),
+                    'total_votes': int(dem + rep + other),
+                    'margin_pct': round(float((rep - dem) / (rep + dem) * 100), 2) if rep + dem else 0.0,
+                    'precincts_reporting': int(reporting), 'precincts_total': int(precincts),
+                    'counties_reporting': int(np.count_nonzero(self.totals[t, :, 3])),
+                },
+                'counties': counties,
+            }
+        return {'year': self.year, 'updated': self.updated, 'contests': result}
+
+    def snapshot(self):
+        """Payload covering every county that has reported anything"""
+        types, counties = np.nonzero(self.totals[..., 4])
+        return self.payload(list(zip(types.tolist(), counties.tolist())))
+
+
+class DropDirectory:
+    """Precinct CSVs in a directory, re-read when their mtime or size changes"""
+
+    def __init__(self, path, pattern='*.csv'):
+        self.path = Path(path)
+        self.pattern = pattern
+        self.seen = {}
+
+    def changes(self):
+        """[(source, DataFrame or None)] for new, changed and removed files"""
+        current = {}
+        for file in self.path.glob(self.pattern):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            current[str(file)] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = []
+        for source, signature in current.items():
+            if self.seen.get(source) == signature:
+                continue
+            try:
+                frame = pd.read_csv(source, dtype={'precinct': str})
+            except (pd.errors.EmptyDataError, pd.errors.ParserError, FileNotFoundError):
+                continue  # mid-write; picked up on the next check
+            self.seen[source] = signature
+            changed.append((source, frame))
+        for source in [s for s in self.seen if s not in current]:
+            del self.seen[source]
+            changed.append((source, None))
+        return changed
+
+
+class HttpPoller:
+    """Precinct CSV URLs polled with If-None-Match / If-Modified-Since"""
+
+    def __init__(self, urls, timeout=5):
+        self.urls = list(urls)
+        self.timeout = timeout
+        self.validators = {}  # url -> (etag, last-modified, body hash)
+        self.errors = {}
+
+    def _warn(self, url, message):
+        """Report a failing URL once, not on every poll"""
+        if self.errors.get(url) != message:
+            print(f"  ⚠️  {url}: {message}")
+            self.errors[url] = message
+
+    def changes(self):
+        changed = []
+        for url in self.urls:
+            etag, modified, digest = self.validators.get(url, (None, None, None))
+            request = urllib.request.Request(url)
+            if etag:
+                request.add_header('If-None-Match', etag)
+            if modified:
+                request.add_header('If-Modified-Since', modified)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    body = response.read()
+                    headers = response.headers
+            except urllib.error.HTTPError as e:
+                if e.code != 304:
+                    self._warn(url, f"HTTP {e.code}")
+                continue
+            except (urllib.error.URLError, TimeoutError) as e:
+                self._warn(url, str(e))
+                continue
+            self.errors.pop(url, None)
+
+            new_digest = hashlib.sha1(body).hexdigest()
+            self.validators[url] = (headers.get('ETag'), headers.get('Last-Modified'), new_digest)
+            if new_digest == digest:
+                continue
+            try:
+                changed.append((url, pd.read_csv(io.BytesIO(body), dtype={'precinct': str})))
+            except (pd.errors.EmptyDataError, pd.errors.ParserError):
+                print(f"  ⚠️  {url}: unreadable CSV")
+        return changed
+
+
+class LiveServer:
+    """Ingest loop plus an SSE endpoint that fans updates out to every client"""
+
+    def __init__(self, accumulator, source, interval):
+        self.accumulator = accumulator
+        self.source = source
+        self.interval = interval
+        self.clients = set()
+        self.snapshot = json.dumps(accumulator.snapshot(), separators=(',', ':'))
+
+    def _check(self):
+        """One pass over the sources; returns the changed-counties payload or None (runs in a thread)"""
+        cells = []
+        for source, frame in self.source.changes():
+            cells += self.accumulator.ingest(source, frame)
+        if not cells:
+            return None
+        self.snapshot = json.dumps(self.accumulator.snapshot(), separators=(',', ':'))
+        return json.dumps(self.accumulator.payload(sorted(set(cells))), separators=(',', ':'))
+
+    async def ingest_loop(self):
+        while True:
+            start = time.perf_counter()
+            event = await asyncio.to_thread(self._check)
+            if event is not None:
+                for queue in self.clients:
+                    queue.put_nowait(event)
+                counties = len({c for contest in json.loads(event)['contests'].values() for c in contest['counties']})
+                print(f"  📊 {counties} counties updated in {(time.perf_counter() - start) * 1000:.0f} ms "
+                      f"→ {len(self.clients)} clients")
+            await asyncio.sleep(self.interval)
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            try:
+                method, target, _ = request_line.decode('latin-1').split()
+            except ValueError:
+                return
+            path = target.split('?')[0].rstrip('/')
+            cors = 'Access-Control-Allow-Origin: *\r\n'
+
+            if method == 'GET' and path == '/api/live':
+                body = self.snapshot.encode('utf-8')
+                writer.write((f'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nCache-Control: no-cache\r\n'
+                              f'{cors}Content-Length: {len(body)}\r\nConnection: close\r\n\r\n').encode('latin-1') + body)
+                await writer.drain()
+                return
+            if method != 'GET' or path != '/events':
+                writer.write(f'HTTP/1.1 404 Not Found\r\n{cors}Content-Length: 0\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+                await writer.drain()
+                return
+
+            writer.write((f'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+                          f'{cors}Connection: keep-alive\r\n\r\n').encode('latin-1'))
+            writer.write(f'event: snapshot\ndata: {self.snapshot}\n\n'.encode('utf-8'))
+            await writer.drain()
+
+            queue = asyncio.Queue()
+            self.clients.add(queue)
+            try:
+                while True:
+                    try:
+                        event = await asyncio.wait_for(queue.get(), HEARTBEAT_SECONDS)
+                        writer.write(f'event: counties\ndata: {event}\n\n'.encode('utf-8'))
+                    except asyncio.TimeoutError:
+                        writer.write(b': ping\n\n')
+                    await writer.drain()
+            finally:
+                self.clients.discard(queue)
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"✓ Live results on http://{host}:{port}/events (snapshot: /api/live)")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.ingest_loop())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live election-night results with Server-Sent Events')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--year', default=str(datetime.now().year), help='Election year (default: %(default)s)')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--watch', metavar='DIR', help='Drop directory of county precinct CSVs')
+    source.add_argument('--poll', nargs='+', metavar='URL', help='Precinct CSV URLs to poll')
+    parser.add_argument('--pattern', default='*.csv', help='File pattern in the drop directory (default: %(default)s)')
+    parser.add_argument('--interval', type=float, default=0.25, help='Seconds between source checks (default: %(default)s)')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8002, help='Port (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    if args.watch and not Path(args.watch).is_dir():
+        print(f"❌ Error: {args.watch} is not a directory")
+        return 1
+
+    # Contests the build already has for this year keep their keys
+    results_file = Path(config['output'])
+    contests = load_results(results_file).get('contests') if results_file.exists() else None
+    accumulator = LiveAccumulator(config, args.year, CountyRegistry.from_config(config), contests)
+    watcher = DropDirectory(args.watch, args.pattern) if args.watch else HttpPoller(args.poll)
+    print(f"Live {config['state']} {args.year} results from {args.watch or f'{len(args.poll)} URLs'}...")
+
+    try:
+        asyncio.run(LiveServer(accumulator, watcher, args.interval).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
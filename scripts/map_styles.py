@@ -0,0 +1,38 @@
+"""
+Build-time styling table for the county map.
+
+For every contest, maps each county's GEOID20 to an index into the
+competitiveness palette. The map turns one contest's table into a single
+Mapbox `match` expression on GEOID20 (or feature-state updates), so switching
+contests is a constant-cost style swap with no string normalization at
+render time.
+
+Written into the results JSON under `map_styles` by aggregate_statewide.py.
+"""
+from competitiveness import CODE_INDEX, CODES, COLORS
+from results_table import results_to_frame
+
+# Fill for counties with no result in the selected contest
+NO_DATA_COLOR = '#f0f0f0'
+
+
+def build_map_styles(results_by_year, geoid_field='GEOID20'):
+    """GEOID -> palette index for every contest, plus the palette itself.
+
+    `geoid_field` is the boundary property the map matches the GEOIDs on.
+    """
+    frame = results_to_frame(results_by_year)
+    frame = frame[frame['geoid'].notna() & frame['code'].isin(CODES)]
+    frame = frame.assign(code_index=frame['code'].map(CODE_INDEX).astype(int))
+
+    by_year = {}
+    for (year, contest), group in frame.groupby(['year', 'contest'], sort=False):
+        by_year.setdefault(year, {})[contest] = dict(zip(group['geoid'], group['code_index'].tolist()))
+
+    return {
+        'property': geoid_field,
+        'codes': CODES,
+        'colors': [COLORS[code] for code in CODES],
+        'default_color': NO_DATA_COLOR,
+        'by_year': by_year,
+    }
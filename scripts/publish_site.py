@@ -0,0 +1,158 @@
+"""
+Publish the map as static files with content-hashed, precompressed data.
+
+Copies index.html and every data file the map loads (county boundaries,
+results JSON, trend series, binary results, dot-density layer) into an
+output directory. Each data file is written as `<name>.<hash>.<ext>`,
+where the hash is of its contents, plus `.gz` and (with the `brotli` package installed) `.br`
+siblings. `data/manifest.json` maps the map's asset names to the current
+files; index.html reads it on load, so the data files themselves can be
+served with a long `Cache-Control: immutable` lifetime and a new build
+only changes the files whose contents changed. Serve the precompressed
+siblings with e.g. nginx `gzip_static on; brotli_static on;`.
+
+Hashed files no longer named by the manifest are removed.
+
+Usage:
+    python scripts/publish_site.py
+    python scripts/publish_site.py --output public --no-brotli
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import shutil
+from pathlib import Path
+
+from results_table import write_results
+from state_config import DEFAULT_CONFIG, load_state_config
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HASH_LENGTH = 10
+# Page shell and static files published as-is (their names stay stable)
+PAGES = ['index.html']
+_HASHED_NAME = re.compile(rf'\.[0-9a-f]{{{HASH_LENGTH}}}\.[^.]+(\.gz|\.br)?$')
+
+
+def site_assets(config):
+    """Map asset name (the index.html CONFIG.paths key) -> source file"""
+    assets = {
+        'counties': config['geometry'].get('geojson'),
+        'election': config['output'],
+        'trends': config['artifacts'].get('trends'),
+        'binary': config['artifacts'].get('binary'),
+        'dots': config['artifacts'].get('dots'),
+    }
+    return {name: Path(path) for name, path in assets.items() if path and Path(path).exists()}
+
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+def _write_atomic(path, data):
+    tmp_file = path.with_name(f"{path.name}.tmp")
+    tmp_file.write_bytes(data)
+    os.replace(tmp_file, path)
+
+
+def publish_file(source, target, use_brotli=True):
+    """Copy source to target with precompressed siblings, unless target is already current.
+
+    Returns {'bytes', 'gzip', 'br'} sizes and whether anything was written.
+    """
+    sizes = {'bytes': source.stat().st_size}
+    outputs = [(target, None), (target.with_name(target.name + '.gz'), 'gzip')]
+    if use_brotli:
+        outputs.append((target.with_name(target.name + '.br'), 'br'))
+
+    # A hashed name that already exists has the same contents: nothing to do
+    if _HASHED_NAME.search(target.name) and all(path.exists() for path, _ in outputs):
+        sizes.update({kind: path.stat().st_size for path, kind in outputs if kind})
+        return sizes, False
+
+    data = source.read_bytes()
+    for path, kind in outputs:
+        if kind is None:
+            _write_atomic(path, data)
+        elif kind == 'gzip':
+            # mtime=0 keeps the output identical across builds
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+            _write_atomic(path, compressed)
+            sizes[kind] = len(compressed)
+        else:
+            compressed = brotli.compress(data, quality=11)
+            _write_atomic(path, compressed)
+            sizes[kind] = len(compressed)
+    return sizes, True
+
+
+def publish_site(config, output_dir, use_brotli=True):
+    """Publish the site into output_dir; returns the manifest"""
+    output_dir = Path(output_dir)
+    data_dir = output_dir / 'data'
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {'paths': {}, 'files': {}}
+    for name, source in site_assets(config).items():
+        hashed = f"{source.stem}.{content_hash(source)}{source.suffix}"
+        sizes, written = publish_file(source, data_dir / hashed, use_brotli)
+        manifest['paths'][name] = f"./data/{hashed}"
+        manifest['files'][hashed] = sizes
+        print(f"  {'✓' if written else '·'} {hashed}: {sizes['bytes']:,} bytes, gzip {sizes['gzip']:,}"
+              + (f", brotli {sizes['br']:,}" if 'br' in sizes else '')
+              + ('' if written else ' (unchanged)'))
+
+    for page in PAGES:
+        sizes, _ = publish_file(Path(page), output_dir / page, use_brotli)
+        manifest['files'][page] = sizes
+
+    # Not hashed: the map revalidates it on every load
+    write_results(data_dir / 'manifest.json', manifest, indent=2)
+
+    current = set(manifest['files'])
+    for path in data_dir.iterdir():
+        base = re.sub(r'\.(gz|br)$', '', path.name)
+        if _HASHED_NAME.search(path.name) and base not in current:
+            path.unlink()
+            print(f"  🗑️  {path.name}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish the map with content-hashed, precompressed data files')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--output', default='dist', help='Output directory (default: %(default)s)')
+    parser.add_argument('--no-brotli', action='store_true', help='Only write gzip siblings')
+    parser.add_argument('--clean', action='store_true', help='Empty the output directory first')
+    args = parser.parse_args()
+
+    use_brotli = not args.no_brotli
+    if use_brotli and brotli is None:
+        print("⚠️  brotli is not installed (pip install brotli); writing gzip siblings only")
+        use_brotli = False
+
+    config = load_state_config(args.config)
+    if args.clean and Path(args.output).exists():
+        shutil.rmtree(args.output)
+
+    print(f"Publishing {config['state']} to {args.output}/...")
+    manifest = publish_site(config, args.output, use_brotli)
+    files = manifest['files'].values()
+    raw, compressed = sum(f['bytes'] for f in files), sum(f.get('br', f['gzip']) for f in files)
+    print(f"✓ {len(manifest['files'])} files, {raw / 1e6:.1f} MB ({compressed / 1e6:.1f} MB compressed); "
+          f"manifest at {Path(args.output) / 'data' / 'manifest.json'}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,285 @@
+"""
+Reconcile the different data sources available for each election year.
+
+A year can have several independent sources for the same contests, e.g. for
+2018: AllOfficeResults-2018.csv, the OpenElections county file, the
+per-county precinct files and the PDF parser's parser_output. Each source is
+rolled up to county x office type x party totals with a single group-by, the
+authoritative source is chosen per office type (config `reconciliation`
+section), and every other source is compared against it.
+
+Years are reconciled in parallel worker processes and share the parsed-file
+cache with the main build.
+
+Usage:
+    python scripts/reconcile_sources.py --years 2018
+    python scripts/reconcile_sources.py --output reconciliation.csv
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_cache import CACHE_DIR, cached_read_csv
+from county_registry import CountyRegistry
+from state_config import DEFAULT_CONFIG, load_state_config, office_type_index, source_files
+
+MAJOR_PARTIES = ['DEM', 'REP', 'LIB']
+
+# Column spellings used across the source layouts
+COUNTY_COLUMNS = ['county', 'ReportingCountyName', 'Reporting County Name']
+OFFICE_COLUMNS = ['office', 'Office']
+CATEGORY_COLUMNS = ['OfficeCategory', 'Office Category']
+PARTY_COLUMNS = ['party', 'PoliticalParty', 'Political Party']
+VOTES_COLUMNS = ['votes', 'TotalVotes', 'Total Votes']
+CANDIDATE_COLUMNS = ['candidate', 'NameonBallot', 'Name on Ballot']
+
+# Turnout and tally rows some counties file under a contest's office
+NON_CANDIDATES = {'registered', 'registered voters', 'registration', 'ballots', 'ballots cast',
+                  'cast votes', 'votes cast', 'total', 'total votes', 'total votes cast', 'invalid votes',
+                  'over', 'under', 'over votes', 'under votes', 'over votes:', 'under votes:',
+                  'overvotes', 'undervotes'}
+
+# Precinct names of the county-total rows some precinct files add to their precincts, along
+# with '<COUNTY> IN' and summary page labels
+TOTAL_PRECINCTS = {'', 'total', 'totals'}
+TOTAL_PREFIXES = ('registered voters:',)
+
+# Read options per source, matching aggregate_statewide so the cache is shared
+READ_OPTIONS = {'alloffice': {'skipinitialspace': True}}
+
+
+def _first_column(df, candidates):
+    for col in candidates:
+        if col in df.columns:
+            return col
+    return None
+
+
+def _map_unique(values, mapping):
+    """Map a column through a dict, evaluating each distinct value once"""
+    codes, uniques = pd.factorize(values)
+    mapped = np.array([mapping.get(str(u).strip().lower()) for u in uniques] + [None], dtype=object)
+    return mapped[codes]
+
+
+def total_rows(df):
+    """Mask of a precinct file's county-total rows (all False without a precinct column).
+
+    Totals are found by label, or by their votes equalling the rest of their
+    office and candidate: every row of a precinct named like the county
+    ('KOSCIUSKO', 'TIPPE', but not Warren's Warren township), and rows
+    repeating an earlier precinct, office and candidate (Hendricks 2024 files
+    its totals under the last precinct's name).
+    """
+    if 'precinct' not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    precinct = df['precinct'].fillna('').astype(str).str.strip().str.lower()
+    total = np.array(precinct.isin(TOTAL_PRECINCTS) | precinct.str.startswith(TOTAL_PREFIXES), dtype=bool)
+    if 'county' in df.columns:
+        county = df['county'].fillna('').astype(str).str.strip().str.lower()
+        total |= (precinct == county + ' in').to_numpy()
+
+    votes_col = _first_column(df, VOTES_COLUMNS)
+    group = [c for c in ['county', 'office', 'district', 'party', 'candidate'] if c in df.columns]
+    if not votes_col or group in ([], ['county']):
+        return total
+    keys = df[group].fillna('').astype(str)
+    votes = pd.to_numeric(df[votes_col].astype(str).str.replace(',', ''), errors='coerce').fillna(0).to_numpy()
+    by_group = pd.Series(votes, index=df.index).groupby([keys[c] for c in group])
+    sums = ((by_group.transform('sum') - votes == votes) & (by_group.transform('size') > 2)).to_numpy() & (votes > 0)
+
+    if 'county' in df.columns:
+        named = np.array([len(p) >= 4 and c.startswith(p) for p, c in zip(precinct, county)], dtype=bool)
+        consistent = pd.Series(sums | (votes <= 0)).groupby([county.to_numpy(), precinct.to_numpy()])
+        total |= named & consistent.transform('all').to_numpy()
+    repeated = pd.concat([precinct, keys], axis=1).duplicated().to_numpy()
+    return total | (repeated & sums)
+
+
+def source_totals(config, registry, source, files, cache_dir=CACHE_DIR):
+    """Roll one source up to office_type x county_id x party vote totals"""
+    frames = []
+    for path in files:
+        try:
+            df = cached_read_csv(path, cache_dir, **READ_OPTIONS.get(source, {}))
+        except Exception as e:
+            print(f"  Error reading {Path(path).name}: {e}")
+            continue
+        df.columns = [str(col).strip().strip('"') for col in df.columns]
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['office_type', 'county_id', 'party', 'votes'])
+
+    df = pd.concat(frames, ignore_index=True)
+    # The county-total rows repeat the precinct rows above them
+    df = df[~total_rows(df)]
+    county_col = _first_column(df, COUNTY_COLUMNS)
+    office_col = _first_column(df, OFFICE_COLUMNS)
+    party_col = _first_column(df, PARTY_COLUMNS)
+    votes_col = _first_column(df, VOTES_COLUMNS)
+    if None in (county_col, office_col, party_col, votes_col):
+        print(f"  Warning: {source} files for this year have an unrecognised layout")
+        return pd.DataFrame(columns=['office_type', 'county_id', 'party', 'votes'])
+
+    type_index = office_type_index(config)
+    office_type = _map_unique(df[office_col], type_index)
+    category_col = _first_column(df, CATEGORY_COLUMNS)
+    if category_col is not None:
+        by_category = _map_unique(df[category_col], type_index)
+        office_type = np.where(office_type == None, by_category, office_type)  # noqa: E711
+
+    party = df[party_col].astype(str).str.strip().str.upper().map(config['party_aliases'])
+    party = party.where(party.isin(MAJOR_PARTIES), 'OTHER')
+
+    votes = pd.to_numeric(df[votes_col].astype(str).str.strip().str.strip('"').str.replace(',', ''),
+                          errors='coerce').fillna(0).astype('int64')
+
+    rows = pd.DataFrame({
+        'office_type': office_type,
+        'county_id': registry.resolve(df[county_col].astype(str).str.strip().str.strip('"')),
+        'party': party.to_numpy(),
+        'votes': votes.to_numpy(),
+    })
+    keep = rows['office_type'].notna() & (rows['county_id'] >= 0)
+    candidate_col = _first_column(df, CANDIDATE_COLUMNS)
+    if candidate_col is not None:
+        candidates = df[candidate_col].astype(str).str.strip().str.lower()
+        keep &= ~candidates.isin(NON_CANDIDATES).to_numpy()
+    rows = rows[keep]
+    return rows.groupby(['office_type', 'county_id', 'party'], as_index=False)['votes'].sum()
+
+
+def reconcile_year(config_path, year, cache_dir=CACHE_DIR):
+    """Compare every source for one year against the authoritative one.
+
+    Returns (discrepancies, coverage) frames. Only county x office pairs that
+    both sources report are compared; coverage lists what each source has.
+    """
+    config = load_state_config(config_path)
+    registry = CountyRegistry.from_config(config)
+    settings = config['reconciliation']
+    year = str(year)
+
+    totals = []
+    for source in settings['source_priority']:
+        files = source_files(config, source, year)
+        if files:
+            source_df = source_totals(config, registry, source, files, cache_dir)
+            totals.append(source_df.assign(source=source))
+    if not totals:
+        return pd.DataFrame(), pd.DataFrame()
+
+    long = pd.concat(totals, ignore_index=True)
+    coverage = (long.groupby(['source', 'office_type'])['county_id'].nunique()
+                    .rename('counties').reset_index().assign(year=year))
+
+    sources = [s for s in settings['source_priority'] if s in set(long['source'])]
+    wide = long.pivot_table(index=['office_type', 'county_id', 'party'], columns='source',
+                            values='votes', aggfunc='sum')
+    wide = wide.reindex(columns=sources)
+
+    # A source "reports" a county x office if it has any party row for it
+    reported = long.groupby(['source', 'office_type', 'county_id']).size().unstack('source').reindex(columns=sources).notna()
+    reported = reported.reindex(wide.index.droplevel('party')).to_numpy()
+    values = np.where(reported, wide.fillna(0).to_numpy(), np.nan)
+
+    # Authoritative source per office type: config override, else first in priority
+    overrides = settings['authoritative'].get(year, {})
+    office_types = wide.index.get_level_values('office_type')
+    has_type = long.groupby(['office_type', 'source']).size().unstack('source').reindex(columns=sources).notna()
+    auth_by_type = {}
+    for office_type, row in has_type.iterrows():
+        preferred = overrides.get(office_type)
+        if preferred in sources and row[preferred]:
+            auth_by_type[office_type] = preferred
+        else:
+            auth_by_type[office_type] = next(s for s in sources if row[s])
+    auth_col = np.array([sources.index(auth_by_type[t]) for t in office_types])
+    auth_votes = values[np.arange(len(values)), auth_col]
+
+    diff = values - auth_votes[:, None]
+    limit = np.maximum(settings['tolerance_votes'], np.abs(auth_votes) * settings['tolerance_pct'] / 100)
+    with np.errstate(invalid='ignore'):
+        flagged = np.abs(diff) > limit[:, None]
+    flagged[np.arange(len(values)), auth_col] = False
+
+    row_idx, col_idx = np.nonzero(flagged)
+    index = wide.index.to_frame(index=False).iloc[row_idx].reset_index(drop=True)
+    discrepancies = index.assign(
+        year=year,
+        county=registry.names[index['county_id'].to_numpy()] if len(index) else [],
+        source=np.array(sources, dtype=object)[col_idx],
+        votes=values[row_idx, col_idx],
+        authoritative_source=np.array(sources, dtype=object)[auth_col[row_idx]],
+        authoritative_votes=auth_votes[row_idx],
+        diff=diff[row_idx, col_idx],
+    )
+    return discrepancies, coverage
+
+
+def reconcile(config_path=DEFAULT_CONFIG, years=None, workers=None, cache_dir=CACHE_DIR):
+    """Reconcile several years in parallel and combine the reports"""
+    config = load_state_config(config_path)
+    years = [str(y) for y in (years or config['years'])]
+    workers = workers or min(len(years), os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reports = list(pool.map(reconcile_year, [str(config_path)] * len(years), years, [cache_dir] * len(years)))
+
+    discrepancies = [d for d, _ in reports if not d.empty]
+    coverage = [c for _, c in reports if not c.empty]
+    return (pd.concat(discrepancies, ignore_index=True) if discrepancies else pd.DataFrame(),
+            pd.concat(coverage, ignore_index=True) if coverage else pd.DataFrame())
+
+
+def print_report(discrepancies, coverage, limit=15):
+    """Print source coverage and the largest discrepancies"""
+    if coverage.empty:
+        print("No sources found for the requested years")
+        return
+
+    print("📊 SOURCE COVERAGE (counties per office type):\n")
+    table = coverage.pivot_table(index=['year', 'office_type'], columns='source', values='counties')
+    print(table.fillna(0).astype(int).to_string())
+    print()
+
+    if discrepancies.empty:
+        print("✅ All sources agree within tolerance")
+        return
+
+    print(f"❌ Found {len(discrepancies)} discrepancies above tolerance:\n")
+    summary = discrepancies.groupby(['year', 'office_type', 'source']).size()
+    print(summary.to_string())
+    print()
+    worst = discrepancies.reindex(discrepancies['diff'].abs().sort_values(ascending=False).index)
+    for row in worst.head(limit).itertuples(index=False):
+        print(f"  {row.year} {row.office_type} {row.county} {row.party}: "
+              f"{row.source}={int(row.votes):,} vs {row.authoritative_source}={int(row.authoritative_votes):,} "
+              f"({int(row.diff):+,})")
+    if len(worst) > limit:
+        print(f"  ... and {len(worst) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check election data sources against each other')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--years', nargs='*', help='Years to reconcile (default: every configured year)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: one per year, up to CPU count)')
+    parser.add_argument('--output', help='Write the full discrepancy table to this CSV')
+    args = parser.parse_args()
+
+    discrepancies, coverage = reconcile(args.config, args.years, args.workers)
+    print_report(discrepancies, coverage)
+
+    if args.output:
+        discrepancies.to_csv(args.output, index=False)
+        print(f"\n✓ Discrepancies saved to {args.output}")
+    return 0 if discrepancies.empty else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
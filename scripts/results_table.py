@@ -0,0 +1,87 @@
+"""
+Columnar view of the nested results JSON.
+
+`results_by_year -> contest -> county -> record` is convenient for the map
+but slow to analyse. `results_to_frame` flattens it once into a DataFrame
+with one row per contest x county, which the validators and derived-output
+builders work on with vectorized operations.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RESULTS_FILE = Path('data/indiana_election_results.json')
+
+VOTE_COLUMNS = ['dem_votes', 'rep_votes', 'other_votes', 'total_votes', 'two_party_total', 'margin']
+
+
+def load_results(path=RESULTS_FILE):
+    """Load the results JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def results_to_frame(results_by_year):
+    """Flatten results_by_year into one row per contest x county"""
+    rows = []
+    for year, year_data in results_by_year.items():
+        for contest, contest_data in year_data.items():
+            for county, rec in contest_data.items():
+                comp = rec.get('competitiveness') or {}
+                rows.append((
+                    str(year), contest, county, rec.get('county_id', -1), rec.get('geoid'),
+                    rec.get('dem_votes', 0), rec.get('rep_votes', 0), rec.get('other_votes', 0),
+                    rec.get('total_votes', 0), rec.get('two_party_total', 0), rec.get('margin', 0),
+                    rec.get('margin_pct', 0.0), rec.get('winner'),
+                    comp.get('code'), comp.get('color'), comp.get('category'), comp.get('party'),
+                ))
+
+    frame = pd.DataFrame(rows, columns=[
+        'year', 'contest', 'county', 'county_id', 'geoid',
+        *VOTE_COLUMNS, 'margin_pct', 'winner',
+        'code', 'color', 'category', 'party',
+    ])
+    frame[VOTE_COLUMNS] = frame[VOTE_COLUMNS].fillna(0).astype('int64')
+    frame['county_id'] = frame['county_id'].fillna(-1).astype('int32')
+    frame['margin_pct'] = frame['margin_pct'].astype(float)
+    return frame
+
+
+def contest_hashes(results_by_year):
+    """Content hash of every contest, keyed by (year, contest)"""
+    hashes = {}
+    for year, year_data in results_by_year.items():
+        for contest, contest_data in year_data.items():
+            payload = json.dumps(contest_data, sort_keys=True, separators=(',', ':'))
+            hashes[(str(year), contest)] = hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    return hashes
+
+
+def contest_vote_arrays(frame, n_counties, columns=('dem_votes', 'rep_votes', 'other_votes', 'total_votes')):
+    """Dense contest x county x column vote array from a results frame.
+
+    Returns (contests, votes) where contests lists 'year|contest' keys in
+    first-seen order and votes has shape (len(contests), n_counties, len(columns)).
+    Rows without a county id are skipped.
+    """
+    frame = frame[frame['county_id'] >= 0]
+    codes, contests = (frame['year'] + '|' + frame['contest']).factorize()
+    votes = np.zeros((len(contests), n_counties, len(columns)), dtype=np.int64)
+    np.add.at(votes, (codes, frame['county_id'].to_numpy()), frame[list(columns)].to_numpy())
+    return list(contests), votes
+
+
+def write_results(path, data, **dump_kwargs):
+    """Write a JSON artifact atomically: dump next to it, then rename into place.
+
+    Readers (the map, the query server) never see a half-written file.
+    """
+    path = Path(path)
+    tmp_file = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp_file, path)
@@ -0,0 +1,150 @@
+"""
+Statewide, regional and custom county-group rollups.
+
+Groups are lists of counties: the whole state, the `regions` in the state
+config (e.g. Northwest Indiana, the Indianapolis metro and its collar
+counties) and any extra groups passed on the command line. Groups may
+overlap, so instead of a single-label group-by the county vote arrays are
+summed through a group x county membership matrix, one matrix product for
+every contest at once. Each rollup carries margins and competitiveness on the
+same scale as the county records, so the map never re-sums counties.
+
+Written into the results JSON under `rollups` by aggregate_statewide.py. To
+add your own groups to an existing results file:
+    python scripts/rollups.py --groups my_groups.json
+where my_groups.json looks like the config's `regions` section:
+    {"river_counties": {"name": "Ohio River", "counties": ["Posey", "Vanderburgh", ...]}}
+"""
+import argparse
+import json
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from competitiveness import CATEGORIES, COLORS, PARTIES, classify_margins
+from county_registry import CountyRegistry
+from results_table import contest_vote_arrays, load_results, results_to_frame, write_results
+from state_config import DEFAULT_CONFIG, load_state_config
+
+ROLLUP_VOTES = ['dem_votes', 'rep_votes', 'other_votes', 'total_votes']
+
+
+def group_membership(groups, registry):
+    """Boolean group x county matrix for {group_id: {'name', 'counties'}}"""
+    membership = np.zeros((len(groups), len(registry)), dtype=bool)
+    for row, (group_id, group) in enumerate(groups.items()):
+        counties = group.get('counties')
+        if counties is None:
+            membership[row] = True
+            continue
+        ids = registry.resolve(counties)
+        unknown = [name for name, i in zip(counties, ids) if i < 0]
+        if unknown:
+            raise ValueError(f"Group '{group_id}' lists unknown counties: {', '.join(map(str, unknown))}")
+        membership[row, ids] = True
+    return membership
+
+
+def top_candidates(results_by_year):
+    """Most frequent D and R candidate name per contest"""
+    names = {}
+    for year, year_data in results_by_year.items():
+        for contest, contest_data in year_data.items():
+            dem = Counter(r.get('dem_candidate') for r in contest_data.values() if r.get('dem_candidate') not in (None, 'N/A'))
+            rep = Counter(r.get('rep_candidate') for r in contest_data.values() if r.get('rep_candidate') not in (None, 'N/A'))
+            names[(str(year), contest)] = (dem.most_common(1)[0][0] if dem else None,
+                                           rep.most_common(1)[0][0] if rep else None)
+    return names
+
+
+def build_rollups(results, groups, state_name=None):
+    """Roll every contest up to each county group.
+
+    `results` is the results dict (meta + results_by_year); `groups` maps a
+    group id to {'name': ..., 'counties': [...]}. A statewide group covering
+    every county is always added first.
+    """
+    meta = results.get('meta', {})
+    records = meta.get('counties') or []
+    registry = CountyRegistry([c['geoid'] for c in records], [c['name'] for c in records])
+    groups = {'statewide': {'name': state_name or meta.get('state', 'Statewide'), 'counties': None}, **groups}
+    membership = group_membership(groups, registry)
+
+    frame = results_to_frame(results['results_by_year'])
+    frame = frame[frame['county_id'] >= 0]
+
+    # contest x county x vote-column array, then one product with the membership matrix
+    contests, votes = contest_vote_arrays(frame, len(registry), ROLLUP_VOTES)
+    contest_codes = pd.Index(contests).get_indexer(frame['year'] + '|' + frame['contest'])
+    reporting = np.zeros((len(contests), len(registry)), dtype=np.int64)
+    reporting[contest_codes, frame['county_id'].to_numpy()] = 1
+
+    totals = np.einsum('ckv,gk->cgv', votes, membership.astype(np.int64))
+    counties = reporting @ membership.T.astype(np.int64)
+
+    dem, rep, other, total = (totals[..., i] for i in range(len(ROLLUP_VOTES)))
+    two_party = dem + rep
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin_pct = np.where(two_party > 0, np.round((rep - dem) / two_party * 100, 2), 0.0)
+    winner = np.where(two_party > 0, np.where(rep > dem, 'REP', 'DEM'), 'TIE')
+    codes = classify_margins(margin_pct.ravel(), winner.ravel()).reshape(margin_pct.shape)
+
+    candidates = top_candidates(results['results_by_year'])
+    group_ids = list(groups)
+    by_year = {}
+    for c, key in enumerate(contests):
+        year, contest = key.split('|', 1)
+        dem_candidate, rep_candidate = candidates.get((year, contest), (None, None))
+        rollup = {}
+        for g, group_id in enumerate(group_ids):
+            if counties[c, g] == 0:
+                continue
+            code = codes[c, g]
+            rollup[group_id] = {
+                'dem_votes': int(dem[c, g]), 'rep_votes': int(rep[c, g]),
+                'other_votes': int(other[c, g]), 'total_votes': int(total[c, g]),
+                'two_party_total': int(two_party[c, g]), 'margin': int(rep[c, g] - dem[c, g]),
+                'margin_pct': float(margin_pct[c, g]), 'winner': str(winner[c, g]),
+                'counties_reporting': int(counties[c, g]),
+                'competitiveness': {'code': code, 'color': COLORS[code],
+                                    'category': CATEGORIES[code], 'party': PARTIES[code]},
+            }
+        by_year.setdefault(year, {})[contest] = {
+            'dem_candidate': dem_candidate, 'rep_candidate': rep_candidate, 'groups': rollup,
+        }
+
+    return {
+        'groups': {
+            group_id: {'name': group['name'],
+                       'counties': [str(g) for g in registry.geoids[membership[i]]]}
+            for i, (group_id, group) in enumerate(groups.items())
+        },
+        'by_year': by_year,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add county-group rollups to the results JSON')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--groups', help='JSON file of extra county groups, in the config regions format')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    groups = dict(config['regions'])
+    if args.groups:
+        with open(args.groups, 'r', encoding='utf-8') as f:
+            groups.update(json.load(f))
+
+    output_file = Path(config['output'])
+    results = load_results(output_file)
+    results['rollups'] = build_rollups(results, groups, config['state'])
+    write_results(output_file, results, indent=2)
+
+    print(f"✓ Rolled up {len(results['rollups']['groups'])} county groups into {output_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
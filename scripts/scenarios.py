@@ -0,0 +1,270 @@
+"""
+What-if scenarios over a contest's county vote arrays.
+
+A scenario shifts the two-party margin and/or scales turnout:
+- uniform swing: every county's R-minus-D margin moves by the same number
+  of points
+- proportional swing: the losing side of the swing gives up the same
+  fraction of its own vote share everywhere, so counties where it is weak
+  move less (and no county's share can go negative)
+- turnout multipliers: per-county factors on all votes cast, e.g. "Marion
+  at its 2020 turnout"
+
+Scenarios are evaluated as scenario x county arrays, so a sweep of
+thousands of swings is a handful of NumPy operations. Each run gives county
+margins and competitiveness codes plus the statewide margin, winner and
+counties won; a sweep also gives the tipping point (the swing at which the
+statewide winner flips) and the swing at which every county flips.
+
+Contests are named by registry slug or by "year|contest".
+
+Usage:
+    python scripts/scenarios.py --contest president_2024 --swing -5
+    python scripts/scenarios.py --contest governor_2024 --swing 3 --method proportional --turnout Marion=1.1
+    python scripts/scenarios.py --contest us_senate_c3_2022 --turnout-match president_2020 --counties Marion
+    python scripts/scenarios.py --contest president_2024 --sweep 30 --step 0.01 --output curve.csv
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from competitiveness import CODES, margin_code_indices
+from county_registry import CountyRegistry
+from results_table import contest_vote_arrays, load_results, results_to_frame
+from state_config import DEFAULT_CONFIG, load_state_config
+
+SWING_METHODS = ['uniform', 'proportional']
+
+
+class ContestVotes:
+    """DEM / REP / other vote vectors of one contest, indexed by county id"""
+
+    def __init__(self, key, registry, dem, rep, other):
+        self.key = key
+        self.registry = registry
+        self.dem = dem
+        self.rep = rep
+        self.other = other
+
+    @classmethod
+    def from_results(cls, results, contest):
+        """Load a contest by registry slug or 'year|contest' key"""
+        key = resolve_contest_key(results, contest)
+        year, name = key.split('|', 1)
+        records = results['meta'].get('counties') or []
+        registry = CountyRegistry([c['geoid'] for c in records], [c['name'] for c in records])
+        frame = results_to_frame({year: {name: results['results_by_year'][year][name]}})
+        _, votes = contest_vote_arrays(frame, len(registry), ['dem_votes', 'rep_votes', 'other_votes'])
+        dem, rep, other = (votes[0, :, i].astype(float) for i in range(3))
+        return cls(key, registry, dem, rep, other)
+
+    @property
+    def total(self):
+        return self.dem + self.rep + self.other
+
+
+def resolve_contest_key(results, contest):
+    """'year|contest' key for a registry slug or an existing key"""
+    for entry in results.get('contests', {}).get('contests', []):
+        if entry['slug'] == contest:
+            return f"{entry['year']}|{entry['contest']}"
+    year, _, name = contest.partition('|')
+    if name in results['results_by_year'].get(year, {}):
+        return contest
+    raise ValueError(f"Unknown contest '{contest}' (use a registry slug or 'year|contest')")
+
+
+def apply_swing(dem, rep, swings, method='uniform'):
+    """Shift R-minus-D margins by `swings` points (> 0 toward Republicans).
+
+    dem and rep are county vectors; swings has shape (S,). Returns scenario x
+    county (dem, rep) arrays with each county's two-party total unchanged.
+    """
+    two_party = dem + rep
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rep_share = np.where(two_party > 0, rep / two_party, 0.5)
+    shift = np.asarray(swings, dtype=float)[:, None] / 200  # share points per margin point
+
+    if method == 'uniform':
+        new_rep_share = rep_share[None, :] + shift
+    elif method == 'proportional':
+        # Each side loses the same fraction of its own share, sized to move the state by `shift`
+        state_rep = rep.sum() / two_party.sum()
+        dem_loss = np.clip(shift / (1 - state_rep), 0, 1)
+        rep_loss = np.clip(-shift / state_rep, 0, 1)
+        new_rep_share = rep_share + (1 - rep_share) * dem_loss - rep_share * rep_loss
+    else:
+        raise ValueError(f"Unknown swing method '{method}' (expected one of {', '.join(SWING_METHODS)})")
+
+    new_rep_share = np.clip(new_rep_share, 0, 1)
+    return two_party * (1 - new_rep_share), two_party * new_rep_share
+
+
+def run_scenarios(votes, swings=(0.0,), method='uniform', turnout=None):
+    """Evaluate scenarios for a ContestVotes.
+
+    `turnout` is a county vector of multipliers (or scenario x county).
+    Returns a dict of arrays: county dem/rep/other, margin_pct and code
+    (scenario x county), and statewide dem/rep/total, margin_pct, code and
+    counties won by each party (per scenario).
+    """
+    dem, rep = apply_swing(votes.dem, votes.rep, swings, method)
+    other = np.broadcast_to(votes.other, dem.shape)
+    if turnout is not None:
+        dem, rep, other = dem * turnout, rep * turnout, other * turnout
+
+    two_party = dem + rep
+    with np.errstate(divide='ignore', invalid='ignore'):
+        margin_pct = np.where(two_party > 0, (rep - dem) / two_party * 100, 0.0)
+    state_dem, state_rep = dem.sum(axis=1), rep.sum(axis=1)
+    state_margin = (state_rep - state_dem) / (state_rep + state_dem) * 100
+    reporting = two_party > 0
+
+    return {
+        'dem': dem, 'rep': rep, 'other': other,
+        'margin_pct': margin_pct,
+        'code': margin_code_indices(margin_pct),
+        'state_dem': state_dem, 'state_rep': state_rep,
+        'state_total': state_dem + state_rep + other.sum(axis=1),
+        'state_margin_pct': state_margin,
+        'state_code': margin_code_indices(state_margin),
+        'counties_rep': np.count_nonzero((margin_pct > 0) & reporting, axis=1),
+        'counties_dem': np.count_nonzero((margin_pct < 0) & reporting, axis=1),
+    }
+
+
+def tipping_point(swings, state_margin):
+    """Swing at which the statewide margin crosses zero (interpolated), or None"""
+    swings = np.asarray(swings, dtype=float)
+    crossings = np.flatnonzero(np.diff(np.sign(state_margin)) != 0)
+    if len(crossings) == 0:
+        return None
+    i = crossings[0]
+    m0, m1 = state_margin[i], state_margin[i + 1]
+    return float(swings[i] + (swings[i + 1] - swings[i]) * (-m0 / (m1 - m0)))
+
+
+def county_flip_swings(swings, margin_pct, baseline_margin):
+    """Smallest-magnitude swing in the sweep that flips each county, NaN if none"""
+    swings = np.asarray(swings, dtype=float)
+    flipped = np.sign(margin_pct) != np.sign(baseline_margin)[None, :]
+    flipped &= baseline_margin[None, :] != 0
+    distance = np.where(flipped, np.abs(swings)[:, None], np.inf)
+    first = distance.argmin(axis=0)
+    return np.where(np.isfinite(distance.min(axis=0)), swings[first], np.nan)
+
+
+def turnout_multipliers(results, votes, reference, counties=None):
+    """Per-county factors that scale a contest's turnout to a reference contest's.
+
+    Only `counties` (names or GEOIDs) are rescaled when given; others stay at 1.
+    """
+    ref = ContestVotes.from_results(results, reference)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors = np.where(votes.total > 0, ref.total / votes.total, 1.0)
+    if counties:
+        ids = votes.registry.resolve(counties)
+        unknown = [name for name, i in zip(counties, ids) if i < 0]
+        if unknown:
+            raise ValueError(f"Unknown counties: {', '.join(unknown)}")
+        mask = np.zeros(len(factors), dtype=bool)
+        mask[ids] = True
+        factors = np.where(mask, factors, 1.0)
+    return factors
+
+
+def parse_turnout(specs, registry):
+    """County multipliers from 'County=factor' strings"""
+    factors = np.ones(len(registry))
+    for spec in specs or []:
+        name, _, value = spec.partition('=')
+        county_id = registry.lookup(name.strip())
+        if county_id < 0:
+            raise ValueError(f"Unknown county in --turnout: '{name}'")
+        factors[county_id] = float(value)
+    return factors
+
+
+def _describe(label, run, i=0):
+    margin = run['state_margin_pct'][i]
+    leader = 'R' if margin > 0 else 'D'
+    print(f"  {label}: {leader}+{abs(margin):.2f} ({CODES[run['state_code'][i]]}), "
+          f"counties R {run['counties_rep'][i]} / D {run['counties_dem'][i]}, "
+          f"{run['state_total'][i]:,.0f} votes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='What-if swing and turnout scenarios for one contest')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--contest', required=True, help="Registry slug (e.g. president_2024) or 'year|contest'")
+    parser.add_argument('--swing', type=float, default=0.0, help='Margin swing in points, > 0 toward Republicans')
+    parser.add_argument('--method', choices=SWING_METHODS, default='uniform', help='Swing model (default: %(default)s)')
+    parser.add_argument('--turnout', nargs='*', metavar='COUNTY=FACTOR', help='Per-county turnout multipliers')
+    parser.add_argument('--turnout-match', metavar='CONTEST', help='Scale turnout to match another contest')
+    parser.add_argument('--counties', nargs='*', help='Counties --turnout-match applies to (default: all)')
+    parser.add_argument('--sweep', type=float, metavar='POINTS', help='Sweep swings from -POINTS to +POINTS')
+    parser.add_argument('--step', type=float, default=0.1, help='Sweep step in points (default: %(default)s)')
+    parser.add_argument('--output', help='CSV for the sweep curve')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    results = load_results(config['output'])
+    try:
+        votes = ContestVotes.from_results(results, args.contest)
+        turnout = parse_turnout(args.turnout, votes.registry)
+        if args.turnout_match:
+            turnout = turnout * turnout_multipliers(results, votes, args.turnout_match, args.counties)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    print(f"📊 {votes.key}")
+    _describe('Actual', run_scenarios(votes))
+
+    if args.sweep is None:
+        run = run_scenarios(votes, [args.swing], args.method, turnout)
+        _describe(f"Scenario ({args.method} swing {args.swing:+g}, turnout x{turnout @ votes.total / votes.total.sum():.3f})", run)
+        baseline = run_scenarios(votes)['margin_pct'][0]
+        flipped = np.flatnonzero(np.sign(run['margin_pct'][0]) != np.sign(baseline))
+        if len(flipped):
+            print(f"  Flipped counties: {', '.join(votes.registry.names[flipped])}")
+        return 0
+
+    swings = np.round(np.arange(-args.sweep, args.sweep + args.step / 2, args.step), 6)
+    start = time.perf_counter()
+    run = run_scenarios(votes, swings, args.method, turnout)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {len(swings):,} scenarios in {elapsed * 1000:.1f} ms ({len(swings) / max(elapsed, 1e-9):,.0f}/s)")
+
+    tip = tipping_point(swings, run['state_margin_pct'])
+    if tip is None:
+        print(f"  No statewide flip within ±{args.sweep:g} points")
+    else:
+        print(f"  Tipping point: {args.method} swing of {tip:+.2f} points")
+
+    baseline = run_scenarios(votes, [0.0], args.method, turnout)['margin_pct'][0]
+    flips = county_flip_swings(swings, run['margin_pct'], baseline)
+    closest = np.argsort(np.abs(np.nan_to_num(flips, nan=np.inf)))[:10]
+    for county_id in closest:
+        if not np.isnan(flips[county_id]):
+            print(f"    {votes.registry.names[county_id]:<12} flips at {flips[county_id]:+.2f}")
+
+    if args.output:
+        curve = pd.DataFrame({
+            'swing': swings,
+            'dem_votes': np.rint(run['state_dem']).astype(np.int64),
+            'rep_votes': np.rint(run['state_rep']).astype(np.int64),
+            'margin_pct': np.round(run['state_margin_pct'], 2),
+            'code': [CODES[c] for c in run['state_code']],
+            'counties_rep': run['counties_rep'],
+            'counties_dem': run['counties_dem'],
+        })
+        curve.to_csv(args.output, index=False)
+        print(f"✓ Sweep curve saved to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,287 @@
+"""
+Local HTTP query API over the aggregated results.
+
+Loads the results JSON once, indexes it by year, contest and county id, and
+serves JSON slices so the map and analysis notebooks don't have to fetch and
+walk the whole file:
+
+    GET /api/meta                        build metadata
+    GET /api/counties                    county registry (id, geoid, name)
+    GET /api/counties/{county}           every contest for one county
+                                         ({county} is an id, GEOID or name)
+    GET /api/contests                    list of (year, contest, counties)
+    GET /api/contests/{year}/{contest}   one contest for all counties
+    GET /api/years/{year}                every contest in one year
+    GET /api/candidates                  candidate registry (id, name, party)
+    GET /api/candidates/{id}             one candidate's career: every
+                                         contest with its statewide result
+
+Every slice is serialized and gzip-compressed once at startup. Responses
+carry a strong ETag and Cache-Control, honour If-None-Match with 304, and
+are sent gzip-encoded when the client accepts it.
+
+Built on asyncio streams only, no third-party server.
+
+Usage:
+    python scripts/serve_results.py --port 8001
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from county_registry import CountyRegistry
+from results_table import RESULTS_FILE, load_results
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 15
+# Request bodies up to this size are read and discarded; larger ones close the connection
+MAX_DISCARDED_BODY = 64 * 1024
+
+
+class Slice:
+    """A JSON response body, serialized and compressed once"""
+
+    __slots__ = ('body', 'gzip_body', 'etag')
+
+    def __init__(self, payload):
+        self.body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+
+class ResultsIndex:
+    """Results JSON indexed by year, (year, contest) and county id"""
+
+    def __init__(self, data):
+        results_by_year = data['results_by_year']
+        meta = data.get('meta', {})
+        records = meta.get('counties') or []
+        self.registry = CountyRegistry([c['geoid'] for c in records], [c['name'] for c in records])
+
+        by_county = {}
+        contest_list = []
+        for year, year_data in results_by_year.items():
+            for contest, contest_data in year_data.items():
+                contest_list.append({'year': year, 'contest': contest, 'counties': len(contest_data)})
+                for name, rec in contest_data.items():
+                    county_id = rec.get('county_id', self.registry.lookup(name))
+                    by_county.setdefault(county_id, {}).setdefault(year, {})[contest] = rec
+
+        self.meta = Slice(meta)
+        self.counties = Slice(records)
+        self.contest_list = Slice(contest_list)
+        self.years = {year: Slice(year_data) for year, year_data in results_by_year.items()}
+        self.contests = {
+            (year, contest): Slice(contest_data)
+            for year, year_data in results_by_year.items()
+            for contest, contest_data in year_data.items()
+        }
+        candidates = data.get('candidates', {}).get('candidates', [])
+        self.candidate_list = Slice([{k: c[k] for k in ('id', 'name', 'party')} for c in candidates])
+        self.candidate_slices = {
+            str(c['id']): Slice(self._career(c, data)) for c in candidates
+        }
+        self.county_slices = {
+            county_id: Slice({'county': records[county_id], 'results_by_year': results})
+            for county_id, results in by_county.items()
+            if 0 <= county_id < len(records)
+        }
+
+    @staticmethod
+    def _career(candidate, data):
+        """Candidate entry with each general-election contest and its statewide rollup"""
+        contests = {c['id']: c for c in data.get('contests', {}).get('contests', [])}
+        rollups = data.get('rollups', {}).get('by_year', {})
+        career = []
+        for contest_id in candidate['contests']:
+            contest = contests[contest_id]
+            rollup = rollups.get(contest['year'], {}).get(contest['contest'], {})
+            career.append({**contest, 'statewide': rollup.get('groups', {}).get('statewide')})
+        return {**candidate, 'contests': career}
+
+    def __len__(self):
+        return len(self.contests)
+
+    def route(self, path):
+        """Resolve a request path to a Slice, or None"""
+        parts = [unquote(p) for p in path.strip('/').split('/')]
+        if not parts or parts[0] != 'api':
+            return None
+        parts = parts[1:]
+
+        if parts == ['meta']:
+            return self.meta
+        if parts == ['counties']:
+            return self.counties
+        if parts == ['contests']:
+            return self.contest_list
+        if len(parts) == 2 and parts[0] == 'counties':
+            key = parts[1]
+            county_id = int(key) if key.isdigit() and len(key) < 4 else self.registry.lookup(key)
+            return self.county_slices.get(county_id)
+        if parts == ['candidates']:
+            return self.candidate_list
+        if len(parts) == 2 and parts[0] == 'candidates':
+            return self.candidate_slices.get(parts[1])
+        if len(parts) == 2 and parts[0] == 'years':
+            return self.years.get(parts[1])
+        if len(parts) == 3 and parts[0] == 'contests':
+            return self.contests.get((parts[1], parts[2]))
+        return None
+
+
+def _response(status, headers, body=b''):
+    lines = [f'HTTP/1.1 {status} {REASONS[status]}']
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+def _error(status, message):
+    body = json.dumps({'error': message}).encode('utf-8')
+    return status, {'Content-Type': 'application/json', 'Content-Length': str(len(body))}, body
+
+
+def accepts_gzip(accept_encoding):
+    """Whether an Accept-Encoding header allows gzip: listed (or '*' if gzip is not) with q above 0"""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = [p.strip() for p in part.split(';')]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    for coding in ('gzip', 'x-gzip', '*'):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def respond(index, method, target, headers, max_age):
+    """Build (status, headers, body) for one request"""
+    if method not in ('GET', 'HEAD'):
+        return _error(405, f'{method} not supported')
+
+    item = index.route(urlsplit(target).path)
+    if item is None:
+        return _error(404, f'No such resource: {target}')
+
+    common = {
+        'ETag': item.etag,
+        'Cache-Control': f'public, max-age={max_age}',
+        'Vary': 'Accept-Encoding',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag',
+    }
+    if item.etag in [tag.strip() for tag in headers.get('if-none-match', '').split(',')]:
+        return 304, common, b''
+
+    if accepts_gzip(headers.get('accept-encoding', '')):
+        body = item.gzip_body
+        common['Content-Encoding'] = 'gzip'
+    else:
+        body = item.body
+    common['Content-Type'] = 'application/json'
+    common['Content-Length'] = str(len(body))
+    return 200, common, body if method == 'GET' else b''
+
+
+async def handle_connection(index, reader, writer, max_age):
+    """Serve requests on one connection until it closes or goes idle"""
+    try:
+        while True:
+            try:
+                request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            if not request_line:
+                break
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            # Skip any request body so it isn't read as the next request; one
+            # that can't be skipped cheaply ends the connection after the reply
+            framed = 'transfer-encoding' not in headers
+            try:
+                length = int(headers.get('content-length', 0))
+            except ValueError:
+                length = -1
+            if framed and 0 < length <= MAX_DISCARDED_BODY:
+                await reader.readexactly(length)
+            elif length:
+                framed = False
+
+            try:
+                method, target, version = request_line.decode('latin-1').split()
+            except ValueError:
+                status, resp_headers, body = _error(400, 'Malformed request line')
+                version = 'HTTP/1.0'
+            else:
+                if length < 0:
+                    status, resp_headers, body = _error(400, 'Malformed Content-Length')
+                else:
+                    status, resp_headers, body = respond(index, method, target, headers, max_age)
+
+            keep_alive = (framed and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+            resp_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+            writer.write(_response(status, resp_headers, body))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(index, host, port, max_age):
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(index, r, w, max_age), host, port)
+    print(f"✓ Serving {len(index)} contests on http://{host}:{port}/api/")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve election result slices over HTTP')
+    parser.add_argument('--results', default=str(RESULTS_FILE), help='Results JSON (default: %(default)s)')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8001, help='Port (default: %(default)s)')
+    parser.add_argument('--max-age', type=int, default=300, help='Cache-Control max-age in seconds (default: %(default)s)')
+    args = parser.parse_args()
+
+    if not Path(args.results).exists():
+        print(f"❌ Error: {args.results} not found")
+        return 1
+
+    start = time.perf_counter()
+    index = ResultsIndex(load_results(args.results))
+    print(f"✓ Indexed {args.results} in {time.perf_counter() - start:.2f}s")
+
+    try:
+        asyncio.run(serve(index, args.host, args.port, args.max_age))
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,214 @@
+"""
+Shapefile (.shp/.shx/.dbf/.prj) reader in pure Python and NumPy.
+
+Reads polygon shapefiles such as the TIGER county boundaries without GDAL:
+record offsets come from the .shx, each record's parts and points are
+viewed straight out of the .shp bytes, ring orientation is computed for
+all rings of a record at once, and the .dbf is decoded as one fixed-width
+NumPy record array. Coordinates are reprojected to WGS84: geographic NAD83
+and WGS84 (the TIGER files are NAD83) are used as-is, the same null
+transformation PROJ applies without datum grids; any other CRS needs pyproj.
+
+Used by convert_shapefile.py; geopandas remains available there as an
+optional backend.
+"""
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+# Polygon, PolygonZ, PolygonM: the same part/point layout, Z/M values follow the points
+POLYGON_TYPES = {5, 15, 25}
+# Geographic datums treated as WGS84 without a transformation
+WGS84_DATUMS = {'d_north_american_1983', 'north_american_datum_1983', 'd_wgs_1984', 'wgs_1984', 'wgs84'}
+
+# Decimal places kept in the GeoJSON (~1 cm); TIGER coordinates have 6
+COORDINATE_PRECISION = 7
+
+CRS84 = {'type': 'name', 'properties': {'name': 'urn:ogc:def:crs:OGC:1.3:CRS84'}}
+
+
+def read_shx(path):
+    """Byte offset and length of every .shp record"""
+    data = Path(path).read_bytes()
+    index = np.frombuffer(data, dtype='>i4', offset=100).reshape(-1, 2).astype(np.int64) * 2
+    return index[:, 0], index[:, 1]
+
+
+def signed_areas(points, starts):
+    """Signed area of each ring (points split at `starts`); < 0 is clockwise"""
+    x, y = points[:, 0], points[:, 1]
+    cross = x * np.roll(y, -1) - np.roll(x, -1) * y
+    # The roll wraps each ring's last point onto the next ring's first; rings are closed, so drop those terms
+    ends = np.append(starts[1:], len(points)) - 1
+    cross[ends] = 0
+    return np.add.reduceat(cross, starts) / 2
+
+
+def point_in_ring(point, ring):
+    """Even-odd test of one point against one closed ring"""
+    x, y = point
+    x0, y0, x1, y1 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+    crosses = (y0 > y) != (y1 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    return bool(np.count_nonzero(crosses & (x < x_at)) % 2)
+
+
+def polygon_geometry(points, parts):
+    """GeoJSON Polygon/MultiPolygon for one record's points and part starts.
+
+    Shapefile outer rings are clockwise and holes counterclockwise; each
+    hole is attached to the outer ring containing its first vertex. Rings
+    keep their stored orientation.
+    """
+    areas = signed_areas(points, parts)
+    rings = np.split(points, parts[1:])
+    outers = [i for i, area in enumerate(areas) if area <= 0]
+    polygons = {i: [rings[i]] for i in outers}
+    for i in np.flatnonzero(areas > 0):
+        owner = next((o for o in outers if point_in_ring(rings[i][0], rings[o])), outers[0] if outers else None)
+        if owner is None:
+            polygons[i] = [rings[i]]
+        else:
+            polygons[owner].append(rings[i])
+
+    coordinates = [[ring.tolist() for ring in polygon] for polygon in polygons.values()]
+    if len(coordinates) == 1:
+        return {'type': 'Polygon', 'coordinates': coordinates[0]}
+    return {'type': 'MultiPolygon', 'coordinates': coordinates}
+
+
+def read_shp(path, shx_path=None):
+    """(points, part starts) views for every record of a polygon .shp; None for null shapes"""
+    path = Path(path)
+    data = path.read_bytes()
+    offsets, _ = read_shx(shx_path or path.with_suffix('.shx'))
+    geometries = []
+    for offset in offsets:
+        content = offset + 8
+        shape_type = int(np.frombuffer(data, dtype='<i4', count=1, offset=content)[0])
+        if shape_type == 0:
+            geometries.append(None)
+            continue
+        if shape_type not in POLYGON_TYPES:
+            raise ValueError(f"{path.name}: shape type {shape_type} is not supported (polygons only)")
+        num_parts, num_points = np.frombuffer(data, dtype='<i4', count=2, offset=content + 36)
+        parts = np.frombuffer(data, dtype='<i4', count=num_parts, offset=content + 44)
+        points = np.frombuffer(data, dtype='<f8', count=2 * num_points,
+                               offset=content + 44 + 4 * num_parts).reshape(-1, 2)
+        geometries.append((points, parts))
+    return geometries
+
+
+def _dbf_value(kind, decimals, raw):
+    """Python value of one stripped, decoded .dbf field"""
+    if raw == '' or set(raw) <= {'*', '?'}:
+        return None
+    if kind == 'N' and decimals == 0:
+        return int(raw)
+    if kind in ('N', 'F'):
+        return float(raw)
+    if kind == 'L':
+        return raw.upper() in ('T', 'Y')
+    if kind == 'D':
+        return f"{raw[:4]}-{raw[4:6]}-{raw[6:]}"
+    return raw
+
+
+def read_dbf(path, encoding='utf-8'):
+    """Live attribute records of a .dbf as dicts, plus the per-record live (not deleted) mask"""
+    data = Path(path).read_bytes()
+    num_records = int(np.frombuffer(data, dtype='<u4', count=1, offset=4)[0])
+    header_length, record_length = (int(v) for v in np.frombuffer(data, dtype='<u2', count=2, offset=8))
+
+    fields = []
+    for start in range(32, header_length - 1, 32):
+        if data[start] == 0x0D:
+            break
+        name = data[start:start + 11].split(b'\0', 1)[0].decode('ascii')
+        fields.append((name, chr(data[start + 11]), data[start + 16], data[start + 17]))
+
+    # One fixed-width record array over every row; the leading byte is the deletion flag
+    dtype = np.dtype([('_deleted', 'S1')] + [(name, f'S{length}') for name, _, length, _ in fields])
+    if dtype.itemsize != record_length:
+        raise ValueError(f"{Path(path).name}: field widths add up to {dtype.itemsize}, expected {record_length}")
+    rows = np.frombuffer(data, dtype=dtype, count=num_records, offset=header_length)
+
+    columns = {}
+    for name, kind, _, decimals in fields:
+        text = np.char.strip(np.char.decode(rows[name], encoding, errors='replace'))
+        columns[name] = [_dbf_value(kind, decimals, value) for value in text.tolist()]
+    live = rows['_deleted'] != b'*'
+    return [{name: columns[name][i] for name, *_ in fields} for i in np.flatnonzero(live)], live
+
+
+def read_prj(path):
+    """WKT of the .prj, or None"""
+    path = Path(path)
+    return path.read_text(encoding='utf-8').strip() if path.exists() else None
+
+
+def crs_name(wkt):
+    match = re.match(r'\s*(?:GEOGCS|PROJCS|GEOGCRS|PROJCRS)\["([^"]+)"', wkt or '')
+    return match.group(1) if match else 'unknown'
+
+
+def is_wgs84_compatible(wkt):
+    """Geographic CRS on the NAD83 or WGS84 datum"""
+    if not wkt or not wkt.lstrip().upper().startswith(('GEOGCS', 'GEOGCRS')):
+        return False
+    datum = re.search(r'DATUM\["([^"]+)"', wkt)
+    return bool(datum) and datum.group(1).lower() in WGS84_DATUMS
+
+
+def wgs84_transform(wkt):
+    """Function reprojecting an (N, 2) coordinate array to WGS84 lon/lat"""
+    if wkt is None or is_wgs84_compatible(wkt):
+        return None
+    try:
+        from pyproj import Transformer
+    except ImportError:
+        raise ValueError(f"CRS '{crs_name(wkt)}' needs pyproj to reproject (pip install pyproj)") from None
+    transformer = Transformer.from_crs(wkt, 'EPSG:4326', always_xy=True)
+    return lambda points: np.column_stack(transformer.transform(points[:, 0], points[:, 1]))
+
+
+def read_shapefile(path, encoding=None):
+    """Read a polygon shapefile into a GeoJSON FeatureCollection (WGS84)"""
+    path = Path(path)
+    cpg = path.with_suffix('.cpg')
+    if encoding is None:
+        encoding = cpg.read_text().strip() if cpg.exists() else 'utf-8'
+    wkt = read_prj(path.with_suffix('.prj'))
+    transform = wgs84_transform(wkt)
+
+    records, live = read_dbf(path.with_suffix('.dbf'), encoding)
+    shapes = [shape for shape, keep in zip(read_shp(path), live) if keep]
+    features = []
+    for properties, shape in zip(records, shapes):
+        geometry = None
+        if shape is not None:
+            points, parts = shape
+            points = transform(points) if transform else points
+            geometry = polygon_geometry(np.round(points, COORDINATE_PRECISION), parts)
+        features.append({'type': 'Feature', 'properties': properties, 'geometry': geometry})
+
+    return {
+        'type': 'FeatureCollection',
+        'name': path.stem,
+        'crs': CRS84,
+        'features': features,
+    }
+
+
+def write_geojson(collection, path):
+    """Write a FeatureCollection with one feature per line"""
+    header = {k: v for k, v in collection.items() if k != 'features'}
+    lines = [json.dumps(feature, ensure_ascii=False) for feature in collection['features']]
+    body = ',\n'.join(lines)
+    text = json.dumps(header, ensure_ascii=False)[:-1] + ',\n"features": [\n' + body + '\n]\n}\n'
+    tmp_file = Path(f"{path}.tmp")
+    tmp_file.write_text(text, encoding='utf-8')
+    tmp_file.replace(path)
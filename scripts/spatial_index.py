@@ -0,0 +1,229 @@
+"""
+Spatial index and batched point-in-polygon lookup over the county geometry.
+
+Polygon parts are packed into an STR (Sort-Tile-Recursive) R-tree of
+bounding boxes. A batch of points walks the tree level by level as NumPy
+arrays, giving candidate (point, part) pairs. Each part's edges are
+bucketed into horizontal bands, so a candidate is only tested against the
+edges in its own band. The crossing-number test for all (point, edge)
+pairs of a chunk runs as one vectorized pass. Points on no polygon get -1.
+
+Works on any polygon GeoJSON with an id property: the county boundaries
+now, precinct boundaries once they are added.
+
+Usage:
+    python scripts/spatial_index.py --point -86.158 39.768
+    python scripts/spatial_index.py --points centroids.csv --lon lon --lat lat --output centroids_county.csv
+    python scripts/spatial_index.py --bench 1000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from state_config import DEFAULT_CONFIG, load_state_config
+
+# Children per tree node
+NODE_CAPACITY = 10
+# Target edges per band of a polygon part
+EDGES_PER_BAND = 4
+# (point, edge) pairs tested per chunk, to bound memory
+PAIRS_PER_CHUNK = 4_000_000
+
+
+class STRtree:
+    """Packed R-tree over (minx, miny, maxx, maxy) boxes, queried with arrays of points"""
+
+    def __init__(self, boxes, node_capacity=NODE_CAPACITY):
+        boxes = np.asarray(boxes, dtype=float)
+        if len(boxes) == 0:
+            raise ValueError("STRtree needs at least one box")
+        self.capacity = node_capacity
+
+        # Sort-Tile-Recursive order: vertical slices by x center, then y center within each slice
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        leaf_count = -(-len(boxes) // node_capacity)
+        slice_size = int(np.ceil(np.sqrt(leaf_count))) * node_capacity
+        by_x = np.argsort(centers[:, 0], kind='stable')
+        slices = np.arange(len(boxes)) // slice_size
+        self.items = by_x[np.lexsort((centers[by_x, 1], slices))]
+
+        levels = [boxes[self.items]]
+        while len(levels[-1]) > 1:
+            child = levels[-1]
+            starts = np.arange(0, len(child), node_capacity)
+            levels.append(np.column_stack([
+                np.minimum.reduceat(child[:, 0], starts), np.minimum.reduceat(child[:, 1], starts),
+                np.maximum.reduceat(child[:, 2], starts), np.maximum.reduceat(child[:, 3], starts),
+            ]))
+        self.levels = levels[::-1]  # root first
+
+        # Each level's boxes as (parent, child slot, 4), padded with empty boxes that nothing hits
+        self.children = []
+        for parents, level in zip(self.levels, self.levels[1:]):
+            padded = np.tile([np.inf, np.inf, -np.inf, -np.inf], (len(parents) * node_capacity, 1))
+            padded[:len(level)] = level
+            self.children.append(padded.reshape(len(parents), node_capacity, 4))
+
+    def query(self, x, y):
+        """(point index, item index) for every point inside an item's box"""
+        root = self.levels[0][0]
+        points = np.flatnonzero((x >= root[0]) & (x <= root[2]) & (y >= root[1]) & (y <= root[3]))
+        nodes = np.zeros(len(points), dtype=np.int64)
+        for children in self.children:
+            # Test every surviving point against all children of its node at once
+            box = children[nodes]
+            px, py = x[points][:, None], y[points][:, None]
+            hit = (px >= box[..., 0]) & (px <= box[..., 2]) & (py >= box[..., 1]) & (py <= box[..., 3])
+            rows, slots = np.nonzero(hit)
+            points, nodes = points[rows], nodes[rows] * self.capacity + slots
+        return points, self.items[nodes]
+
+
+class PolygonIndex:
+    """Point-in-polygon lookup over polygon features, returning feature indexes"""
+
+    def __init__(self, ids, geometries):
+        self.ids = np.asarray(ids, dtype=object)
+        part_feature, part_rings = [], []
+        for feature, geometry in enumerate(geometries):
+            if not geometry:
+                continue
+            polygons = geometry['coordinates'] if geometry['type'] == 'MultiPolygon' else [geometry['coordinates']]
+            for rings in polygons:
+                part_feature.append(feature)
+                part_rings.append([np.asarray(ring, dtype=float)[:, :2] for ring in rings])
+        self.part_feature = np.asarray(part_feature, dtype=np.int64)
+
+        # Every ring edge of every part: x0, y0, x1, y1
+        edges = [np.column_stack([r[:-1], r[1:]]) for rings in part_rings for r in rings]
+        edge_counts = [sum(len(r) - 1 for r in rings) for rings in part_rings]
+        self.edges = np.concatenate(edges)
+        self.edge_part = np.repeat(np.arange(len(part_rings)), edge_counts)
+
+        self.boxes = np.array([[min(r[:, 0].min() for r in rings), min(r[:, 1].min() for r in rings),
+                           max(r[:, 0].max() for r in rings), max(r[:, 1].max() for r in rings)]
+                          for rings in part_rings])
+        self.tree = STRtree(self.boxes)
+        self._build_bands(self.boxes, np.asarray(edge_counts), self.edge_part)
+
+    def _build_bands(self, boxes, edge_counts, edge_part):
+        """Bucket each part's edges into horizontal bands (CSR: band -> edge indexes)"""
+        self.band_count = np.clip(edge_counts // EDGES_PER_BAND, 1, 4096)
+        self.band_start = np.concatenate([[0], np.cumsum(self.band_count)[:-1]])
+        self.band_base = boxes[:, 1]
+        self.band_height = np.maximum((boxes[:, 3] - boxes[:, 1]) / self.band_count, 1e-12)
+
+        y0, y1 = self.edges[:, 1], self.edges[:, 3]
+        first = self._band(edge_part, np.minimum(y0, y1))
+        last = self._band(edge_part, np.maximum(y0, y1))
+        spans = last - first + 1
+        edge_ids = np.repeat(np.arange(len(self.edges)), spans)
+        bands = np.repeat(self.band_start[edge_part] + first, spans) + \
+            (np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans))
+
+        order = np.argsort(bands, kind='stable')
+        self.band_edges = edge_ids[order]
+        sizes = np.bincount(bands, minlength=int(self.band_count.sum()))
+        self.band_edge_start = np.concatenate([[0], np.cumsum(sizes)])
+
+    def _band(self, parts, y):
+        band = np.floor((y - self.band_base[parts]) / self.band_height[parts]).astype(np.int64)
+        return np.clip(band, 0, self.band_count[parts] - 1)
+
+    @classmethod
+    def from_geojson(cls, path, id_field):
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        return cls([f['properties'].get(id_field) for f in features], [f['geometry'] for f in features])
+
+    def lookup(self, x, y):
+        """Feature index containing each point (x = lon, y = lat arrays), -1 for none"""
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        result = np.full(len(x), -1, dtype=np.int64)
+        points, parts = self.tree.query(x, y)
+
+        # Candidate pairs -> (pair, edge) pairs through each point's band, in bounded chunks
+        bands = self.band_start[parts] + self._band(parts, y[points])
+        sizes = self.band_edge_start[bands + 1] - self.band_edge_start[bands]
+        bounds = np.searchsorted(np.cumsum(sizes), np.arange(PAIRS_PER_CHUNK, sizes.sum(), PAIRS_PER_CHUNK))
+        for chunk in np.split(np.arange(len(points)), bounds):
+            if len(chunk) == 0:
+                continue
+            counts = sizes[chunk]
+            pair = np.repeat(np.arange(len(chunk)), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            edge = self.band_edges[np.repeat(self.band_edge_start[bands[chunk]], counts) + offsets]
+
+            px, py = x[points[chunk]][pair], y[points[chunk]][pair]
+            x0, y0, x1, y1 = self.edges[edge].T
+            crosses = (y0 > py) != (y1 > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_at = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+            hits = np.bincount(pair, weights=crosses & (px < x_at), minlength=len(chunk))
+            inside = hits % 2 == 1
+            result[points[chunk][inside]] = self.part_feature[parts[chunk][inside]]
+        return result
+
+    def lookup_ids(self, x, y):
+        """Feature id (e.g. GEOID20) for each point, None for none"""
+        found = self.lookup(x, y)
+        return np.where(found >= 0, self.ids[np.maximum(found, 0)], None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resolve points to the polygons (counties) containing them')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--geojson', help='Polygon GeoJSON (default: the config geometry)')
+    parser.add_argument('--id-field', help='Feature id property (default: the config geoid_field)')
+    parser.add_argument('--point', nargs=2, type=float, action='append', metavar=('LON', 'LAT'), help='One point')
+    parser.add_argument('--points', help='CSV of points to resolve')
+    parser.add_argument('--lon', default='lon', help='Longitude column of --points (default: %(default)s)')
+    parser.add_argument('--lat', default='lat', help='Latitude column of --points (default: %(default)s)')
+    parser.add_argument('--output', help='CSV for --points with an added id column')
+    parser.add_argument('--bench', type=int, metavar='N', help='Time N random points in the bounding box')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    geojson = args.geojson or config['geometry']['geojson']
+    id_field = args.id_field or config['geometry'].get('geoid_field', 'GEOID20')
+
+    start = time.perf_counter()
+    index = PolygonIndex.from_geojson(geojson, id_field)
+    print(f"✓ Indexed {len(index.ids)} features ({len(index.part_feature)} parts, {len(index.edges):,} edges) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for lon, lat in args.point or []:
+        print(f"  ({lon}, {lat}) -> {index.lookup_ids([lon], [lat])[0]}")
+
+    if args.points:
+        points = pd.read_csv(args.points)
+        missing = [c for c in (args.lon, args.lat) if c not in points.columns]
+        if missing:
+            print(f"❌ Error: {args.points} has no column {', '.join(missing)}")
+            return 1
+        start = time.perf_counter()
+        points[id_field] = index.lookup_ids(points[args.lon].to_numpy(), points[args.lat].to_numpy())
+        elapsed = time.perf_counter() - start
+        print(f"✓ Resolved {len(points):,} points in {elapsed:.2f}s ({points[id_field].notna().sum():,} inside)")
+        if args.output:
+            points.to_csv(args.output, index=False)
+            print(f"✓ Saved to {args.output}")
+
+    if args.bench:
+        bounds = index.tree.levels[0][0]
+        rng = np.random.default_rng(0)
+        x = rng.uniform(bounds[0], bounds[2], args.bench)
+        y = rng.uniform(bounds[1], bounds[3], args.bench)
+        start = time.perf_counter()
+        found = index.lookup(x, y)
+        elapsed = time.perf_counter() - start
+        print(f"📊 {args.bench:,} points in {elapsed:.2f}s ({args.bench / elapsed:,.0f}/s), "
+              f"{(found >= 0).mean():.1%} inside a feature")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
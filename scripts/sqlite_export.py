@@ -0,0 +1,199 @@
+"""
+Normalized SQLite export of the results, for ad-hoc SQL.
+
+Tables:
+    counties(id, geoid, name)
+    contests(id, slug, year, date, contest, office_type, office, senate_class, previous_id)
+    candidates(id, name, party)
+    candidate_aliases(candidate_id, alias)
+    results(contest_id, county_id, year, dem_votes, rep_votes, other_votes, total_votes,
+            two_party_total, margin, margin_pct, winner, code, dem_candidate_id, rep_candidate_id)
+
+results is indexed on (contest_id, county_id) and (county_id, year). Views:
+    margins  one row per contest x county with names, office type, date and
+             two-party shares
+    swings   margins plus the prior contest for the same office in the same
+             county (prior_year, prior_margin_pct) and the swing since it
+
+Margins are Republican minus Democratic, so swing < 0 is toward Democrats.
+Counties where Democrats improved in every presidential year since 2012:
+    SELECT county FROM swings WHERE office_type = 'president' AND year > 2012
+    GROUP BY county_id HAVING MAX(swing) < 0;
+
+Written next to the results JSON by aggregate_statewide.py when the config
+has an `artifacts.sqlite` path; to rebuild it from the results JSON or query it:
+    python scripts/sqlite_export.py
+    python scripts/sqlite_export.py --query "SELECT * FROM margins WHERE county = 'Vigo'"
+"""
+import argparse
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from results_table import load_results
+from state_config import DEFAULT_CONFIG, load_state_config
+
+SCHEMA = """
+CREATE TABLE counties (
+    id INTEGER PRIMARY KEY,
+    geoid TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL
+);
+CREATE TABLE contests (
+    id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    year INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    contest TEXT NOT NULL,
+    office_type TEXT,
+    office TEXT,
+    senate_class INTEGER,
+    previous_id INTEGER REFERENCES contests(id)
+);
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    party TEXT NOT NULL
+);
+CREATE TABLE candidate_aliases (
+    candidate_id INTEGER NOT NULL REFERENCES candidates(id),
+    alias TEXT NOT NULL
+);
+CREATE TABLE results (
+    contest_id INTEGER NOT NULL REFERENCES contests(id),
+    county_id INTEGER NOT NULL REFERENCES counties(id),
+    year INTEGER NOT NULL,
+    dem_votes INTEGER NOT NULL,
+    rep_votes INTEGER NOT NULL,
+    other_votes INTEGER NOT NULL,
+    total_votes INTEGER NOT NULL,
+    two_party_total INTEGER NOT NULL,
+    margin INTEGER NOT NULL,
+    margin_pct REAL NOT NULL,
+    winner TEXT,
+    code TEXT,
+    dem_candidate_id INTEGER REFERENCES candidates(id),
+    rep_candidate_id INTEGER REFERENCES candidates(id)
+);
+CREATE UNIQUE INDEX results_contest_county ON results (contest_id, county_id);
+CREATE INDEX results_county_year ON results (county_id, year);
+CREATE INDEX contests_office_type ON contests (office_type, date);
+CREATE INDEX candidate_aliases_candidate ON candidate_aliases (candidate_id);
+
+CREATE VIEW margins AS
+SELECT r.contest_id, c.slug, c.year, c.date, c.contest, c.office_type, r.county_id, k.name AS county, k.geoid,
+       r.dem_votes, r.rep_votes, r.other_votes, r.total_votes, r.margin, r.margin_pct,
+       ROUND(100.0 * r.dem_votes / NULLIF(r.two_party_total, 0), 2) AS dem_share,
+       ROUND(100.0 * r.rep_votes / NULLIF(r.two_party_total, 0), 2) AS rep_share,
+       r.winner, r.code, r.dem_candidate_id, r.rep_candidate_id
+FROM results r
+JOIN contests c ON c.id = r.contest_id
+JOIN counties k ON k.id = r.county_id;
+
+CREATE VIEW swings AS
+SELECT *, ROUND(margin_pct - prior_margin_pct, 2) AS swing
+FROM (
+    SELECT m.*,
+           LAG(year) OVER w AS prior_year,
+           LAG(margin_pct) OVER w AS prior_margin_pct
+    FROM margins m
+    WINDOW w AS (PARTITION BY county_id, office_type ORDER BY date, contest_id)
+);
+"""
+
+
+def result_rows(results):
+    """One results row per contest x county in the results dict"""
+    contest_ids = results['contests']['by_key']
+    for year, year_data in results['results_by_year'].items():
+        for contest, contest_data in year_data.items():
+            contest_id = contest_ids.get(f"{year}|{contest}")
+            if contest_id is None:
+                continue
+            for record in contest_data.values():
+                if record.get('county_id', -1) < 0:
+                    continue
+                yield (
+                    contest_id, record['county_id'], int(year),
+                    record.get('dem_votes', 0), record.get('rep_votes', 0), record.get('other_votes', 0),
+                    record.get('total_votes', 0), record.get('two_party_total', 0), record.get('margin', 0),
+                    record.get('margin_pct', 0.0), record.get('winner'),
+                    (record.get('competitiveness') or {}).get('code'),
+                    record.get('dem_candidate_id'), record.get('rep_candidate_id'),
+                )
+
+
+def write_sqlite(results, path):
+    """Write the results dict to a new SQLite database at `path`, swapped in atomically"""
+    tmp_file = Path(f"{path}.tmp")
+    tmp_file.unlink(missing_ok=True)
+    db = sqlite3.connect(tmp_file)
+    try:
+        db.executescript(SCHEMA)
+        db.executemany('INSERT INTO counties VALUES (?, ?, ?)',
+                       ((c['id'], c['geoid'], c['name']) for c in results['meta'].get('counties') or []))
+        db.executemany('INSERT INTO contests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            (c['id'], c['slug'], int(c['year']), c['date'], c['contest'], c['office_type'], c['office'],
+             c['senate_class'], c['previous'])
+            for c in results['contests']['contests']))
+        candidates = (results.get('candidates') or {}).get('candidates', [])
+        db.executemany('INSERT INTO candidates VALUES (?, ?, ?)',
+                       ((c['id'], c['name'], c['party']) for c in candidates))
+        db.executemany('INSERT INTO candidate_aliases VALUES (?, ?)',
+                       ((c['id'], alias) for c in candidates for alias in c['aliases']))
+        db.executemany('INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', result_rows(results))
+        db.commit()
+        db.execute('ANALYZE')
+        rows = db.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+    except Exception:
+        # Leave nothing half-written behind (an IntegrityError on a duplicate slug, a full disk)
+        db.close()
+        tmp_file.unlink(missing_ok=True)
+        raise
+    db.close()
+    os.replace(tmp_file, path)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write or query the SQLite export of the results')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--query', help='Run a query against the existing database instead of rebuilding it')
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    db_file = config['artifacts'].get('sqlite')
+    if not db_file:
+        print(f"❌ Error: {args.config} has no artifacts.sqlite path")
+        return 1
+
+    if args.query:
+        if not Path(db_file).exists():
+            print(f"❌ Error: {db_file} not found; run without --query to build it")
+            return 1
+        db = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+        start = time.perf_counter()
+        try:
+            cursor = db.execute(args.query)
+            rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"❌ Error: {e}")
+            return 1
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - start
+        columns = [d[0] for d in cursor.description or []]
+        print('\t'.join(columns))
+        for row in rows:
+            print('\t'.join('' if v is None else str(v) for v in row))
+        print(f"📊 {len(rows)} rows in {elapsed * 1000:.1f} ms")
+        return 0
+
+    rows = write_sqlite(load_results(config['output']), db_file)
+    print(f"✓ {rows} results rows saved to {db_file}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
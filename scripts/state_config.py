@@ -0,0 +1,83 @@
+"""
+Load per-state build configuration files.
+
+Each state is described by a JSON file under config/states/ listing the
+election years, source file patterns, office and county aliases, county
+groups (regions) to roll up, the geometry source used by the map and the
+derived artifacts to write.
+"""
+import json
+from pathlib import Path
+
+CONFIG_DIR = Path('config/states')
+DEFAULT_CONFIG = CONFIG_DIR / 'indiana.json'
+
+REQUIRED_KEYS = ['state', 'data_dir', 'output', 'years', 'sources', 'statewide_offices']
+
+# Party spellings are matched case-insensitively
+DEFAULT_PARTY_ALIASES = {
+    'DEM': 'DEM', 'Democratic': 'DEM', 'Democrat': 'DEM',
+    'REP': 'REP', 'Republican': 'REP',
+    'LIB': 'LIB', 'Libertarian': 'LIB',
+}
+
+DEFAULT_RECONCILIATION = {
+    'source_priority': ['alloffice', 'county', 'precinct'],
+    'authoritative': {},
+    'tolerance_votes': 10,
+    'tolerance_pct': 0.5,
+}
+
+
+def load_state_config(config_path=DEFAULT_CONFIG):
+    """Load a state config file and fill in optional sections"""
+    config_path = Path(config_path)
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    missing = [key for key in REQUIRED_KEYS if key not in config]
+    if missing:
+        raise ValueError(f"{config_path} is missing required keys: {', '.join(missing)}")
+
+    config.setdefault('office_aliases', {})
+    config.setdefault('county_aliases', {})
+    config.setdefault('geometry', {})
+    config.setdefault('office_types', {})
+    config.setdefault('artifacts', {})
+    config.setdefault('regions', {})
+    config.setdefault('crosswalks', {})
+    party_aliases = {**DEFAULT_PARTY_ALIASES, **config.get('party_aliases', {})}
+    config['party_aliases'] = {k.strip().upper(): v for k, v in party_aliases.items()}
+    config['reconciliation'] = {**DEFAULT_RECONCILIATION, **config.get('reconciliation', {})}
+    config['years'] = [str(y) for y in config['years']]
+    config['config_path'] = str(config_path)
+    return config
+
+
+def find_state_configs(config_dir=CONFIG_DIR):
+    """List every state config file in the config directory"""
+    return sorted(Path(config_dir).glob('*.json'))
+
+
+def source_files(config, source, year):
+    """Resolve the files for one source type and year.
+
+    Patterns are tried in config order and the first one that matches
+    anything wins, so a `counties/` folder shadows loose files in the year
+    folder and `AllOfficeResults-2018.csv` shadows `AllOfficeResults2018.csv`.
+    """
+    data_dir = Path(config['data_dir'])
+    for pattern in config['sources'].get(source, []):
+        files = sorted(data_dir.glob(pattern.format(year=year)))
+        if files:
+            return files
+    return []
+
+
+def office_type_index(config):
+    """Lowercase office spelling -> office type, from the config's office_types table"""
+    return {
+        name.strip().lower(): office_type
+        for office_type, names in config['office_types'].items()
+        for name in names
+    }
@@ -0,0 +1,196 @@
+"""
+Validate the aggregated results JSON.
+
+Runs over the columnar form of the results (see results_table.py) and checks,
+as vectorized column operations:
+1. Competitiveness code, color, category and party agree with the scale
+2. Vote totals, margin and margin_pct recompute from the vote counts
+3. The code sits in the right threshold bin for its margin
+4. Every contest covers each registry county (GEOID) exactly once
+
+Contest content hashes are kept in .cache/validation/, so a run only
+re-checks contests that changed (or failed) since the last run. Use --full
+to ignore that state.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_cache import CACHE_DIR
+from competitiveness import CATEGORIES, COLORS, PARTIES, classify_margins
+from results_table import RESULTS_FILE, contest_hashes, load_results, results_to_frame
+
+ISSUE_COLUMNS = ['year', 'contest', 'county', 'check', 'detail']
+
+
+def _issues(frame, mask, check, detail):
+    """Rows of the issue table for every frame row where mask is set"""
+    mask = np.asarray(mask, dtype=bool)
+    if not mask.any():
+        return None
+    hits = frame.loc[mask, ['year', 'contest', 'county']].copy()
+    hits['check'] = check
+    hits['detail'] = detail[mask] if isinstance(detail, (pd.Series, np.ndarray)) else detail
+    return hits
+
+
+def validate_frame(frame, expected_geoids=None):
+    """Run every check over a results frame and return a table of issues"""
+    found = []
+    code = frame['code']
+    known = code.isin(list(COLORS)).to_numpy()
+
+    found.append(_issues(frame, ~known, 'unknown_code', 'code ' + code.astype(str)))
+
+    expected_color = code.map(COLORS)
+    found.append(_issues(frame, known & (frame['color'] != expected_color).to_numpy(), 'color',
+                         'expected ' + expected_color.astype(str) + ', got ' + frame['color'].astype(str)))
+
+    wrong_label = (frame['category'] != code.map(CATEGORIES)) | (frame['party'] != code.map(PARTIES))
+    found.append(_issues(frame, known & wrong_label.to_numpy(), 'category',
+                         frame['category'].astype(str) + ' ' + frame['party'].astype(str) + ' for ' + code.astype(str)))
+
+    dem = frame['dem_votes'].to_numpy()
+    rep = frame['rep_votes'].to_numpy()
+    other = frame['other_votes'].to_numpy()
+    two_party = dem + rep
+
+    found.append(_issues(frame, frame['two_party_total'].to_numpy() != two_party, 'two_party_total',
+                         'expected ' + pd.Series(two_party, index=frame.index).astype(str)))
+    found.append(_issues(frame, frame['total_votes'].to_numpy() != two_party + other, 'total_votes',
+                         'expected ' + pd.Series(two_party + other, index=frame.index).astype(str)))
+    found.append(_issues(frame, frame['margin'].to_numpy() != rep - dem, 'margin',
+                         'expected ' + pd.Series(rep - dem, index=frame.index).astype(str)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected_pct = np.where(two_party > 0, np.round((rep - dem) / two_party * 100, 2), 0.0)
+    # Half a hundredth of slack for rounding differences
+    found.append(_issues(frame, np.abs(frame['margin_pct'].to_numpy() - expected_pct) > 0.0051, 'margin_pct',
+                         'expected ' + pd.Series(expected_pct, index=frame.index).round(2).astype(str)))
+
+    expected_winner = np.where(two_party > 0, np.where(rep > dem, 'REP', 'DEM'), 'TIE')
+    found.append(_issues(frame, frame['winner'].to_numpy() != expected_winner, 'winner',
+                         'expected ' + pd.Series(expected_winner, index=frame.index)))
+
+    expected_code = classify_margins(frame['margin_pct'].to_numpy(), frame['winner'].to_numpy())
+    found.append(_issues(frame, known & (code.to_numpy() != expected_code), 'threshold_bin',
+                         'expected ' + pd.Series(expected_code, index=frame.index).astype(str)))
+
+    if expected_geoids is not None:
+        expected_geoids = pd.Index(expected_geoids, dtype=str)
+        geoid = frame['geoid']
+        found.append(_issues(frame, geoid.notna() & ~geoid.isin(expected_geoids), 'geoid',
+                             'unknown GEOID ' + geoid.astype(str)))
+        found.append(_issues(frame, geoid.isna(), 'geoid', 'missing GEOID'))
+        duplicated = geoid.notna() & frame.duplicated(['year', 'contest', 'geoid'], keep=False)
+        found.append(_issues(frame, duplicated, 'geoid', 'duplicate GEOID ' + geoid.astype(str)))
+
+        # Anti-join of (contest x expected county) against what is present
+        contests = frame[['year', 'contest']].drop_duplicates()
+        full = contests.merge(pd.DataFrame({'geoid': expected_geoids}), how='cross')
+        present = frame[['year', 'contest', 'geoid']].dropna().drop_duplicates()
+        merged = full.merge(present, how='left', indicator=True)
+        missing = merged[merged['_merge'] == 'left_only']
+        if len(missing):
+            found.append(pd.DataFrame({
+                'year': missing['year'], 'contest': missing['contest'], 'county': None,
+                'check': 'coverage', 'detail': 'no result for GEOID ' + missing['geoid'],
+            }))
+
+    found = [f for f in found if f is not None]
+    if not found:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(found, ignore_index=True)[ISSUE_COLUMNS]
+
+
+def _state_file(results_path, cache_dir):
+    return Path(cache_dir) / 'validation' / f'{Path(results_path).stem}.json'
+
+
+def validate_results(data, results_path=RESULTS_FILE, cache_dir=CACHE_DIR, full=False):
+    """Validate contests that changed since the last run.
+
+    Returns (issues, checked, total) where checked is the number of contests
+    re-validated. cache_dir=None disables the incremental state.
+    """
+    results_by_year = data['results_by_year']
+    hashes = contest_hashes(results_by_year)
+
+    state = {}
+    state_file = _state_file(results_path, cache_dir) if cache_dir is not None else None
+    if state_file is not None and state_file.exists() and not full:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+    # Re-check anything new, changed, or that failed last time
+    stale = [key for key, digest in hashes.items()
+             if state.get(f'{key[0]}|{key[1]}') != {'hash': digest, 'issues': 0}]
+
+    subset = {}
+    for year, contest in stale:
+        subset.setdefault(year, {})[contest] = results_by_year[year][contest]
+
+    expected_geoids = None
+    if data.get('meta', {}).get('counties'):
+        expected_geoids = [c['geoid'] for c in data['meta']['counties']]
+
+    frame = results_to_frame(subset)
+    issues = validate_frame(frame, expected_geoids) if len(frame) else pd.DataFrame(columns=ISSUE_COLUMNS)
+
+    if state_file is not None:
+        counts = issues.groupby(['year', 'contest']).size()
+        new_state = {k: v for k, v in state.items()
+                     if tuple(k.split('|', 1)) in hashes}
+        for year, contest in stale:
+            new_state[f'{year}|{contest}'] = {
+                'hash': hashes[(year, contest)],
+                'issues': int(counts.get((year, contest), 0)),
+            }
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = state_file.with_name(f'{state_file.name}.{os.getpid()}.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(new_state, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, state_file)
+
+    return issues, len(stale), len(hashes)
+
+
+def print_report(issues, checked, total, limit=10):
+    """Print a short summary of a validation run"""
+    print(f"🔍 Validated {checked} of {total} contests ({total - checked} unchanged)")
+    if issues.empty:
+        print("✅ No issues found")
+        return
+
+    print(f"❌ Found {len(issues)} issues:\n")
+    for check, count in issues['check'].value_counts().items():
+        print(f"  {check:<16} {count:>6}")
+    print()
+    for row in issues.head(limit).itertuples(index=False):
+        county = f" - {row.county}" if row.county else ''
+        print(f"  {row.year} - {row.contest}{county}: {row.check} ({row.detail})")
+    if len(issues) > limit:
+        print(f"  ... and {len(issues) - limit} more")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate the aggregated election results')
+    parser.add_argument('--results', default=str(RESULTS_FILE), help='Results JSON (default: %(default)s)')
+    parser.add_argument('--full', action='store_true', help='Re-validate every contest')
+    args = parser.parse_args()
+
+    if not Path(args.results).exists():
+        print(f"❌ Error: {args.results} not found")
+        return 1
+
+    issues, checked, total = validate_results(load_results(args.results), args.results, full=args.full)
+    print_report(issues, checked, total)
+    return 0 if issues.empty else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
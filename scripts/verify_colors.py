@@ -5,34 +5,18 @@ This script checks:
 1. All competitiveness categories have correct colors assigned
 2. Color scale is consistent across all years
 3. No missing or mismatched color codes
+
+Vote arithmetic, threshold bins and county coverage are checked by
+validate_results.py.
 """
 
-import json
 from pathlib import Path
 
+from competitiveness import COLORS
+from results_table import load_results, results_to_frame
+
 # Define the expected color mapping
-EXPECTED_COLORS = {
-    # Republican colors (red scale)
-    "R_ANNIHILATION": "#67000d",
-    "R_DOMINANT": "#a50f15",
-    "R_STRONGHOLD": "#cb181d",
-    "R_SAFE": "#ef3b2c",
-    "R_LIKELY": "#fb6a4a",
-    "R_LEAN": "#fcae91",
-    "R_TILT": "#fee8c8",
-    
-    # Tossup
-    "TOSSUP": "#f7f7f7",
-    
-    # Democratic colors (blue scale)
-    "D_TILT": "#e1f5fe",
-    "D_LEAN": "#c6dbef",
-    "D_LIKELY": "#9ecae1",
-    "D_SAFE": "#6baed6",
-    "D_STRONGHOLD": "#3182bd",
-    "D_DOMINANT": "#08519c",
-    "D_ANNIHILATION": "#08306b"
-}
+EXPECTED_COLORS = COLORS
 
 # Full category names
 CATEGORY_NAMES = {
@@ -64,45 +48,30 @@ def verify_colors():
     
     print("🔍 Verifying color coding in Indiana election data...\n")
     
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    frame = results_to_frame(load_results(data_file)['results_by_year'])
+    frame = frame[(frame['county'] != 'Statewide') & frame['code'].notna()]
+    
+    color_usage = frame['code'].value_counts().to_dict()
     
-    all_valid = True
-    color_usage = {code: 0 for code in EXPECTED_COLORS.keys()}
-    mismatches = []
+    known = frame['code'].isin(list(EXPECTED_COLORS))
+    for row in frame[~known].itertuples(index=False):
+        print(f"⚠️  Unknown code: {row.code} in {row.year} {row.contest} {row.county}")
     
-    # Check each year
-    for year, year_data in data['results_by_year'].items():
-        for contest, contest_data in year_data.items():
-            for county, county_data in contest_data.items():
-                if county == 'Statewide':
-                    continue
-                
-                comp = county_data.get('competitiveness', {})
-                code = comp.get('code')
-                color = comp.get('color')
-                category = comp.get('category')
-                party = comp.get('party')
-                
-                if code:
-                    color_usage[code] = color_usage.get(code, 0) + 1
-                
-                # Verify color matches expected
-                if code and code in EXPECTED_COLORS:
-                    expected_color = EXPECTED_COLORS[code]
-                    if color != expected_color:
-                        mismatches.append({
-                            'year': year,
-                            'contest': contest,
-                            'county': county,
-                            'code': code,
-                            'expected': expected_color,
-                            'actual': color
-                        })
-                        all_valid = False
-                elif code:
-                    print(f"⚠️  Unknown code: {code} in {year} {contest} {county}")
-                    all_valid = False
+    # Verify color matches expected
+    expected = frame['code'].map(EXPECTED_COLORS)
+    bad = frame[known & (frame['color'] != expected)]
+    mismatches = [
+        {
+            'year': row.year,
+            'contest': row.contest,
+            'county': row.county,
+            'code': row.code,
+            'expected': EXPECTED_COLORS[row.code],
+            'actual': row.color
+        }
+        for row in bad.itertuples(index=False)
+    ]
+    all_valid = known.all() and not mismatches
     
     # Print results
     if mismatches:
@@ -0,0 +1,198 @@
+"""
+Rebuild the results whenever source files change.
+
+Does one full build, then keeps the per-year results and every parsed
+source file (precinct files already reduced to county totals) in memory
+and watches the files the config's `sources`
+patterns match (`data/<year>/`, `data/<year>/counties/`, the AllOffice
+files, the parser output). A burst of saves is debounced into one rebuild;
+only the years whose files changed are re-aggregated, and the contests
+that actually changed are reported and re-validated. The results JSON and
+the derived artifacts (trends, primaries, district results) are then
+swapped in atomically, so the map and the query server never read a
+half-written file.
+
+Usage:
+    python scripts/watch_build.py
+    python scripts/watch_build.py --debounce 0.5 --interval 0.1
+"""
+import argparse
+import time
+from pathlib import Path
+
+from aggregate_primaries import build_primaries
+from aggregate_statewide import aggregate_year, assemble_output, drop_uncontested, write_outputs
+from build_cache import CACHE_DIR, keep_in_memory
+from candidate_registry import registry_candidate_ids
+from contest_registry import registry_ids
+from county_registry import CountyRegistry
+from results_table import contest_hashes, load_results
+from state_config import DEFAULT_CONFIG, load_state_config
+from validate_results import print_report, validate_results
+
+PRIMARY_SOURCES = {'primary_county', 'primary_precinct'}
+
+
+class SourceScanner:
+    """mtime/size snapshot of every file the config's source patterns can match"""
+
+    def __init__(self, config):
+        data_dir = Path(config['data_dir'])
+        # Every pattern, not just the first that matches: a new file can shadow an older source
+        self.patterns = [
+            (data_dir, pattern.format(year=year), year, source in PRIMARY_SOURCES)
+            for year in config['years']
+            for source, patterns in config['sources'].items()
+            for pattern in patterns
+        ]
+        self.files, self.owners = self.scan()
+
+    def scan(self):
+        files, owners = {}, {}
+        for data_dir, pattern, year, primary in self.patterns:
+            for path in data_dir.glob(pattern):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files[path] = (stat.st_mtime_ns, stat.st_size)
+                owners.setdefault(path, set()).add((year, primary))
+        return files, owners
+
+    def changes(self):
+        """{path: {(year, is_primary)}} for files added, modified or removed since the last call"""
+        files, owners = self.scan()
+        changed = {path for path in files if self.files.get(path) != files[path]}
+        changed |= set(self.files) - set(files)
+        result = {path: owners.get(path) or self.owners.get(path, set()) for path in changed}
+        self.files, self.owners = files, owners
+        return result
+
+
+class WarmBuild:
+    """Per-year results and primaries kept between rebuilds"""
+
+    def __init__(self, config, cache_dir=CACHE_DIR):
+        self.config = config
+        self.cache_dir = cache_dir
+        self.registry = CountyRegistry.from_config(config)
+        self.results = {}
+        self.hashes = {}  # year -> contest hashes as aggregated (before ids are stamped on)
+        self.primaries = None
+        self.candidate_ids = None
+        # Contest and candidate ids carry over from the previous output and from one rebuild to the next
+        output_file = Path(config['output'])
+        previous = load_results(output_file) if output_file.exists() else {}
+        self.contest_ids = registry_ids(previous.get('contests'))
+        self.known_candidate_ids = registry_candidate_ids(previous.get('candidates'))
+
+    def aggregate(self, year):
+        """Aggregate one year into self.results; returns the contest keys that changed"""
+        year_results = drop_uncontested(aggregate_year(self.config, year, self.registry, self.cache_dir))
+        if year_results:
+            self.results[int(year)] = year_results
+        else:
+            self.results.pop(int(year), None)
+        before, after = self.hashes.get(year, {}), contest_hashes({year: year_results})
+        self.hashes[year] = after
+        return sorted(contest for (_, contest) in set(before) | set(after)
+                      if before.get((year, contest)) != after.get((year, contest)))
+
+    def aggregate_primaries(self, years=None):
+        if not self.config['artifacts'].get('primaries'):
+            return
+        fresh = build_primaries(self.config, years, cache_dir=self.cache_dir)
+        if self.primaries is None or years is None:
+            self.primaries = fresh
+            return
+        by_year = self.primaries['results_by_year']
+        for year in years:
+            by_year.pop(year, None)
+        by_year.update(fresh['results_by_year'])
+        self.primaries['results_by_year'] = dict(sorted(by_year.items()))
+        self.primaries['meta'].update(years_covered=sorted(by_year), processed_date=fresh['meta']['processed_date'])
+
+    def write(self, primaries_changed=True):
+        final_output = assemble_output(self.config, self.results, self.registry, self.primaries, self.contest_ids,
+                                       self.known_candidate_ids)
+        self.contest_ids = final_output['contests']['ids']
+        self.known_candidate_ids = final_output['candidates']['ids']
+        # Candidate ids are stamped on the primaries too, so they are rewritten when the registry moves
+        by_name = final_output['candidates']['by_name']
+        primaries_changed = primaries_changed or by_name != self.candidate_ids
+        self.candidate_ids = by_name
+        output_file = write_outputs(self.config, final_output, self.primaries if primaries_changed else None,
+                                    self.cache_dir)
+        issues, checked, total = validate_results(final_output, output_file, self.cache_dir)
+        print_report(issues, checked, total)
+
+    def full(self):
+        for year in self.config['years']:
+            self.aggregate(year)
+        self.aggregate_primaries()
+        self.write()
+
+    def update(self, years, primary_years):
+        """Re-aggregate only the given years; returns {year: [changed contests]}"""
+        changed = {year: self.aggregate(year) for year in sorted(years)}
+        if primary_years:
+            self.aggregate_primaries(sorted(primary_years))
+        self.write(primaries_changed=bool(primary_years))
+        return changed
+
+
+def watch(build, scanner, interval, debounce):
+    """Poll the sources, and rebuild once changes have been quiet for `debounce` seconds"""
+    pending, last_change = {}, None
+    while True:
+        changes = scanner.changes()
+        if changes:
+            for path, owners in changes.items():
+                pending.setdefault(path, set()).update(owners)
+            last_change = time.monotonic()
+        elif pending and time.monotonic() - last_change >= debounce:
+            years = {year for owners in pending.values() for year, primary in owners if not primary}
+            primary_years = {year for owners in pending.values() for year, primary in owners if primary}
+            names = ', '.join(sorted(p.name for p in pending)[:3]) + (', ...' if len(pending) > 3 else '')
+            print(f"\n🔍 {len(pending)} changed files ({names})")
+
+            start = time.perf_counter()
+            changed = build.update(years, primary_years)
+            for year, contests in changed.items():
+                print(f"  {year}: {', '.join(contests) if contests else 'no contest changed'}")
+            if primary_years:
+                print(f"  primaries: {', '.join(sorted(primary_years))}")
+            print(f"✓ Rebuilt in {time.perf_counter() - start:.2f}s")
+            pending = {}
+        time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the results when source files change')
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG), help='State config file (default: %(default)s)')
+    parser.add_argument('--interval', type=float, default=0.2, help='Seconds between file scans (default: %(default)s)')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='Quiet period before a rebuild, in seconds (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help="Don't use the on-disk .cache/ for parsed files")
+    args = parser.parse_args()
+
+    config = load_state_config(args.config)
+    keep_in_memory()
+    build = WarmBuild(config, cache_dir=None if args.no_cache else CACHE_DIR)
+
+    start = time.perf_counter()
+    print(f"Initial build of {config['state']}...")
+    build.full()
+    scanner = SourceScanner(config)
+    print(f"\n✓ Ready in {time.perf_counter() - start:.1f}s; watching {len(scanner.files)} source files "
+          f"(Ctrl+C to stop)")
+
+    try:
+        watch(build, scanner, args.interval, args.debounce)
+    except KeyboardInterrupt:
+        print("\nStopped")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+"""Patching one county into a copy of the committed results"""
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from aggregate_statewide import patch_state
+from contest_registry import build_contest_registry
+from state_config import load_state_config, office_type_index
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _without_ids(record):
+    return {k: v for k, v in record.items() if k not in ('dem_candidate_id', 'rep_candidate_id')}
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / 'config', tmp_path / 'config')
+    shutil.copytree(ROOT / 'data', tmp_path / 'data')
+    monkeypatch.chdir(tmp_path)
+    return load_state_config('config/states/indiana.json')
+
+
+def test_patch_one_county(config):
+    before = json.loads(Path(config['output']).read_text())
+    changes = patch_state(config, ['2024'], None, ['Adams'], cache_dir=None)
+    after = json.loads(Path(config['output']).read_text())
+
+    # The existing 2024 contests are patched in place, whatever the sources now call them
+    assert list(after['results_by_year']['2024']) == list(before['results_by_year']['2024'])
+    assert {status for status, _ in changes.values()} <= {'updated', 'unchanged'}
+    slugs = [c['slug'] for c in after['contests']['contests']]
+    assert len(slugs) == len(set(slugs))
+    before_ids = {c['slug']: c['id'] for c in before['contests']['contests']}
+    assert all(before_ids[c['slug']] == c['id'] for c in after['contests']['contests'])
+
+    # Only Adams is re-aggregated
+    for contest, counties in before['results_by_year']['2024'].items():
+        patched = after['results_by_year']['2024'][contest]
+        assert patched.keys() == counties.keys()
+        for name, record in counties.items():
+            assert patched[name]['contest'] == contest
+            if name != 'Adams':
+                assert _without_ids(patched[name]) == _without_ids(record)
+    for year, contests in before['results_by_year'].items():
+        if year != '2024':
+            assert after['results_by_year'][year].keys() == contests.keys()
+
+    assert not list(Path('data').glob('*.tmp'))
+
+
+def test_duplicate_slugs_are_rejected(config):
+    results = {'2024': {'Governor & Lt. Governor (2024)': {}, 'Governor (2024)': {}}}
+    with pytest.raises(ValueError, match='governor_2024'):
+        build_contest_registry(results, config, office_type_index(config))